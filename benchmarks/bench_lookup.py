@@ -0,0 +1,81 @@
+"""Per lookup latency of FuzzyIndex against process.extractOne on a 50k member fixture.
+
+Run from the repository root with `python -m benchmarks.bench_lookup`."""
+import random
+import statistics
+import string
+import time
+
+from fuzzywuzzy import fuzz, process
+
+from src.lookup import FuzzyIndex
+
+MEMBERS = 50000
+QUERIES = 100
+SYLLABLES = ['ka', 'ze', 'ro', 'mi', 'jet', 'tt', 'lo', 'xx', 'sa', 'ku', 'na', 'vy', 'pe', 'dr', 'ag', 'on']
+
+
+def fixture(rng: random.Random):
+    names = {}
+    while len(names) < MEMBERS:
+        name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5)))
+        if rng.random() < 0.3:
+            name = name.capitalize()
+        if rng.random() < 0.2:
+            name += str(rng.randint(0, 999))
+        if rng.random() < 0.1:
+            name = f'{rng.choice(["[", "."])}{name}{rng.choice(string.punctuation)}'
+        names[name] = None
+    return list(names)
+
+
+def typo(rng: random.Random, name: str) -> str:
+    chars = list(name)
+    position = rng.randrange(len(chars))
+    if rng.random() < 0.5:
+        del chars[position]
+    else:
+        chars.insert(position, rng.choice(string.ascii_lowercase))
+    return ''.join(chars)
+
+
+def time_lookups(lookup, queries):
+    times = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(lookup(query))
+        times.append(time.perf_counter() - start)
+    return results, times
+
+
+def report(label: str, times):
+    times = sorted(times)
+    print(f'{label:>24}: mean {statistics.mean(times) * 1000:8.3f} ms  '
+          f'p50 {times[len(times) // 2] * 1000:8.3f} ms  p95 {times[int(len(times) * 0.95)] * 1000:8.3f} ms')
+
+
+def main():
+    rng = random.Random(2021)
+    names = fixture(rng)
+    start = time.perf_counter()
+    index = FuzzyIndex(names)
+    print(f'{len(names)} names, index built in {time.perf_counter() - start:.2f} s')
+
+    cases = {
+        'exact': [rng.choice(names) for _ in range(QUERIES)],
+        'typo': [typo(rng, rng.choice(names)) for _ in range(QUERIES)],
+        'prefix': [rng.choice(names)[:4] for _ in range(QUERIES)],
+    }
+    for case, queries in cases.items():
+        expected, scan_times = time_lookups(
+            lambda q: process.extractOne(q, names, scorer=fuzz.ratio, score_cutoff=30), queries)
+        got, index_times = time_lookups(lambda q: index.extract_one(q, scorer=fuzz.ratio, score_cutoff=30), queries)
+        mismatches = sum(1 for a, b in zip(expected, got) if a != b)
+        print(f'{case} ({mismatches} mismatches)')
+        report('extractOne', scan_times)
+        report('FuzzyIndex', index_times)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""EXPLAIN ANALYZE of the hot db_helpers queries, compared against a saved baseline to catch plan regressions.
+
+Point database.ini at a local database seeded from a dump (never production), apply the migrations, then run from
+the repository root with `python -m benchmarks.bench_queries path/to/database.ini`. Add `--save` to record the
+current plans as the baseline. The run fails if a query now scans a large table sequentially where the baseline
+used an index, or got more than SLOWDOWN times slower."""
+import json
+import os
+import statistics
+import sys
+from typing import Callable, Dict, List
+
+import psycopg2
+import psycopg2.extensions
+
+from src import db_helpers, db_pool
+from src.constants import CURRENT_LEAGUE_ID
+from src.crew import Crew
+from src.db_config import config
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'query_plans.json')
+REPEATS = 5
+SLOWDOWN = 2.0
+MIN_REGRESSION_MS = 5.0  # Anything faster than this is noise
+WATCHED = {'battle', 'match', 'crew_last_battle', 'current_member_crews', 'member_crews_history'}
+
+recorded: List[str] = []
+
+
+class RecordingCursor(psycopg2.extensions.cursor):
+    """Keeps every select db_helpers runs, with its arguments bound, so the real query text gets explained."""
+
+    def execute(self, query, vars=None):
+        statement = self.mogrify(query, vars).decode()
+        if statement.lstrip().lower().startswith(('select', 'with')):
+            recorded.append(statement)
+        return super().execute(query, vars)
+
+
+def cases(crew: Crew) -> Dict[str, Callable]:
+    return {
+        'all_crews': db_helpers.all_crews,
+        'all_crew_usage': lambda: db_helpers.all_crew_usage(0),
+        'all_crew_usage_last_month': lambda: db_helpers.all_crew_usage(1),
+        'crew_usage': lambda: db_helpers.crew_usage(crew),
+        'crew_record': lambda: db_helpers.crew_record(crew),
+        'crew_record_league': lambda: db_helpers.crew_record(crew, CURRENT_LEAGUE_ID),
+        'crew_flairs': db_helpers.crew_flairs,
+        'current_crews': db_helpers.current_crews,
+        'crew_to_last_played': db_helpers.crew_to_last_played,
+    }
+
+
+def seq_scans(plan: dict) -> List[str]:
+    found = []
+    if plan.get('Node Type') == 'Seq Scan' and plan.get('Relation Name') in WATCHED:
+        found.append(plan['Relation Name'])
+    for child in plan.get('Plans', []):
+        found.extend(seq_scans(child))
+    return found
+
+
+def explain(cur, statement: str) -> Dict:
+    times = []
+    scans = []
+    for _ in range(REPEATS):
+        cur.execute(f'EXPLAIN (ANALYZE, FORMAT JSON) {statement}')
+        result = cur.fetchone()[0][0]
+        times.append(result['Execution Time'])
+        scans = seq_scans(result['Plan'])
+    return {'ms': statistics.median(times), 'seq_scans': sorted(set(scans))}
+
+
+def regressions(baseline: Dict[str, Dict], current: Dict[str, Dict]) -> List[str]:
+    found = []
+    for name, now in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        new_scans = set(now['seq_scans']) - set(before['seq_scans'])
+        if new_scans:
+            found.append(f'{name}: new sequential scan of {", ".join(sorted(new_scans))}')
+        if now['ms'] > MIN_REGRESSION_MS and now['ms'] > before['ms'] * SLOWDOWN:
+            found.append(f'{name}: {before["ms"]:.2f} ms -> {now["ms"]:.2f} ms')
+    return found
+
+
+def main(ini: str, save: bool):
+    params = config(ini)
+    pool = db_pool.ConnectionPool(lambda: psycopg2.connect(cursor_factory=RecordingCursor, **params), 1, 2)
+    db_pool._pool = pool
+    first = db_helpers.all_crews()[0]
+    crew = Crew(name=first.name, abbr=first.tag, role_id=first.discord_id)
+
+    current = {}
+    with pool.connection() as conn:
+        cur = conn.cursor(cursor_factory=psycopg2.extensions.cursor)
+        for name, run in cases(crew).items():
+            recorded.clear()
+            run()
+            statements = list(recorded)
+            plans = [explain(cur, statement) for statement in statements]
+            current[name] = {'ms': sum(plan['ms'] for plan in plans),
+                             'seq_scans': sorted({scan for plan in plans for scan in plan['seq_scans']})}
+            scans = ', '.join(current[name]['seq_scans']) or '-'
+            print(f'{name:>28}: {current[name]["ms"]:9.2f} ms  {len(statements)} queries  seq scans: {scans}')
+        conn.rollback()
+
+    if save:
+        with open(BASELINE, 'w') as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+        print(f'Baseline saved to {BASELINE}')
+        return
+    if not os.path.exists(BASELINE):
+        print('No baseline yet, run again with --save.')
+        return
+    with open(BASELINE) as f:
+        found = regressions(json.load(f), current)
+    for regression in found:
+        print(f'REGRESSION {regression}')
+    if found:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1], '--save' in sys.argv[2:])
@@ -0,0 +1,19 @@
+-- The newest battle of every crew in every league, kept current by the battle inserts and battle_cancel in
+-- db_helpers so all_crews and crew_to_last_played don't have to group the whole battle table.
+CREATE TABLE IF NOT EXISTS crew_last_battle
+(
+    crew_id   integer NOT NULL,
+    league_id integer NOT NULL,
+    battle_id integer NOT NULL,
+    PRIMARY KEY (crew_id, league_id)
+);
+
+CREATE INDEX IF NOT EXISTS crew_last_battle_battle_id ON crew_last_battle (battle_id);
+
+INSERT INTO crew_last_battle (crew_id, league_id, battle_id)
+SELECT DISTINCT ON (sides.crew_id, battle.league_id) sides.crew_id, battle.league_id, battle.id
+FROM battle,
+     LATERAL (VALUES (battle.crew_1), (battle.crew_2)) AS sides(crew_id)
+WHERE sides.crew_id IS NOT NULL
+ORDER BY sides.crew_id, battle.league_id, battle.id DESC
+ON CONFLICT (crew_id, league_id) DO NOTHING;
@@ -0,0 +1,17 @@
+-- Indexes behind the usage, record, last battle and flair queries in db_helpers. Those queries compare the bare
+-- columns against ranges so these indexes can be used.
+CREATE INDEX IF NOT EXISTS battle_finished ON battle (finished);
+CREATE INDEX IF NOT EXISTS battle_crew_1 ON battle (crew_1);
+CREATE INDEX IF NOT EXISTS battle_crew_2 ON battle (crew_2);
+CREATE INDEX IF NOT EXISTS battle_winner ON battle (winner);
+CREATE INDEX IF NOT EXISTS battle_league_id ON battle (league_id);
+
+CREATE INDEX IF NOT EXISTS match_battle_id ON match (battle_id);
+CREATE INDEX IF NOT EXISTS match_p1 ON match (p1);
+CREATE INDEX IF NOT EXISTS match_p2 ON match (p2);
+
+CREATE INDEX IF NOT EXISTS current_member_crews_joined ON current_member_crews (joined);
+CREATE INDEX IF NOT EXISTS member_crews_history_joined ON member_crews_history (joined);
+
+ANALYZE battle;
+ANALYZE match;
@@ -1,22 +1,34 @@
-import pickle
-import os.path
+import dataclasses
+import json
+import logging
 import time
+from datetime import datetime
 import discord
-from typing import Dict, Iterable, TYPE_CHECKING, Optional
+from typing import Dict, Iterable, Mapping, TYPE_CHECKING, Optional, Set, Tuple
 
 from .helpers import strip_non_ascii
+from .gambit import LiveGambit
+from .leaderboard import Leaderboard
+from .lookup import FuzzyIndex
 
 if TYPE_CHECKING:
     from .scoreSheetBot import ScoreSheetBot
 from .constants import *
-from googleapiclient.discovery import build
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
 from .crew import *
+from .crew_docs import CrewDocsLoader, crews_from_rows
 
-# If modifying these scopes, delete the file token.pickle.
 
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets.readonly']
+@dataclasses.dataclass
+class _MemberEntry:
+    """What one guild member contributed to the cache indexes, so it can be taken back out."""
+    names: List[str]
+    role_ids: Set[int]
+    crew_roles: Set[str]
+    crew: Optional[str] = None
+    label: str = ''
+    leader: bool = False
+    advisor: bool = False
+    staff: bool = False
 
 
 class Cache:
@@ -34,24 +46,138 @@ class Cache:
         self.crews_by_tag: Dict[str, Crew] = {}
         self.flairing_allowed: bool = True
         self.current_league_id: int = 0
+        self.crew_docs = CrewDocsLoader()
+        self.leaderboard = Leaderboard()
+        self.gambit = LiveGambit()
+        self.role_members: Dict[int, Set[int]] = {}
+        self.member_crews: Dict[int, str] = {}
+        self.crew_member_ids: Dict[str, Set[int]] = {}
+        self.member_index = FuzzyIndex()
+        self.crew_index = FuzzyIndex()
+        self.role_index = FuzzyIndex()
+        self._members: Dict[Tuple[int, int], _MemberEntry] = {}
+        self.built = False
+        self.cycles_since_rebuild = 0
+        self.last_drift: Dict[str, int] = {}
+        self.last_fetch_seconds = 0.0
 
     async def update(self, bot: 'ScoreSheetBot'):
+        before = self._index_snapshot() if self.built else None
+        self.attach(bot)
+        fetch_start = time.perf_counter()
+        crews_by_name = await self.update_crews()
+        self.last_fetch_seconds = time.perf_counter() - fetch_start
+        self._set_crews(crews_by_name)
+        self.crew_populate()
+        self.built = True
+        self.cycles_since_rebuild = 0
+        if before is not None:
+            self.last_drift = self._drift(before, self._index_snapshot())
+            if any(self.last_drift.values()):
+                logging.warning(f'Cache drift corrected by rebuild: {self.last_drift}')
+
+    async def refresh(self, bot: 'ScoreSheetBot', full: bool = False) -> Optional[Dict[str, int]]:
+        """Periodic cache upkeep, the member and role events keep the indexes current so this only does a full
+        rebuild every CACHE_RECONCILE_EVERY calls. Returns the drift that rebuild found, or None if it didn't run."""
+        if full or not self.built or self.cycles_since_rebuild + 1 >= CACHE_RECONCILE_EVERY:
+            await self.update(bot)
+            return self.last_drift
+        self.cycles_since_rebuild += 1
+        self.minor_update(bot)
+        return None
+
+    def attach(self, bot: 'ScoreSheetBot'):
+        """Looks up the servers and their roles and channels, without the member pass or the crew docs."""
         self.scs = discord.utils.get(bot.bot.guilds, name=SCS)
         self.overflow_server = discord.utils.get(bot.bot.guilds, name=OVERFLOW_SERVER)
         self.channels = self.channel_factory(self.scs)
         self.categories = self.category_roles()
         self.roles = self.role_factory(self.scs)
-        self.crews_by_name = await self.update_crews()
+
+    def warm_start(self, bot: 'ScoreSheetBot'):
+        """Connects crews loaded from a snapshot to the live servers until the first recache finishes."""
+        self.attach(bot)
+        if self.scs and self.crews_by_name:
+            self._role_populate()
+
+    def _set_crews(self, crews_by_name: Dict[str, Crew]):
+        self.crews_by_name = crews_by_name
         self.crews = self.crews_by_name.keys()
         self.crews_by_tag = {crew.abbr.lower(): crew for crew in self.crews_by_name.values()}
-        self.main_members = self.members_by_name(self.scs.members)
-        self.overflow_members = self.members_by_name(self.overflow_server.members)
-        self.crew_populate()
+        self.crew_index = FuzzyIndex(self.crews_by_name)
+
+    def snapshot_data(self) -> Dict:
+        return {
+            'saved_at': time.time(),
+            'current_league_id': self.current_league_id,
+            'crews': [_crew_to_json(cr) for cr in self.crews_by_name.values()],
+        }
+
+    def save_snapshot(self, data: Dict, path: str = CACHE_SNAPSHOT):
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w') as snapshot:
+            json.dump(data, snapshot)
+        os.replace(temp_path, path)
+
+    def load_snapshot(self, path: str = CACHE_SNAPSHOT, max_age: float = CACHE_SNAPSHOT_MAX_AGE) -> bool:
+        """Fills in the crews from the last saved snapshot so crew commands work before the first recache."""
+        try:
+            with open(path) as snapshot:
+                data = json.load(snapshot)
+            if data['saved_at'] + max_age < time.time():
+                return False
+            crews = [_crew_from_json(cr) for cr in data['crews']]
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            logging.warning(f'Ignoring the cache snapshot at {path}: {error!r}')
+            return False
+        self.current_league_id = data['current_league_id']
+        self._set_crews({cr.name: cr for cr in crews})
+        self.leaderboard.reset({cr.name: cr.trinity_rating for cr in crews if cr.ranking})
+        return True
+
+    def seed_rankings(self, ratings: Mapping[str, int]):
+        self.leaderboard.reset(ratings)
+        self.stamp_rankings()
+
+    def stamp_rankings(self):
+        """Copies every crew's current rank out of the leaderboard, ranks shift for everyone when one crew moves."""
+        total = len(self.leaderboard)
+        for cr in self.crews_by_name.values():
+            rank = self.leaderboard.rank(cr.name)
+            if rank:
+                cr.set_rankings(rank, self.leaderboard.rating(cr.name), total)
+
+    def ratings_changed(self, ratings: Mapping[str, int]):
+        """New current league ratings straight from a confirmed battle or decay, names that aren't crews are skipped."""
+        for name, rating in ratings.items():
+            if name in self.crews_by_name:
+                self.leaderboard.set(name, rating)
+        self.stamp_rankings()
+
+    def crew_disbanded(self, name: str):
+        self.leaderboard.remove(name)
+        self.stamp_rankings()
 
     def minor_update(self, bot: 'ScoreSheetBot'):
         self.scs = discord.utils.get(bot.bot.guilds, name=SCS)
         self.overflow_server = discord.utils.get(bot.bot.guilds, name=OVERFLOW_SERVER)
 
+    def _index_snapshot(self) -> Dict[str, Dict]:
+        return {
+            'member_crews': dict(self.member_crews),
+            'names': {name: member.id for name, member in self.main_members.items()},
+            'overflow_names': {name: member.id for name, member in self.overflow_members.items()},
+            'role_members': {role_id: set(ids) for role_id, ids in self.role_members.items()},
+        }
+
+    @staticmethod
+    def _drift(before: Dict[str, Dict], after: Dict[str, Dict]) -> Dict[str, int]:
+        drift = {}
+        for index in after:
+            old, new = before[index], after[index]
+            drift[index] = sum(1 for key in old.keys() | new.keys() if old.get(key) != new.get(key))
+        return drift
+
     def category_roles(self) -> List[discord.Role]:
         ret = []
         for role in self.scs.roles:
@@ -102,95 +228,194 @@ class Cache:
 
         return Channels
 
-    def members_by_name(self, member_list: Iterable[discord.Member]) -> Dict[str, discord.Member]:
-        out = {}
-        for member in member_list:
-            for role in member.roles:
-                if role.name in self.crews:
-                    self.crews_by_name[role.name].member_count += 1
-            if member.name:
-                out[strip_non_ascii(member.name)] = member
-            if member.name != member.display_name and member.display_name:
-                out[strip_non_ascii(member.display_name)] = member
+    @staticmethod
+    def _name_keys(member: discord.Member) -> List[str]:
+        keys = []
+        if member.name:
+            keys.append(strip_non_ascii(member.name))
+        if member.name != member.display_name and member.display_name:
+            keys.append(strip_non_ascii(member.display_name))
+        return keys
+
+    def _tracked(self, guild: discord.Guild) -> bool:
+        return self.built and guild is not None and guild in (self.scs, self.overflow_server)
+
+    def _index_member(self, member: discord.Member):
+        main = member.guild == self.scs
+        names = self.main_members if main else self.overflow_members
+        entry = _MemberEntry(names=self._name_keys(member), role_ids={role.id for role in member.roles},
+                             crew_roles={role.name for role in member.roles if role.name in self.crews})
+        for name in entry.names:
+            names[name] = member
+            if main:
+                self.member_index.add(name)
+        for role_id in entry.role_ids:
+            self.role_members.setdefault(role_id, set()).add(member.id)
+        for crew_name in entry.crew_roles:
+            self.crews_by_name[crew_name].member_count += 1
+        if main:
+            entry.crew = self._crew(member)
+            if entry.crew:
+                self.member_crews[member.id] = entry.crew
+                self.crew_member_ids.setdefault(entry.crew, set()).add(member.id)
+                cr = self.crews_by_name[entry.crew]
+                entry.label = str(member)
+                for role in member.roles:
+                    if role.name == LEADER:
+                        entry.leader = True
+                        cr.leaders.append(entry.label)
+                        cr.leader_ids.append(member.id)
+                    if role.name == ADVISOR:
+                        entry.advisor = True
+                        cr.advisors.append(entry.label)
+                    if role.name == CREW_STAFF:
+                        entry.staff = True
+                        cr.crew_staff.append(entry.label)
+        self._members[(member.guild.id, member.id)] = entry
+
+    def _unindex_member(self, guild: discord.Guild, member_id: int):
+        entry = self._members.pop((guild.id, member_id), None)
+        if not entry:
+            return
+        main = guild == self.scs
+        names = self.main_members if main else self.overflow_members
+        for name in entry.names:
+            if name in names and names[name].id == member_id:
+                del names[name]
+                if main:
+                    self.member_index.discard(name)
+        for role_id in entry.role_ids:
+            holders = self.role_members.get(role_id)
+            if holders is not None:
+                holders.discard(member_id)
+                if not holders:
+                    del self.role_members[role_id]
+        for crew_name in entry.crew_roles:
+            if crew_name in self.crews_by_name:
+                self.crews_by_name[crew_name].member_count -= 1
+        if entry.crew:
+            self.member_crews.pop(member_id, None)
+            roster = self.crew_member_ids.get(entry.crew)
+            if roster is not None:
+                roster.discard(member_id)
+                if not roster:
+                    del self.crew_member_ids[entry.crew]
+            cr = self.crews_by_name.get(entry.crew)
+            if cr:
+                if entry.leader:
+                    _discard(cr.leaders, entry.label)
+                    _discard(cr.leader_ids, member_id)
+                if entry.advisor:
+                    _discard(cr.advisors, entry.label)
+                if entry.staff:
+                    _discard(cr.crew_staff, entry.label)
+
+    def role_member_ids(self, role_name: str, guild: Optional[discord.Guild] = None) -> Set[int]:
+        guild = guild or self.scs
+        out = set()
+        for role in guild.roles:
+            if role.name == role_name:
+                out |= self.role_members.get(role.id, set())
+        return out
+
+    def crew_role_member_ids(self, guild: discord.Guild) -> Set[int]:
+        out = set()
+        for role in guild.roles:
+            if role.name in self.crews:
+                out |= self.role_members.get(role.id, set())
         return out
 
+    def members_from_ids(self, member_ids: Iterable[int], guild: Optional[discord.Guild] = None) \
+            -> List[discord.Member]:
+        guild = guild or self.scs
+        members = (guild.get_member(member_id) for member_id in sorted(member_ids))
+        return [member for member in members if member]
+
+    def _reindex_member(self, guild: discord.Guild, member_id: int):
+        self._unindex_member(guild, member_id)
+        member = guild.get_member(member_id)
+        if member:
+            self._index_member(member)
+
+    def _reindex_member_everywhere(self, member_id: int):
+        """A main server member's crew can come from their overflow server roles, so changes on either server
+        re-index both copies."""
+        for guild in (self.scs, self.overflow_server):
+            if guild:
+                self._reindex_member(guild, member_id)
+
+    def member_joined(self, member: discord.Member):
+        if self._tracked(member.guild):
+            self._reindex_member_everywhere(member.id)
+
+    def member_left(self, member: discord.Member):
+        if self._tracked(member.guild):
+            self._reindex_member_everywhere(member.id)
+
+    def member_updated(self, before: discord.Member, after: discord.Member):
+        if not self._tracked(after.guild):
+            return
+        if before.roles != after.roles or before.display_name != after.display_name or before.name != after.name:
+            self._reindex_member_everywhere(after.id)
+
+    def user_updated(self, before: discord.User, after: discord.User):
+        if self.built and before.name != after.name:
+            self._reindex_member_everywhere(after.id)
+
+    def _roles_changed(self, role: discord.Role, names: Iterable[str]):
+        if any(name in self.crews for name in names):
+            for member_id in list(self.role_members.get(role.id, ())):
+                self._reindex_member_everywhere(member_id)
+        self._role_populate()
+        if role.guild == self.scs:
+            self.roles = self.role_factory(self.scs)
+            self.categories = self.category_roles()
+
+    def role_created(self, role: discord.Role):
+        if self._tracked(role.guild):
+            self._roles_changed(role, (role.name,))
+
+    def role_deleted(self, role: discord.Role):
+        if self._tracked(role.guild):
+            self._roles_changed(role, (role.name,))
+
+    def role_updated(self, before: discord.Role, after: discord.Role):
+        if not self._tracked(after.guild):
+            return
+        if before.name != after.name or before.color != after.color or before.position != after.position:
+            self._roles_changed(after, (before.name, after.name))
+
     async def update_crews(self) -> Dict[str, Crew]:
-        creds = None
-        if os.path.exists('token.pickle'):
-            with open('token.pickle', 'rb') as token:
-                creds = pickle.load(token)
-        # If there are no (valid) credentials available, let the user log in.
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    'credentials.json', SCOPES)
-                creds = flow.run_local_server(port=0)
-            # Save the credentials for the next run
-            with open('token.pickle', 'wb') as token:
-                pickle.dump(creds, token)
-
-        service = build('sheets', 'v4', credentials=creds, cache_discovery=False)
-
-        docs_id = '1kZVLo1emzCU7dc4bJrxPxXfgL8Z19YVg1Oy3U6jEwSA'
-        crew_info_range = 'Crew Information!A4:E2160'
-
-        # Call the Sheets API
-        sheet = service.spreadsheets()
-        result = sheet.values().get(spreadsheetId=docs_id,
-                                    range=crew_info_range).execute()
-
-        values = result.get('values', [])
-
-        crews_by_name = {}
-        issues = []
-        if not values:
-            raise ValueError('Crews Sheet Not Found')
-        else:
-            for row in values:
-                while len(row) < 5:
-                    row.append('')
-
-                social = []
-                if row[2]:
-                    for link in row[2].split(' '):
-                        if 'discord.gg' in link or 'smashcrewserver.com' in link:
-                            social.append(f'[Discord]({link})')
-                        elif 'twitter.com' in link:
-                            social.append(f'[Twitter]({link})')
-                        elif 'x.com' in link:
-                            social.append(f'[Twitter]({link})')
-                        elif 'instagram.com' in link:
-                            social.append(f'[Insta]({link})')
-                        elif 'youtube.com' in link:
-                            social.append(f'[Youtube]({link})')
-                        elif len(link) > 4:
-                            social.append(f'[Other]({link})')
-
-                crews_by_name[row[0]] = Crew(name=row[0], abbr=row[1], social=' '.join(social), icon=row[3])
-
-        if issues:
-            issue_string = '\n'.join(issues)
-            await self.channels.doc_keeper.send(
-                f'{self.roles.docs.mention}, there is is an issue with these crews in the docs'
-                f', please fix asap:\n ```{issue_string}```')
-        return crews_by_name
+        values, changed = await self.crew_docs.load()
+        if not changed and self.crews_by_name:
+            return self.crews_by_name
+        return crews_from_rows(values)
 
     def crew_populate(self):
+        for cr in self.crews_by_name.values():
+            cr.leaders, cr.leader_ids, cr.advisors, cr.crew_staff = [], [], [], []
+            cr.member_count = 0
+        self.main_members = {}
+        self.overflow_members = {}
+        self.role_members = {}
+        self.member_crews = {}
+        self.crew_member_ids = {}
+        self.member_index = FuzzyIndex()
+        self._members = {}
+        for member in self.scs.members:
+            self._index_member(member)
+        for member in self.overflow_server.members:
+            self._index_member(member)
+        self._role_populate()
+
+    def _role_populate(self):
         self.non_crew_roles_main = []
         self.non_crew_roles_overflow = []
-        for member in self.scs.members:
-            crew = self._crew(member)
-            if crew:
-                for r2 in member.roles:
-                    if r2.name == LEADER:
-                        self.crews_by_name[crew].leaders.append(str(member))
-                        self.crews_by_name[crew].leader_ids.append(member.id)
-                    if r2.name == ADVISOR:
-                        self.crews_by_name[crew].advisors.append(str(member))
-                    if r2.name == CREW_STAFF:
-                        self.crews_by_name[crew].crew_staff.append(str(member))
+        self.role_index = FuzzyIndex(self.crews_by_name)
+        for cr in self.crews_by_name.values():
+            cr.role_id, cr.color, cr.overflow = -1, discord.Color.default(), False
+        for role in self.scs.roles:
+            self.role_index.add(role.name)
         for role in self.scs.roles:
             if role.name in self.crews_by_name.keys():
                 self.crews_by_name[role.name].color = role.color
@@ -223,6 +448,34 @@ class Cache:
         return None
 
 
+_EXTRA_CREW_ATTRIBUTES = ('destiny_rank', 'ranking_string', 'triforce')
+
+
+def _crew_to_json(cr: Crew) -> Dict:
+    data = dataclasses.asdict(cr)
+    data.update({attribute: getattr(cr, attribute) for attribute in _EXTRA_CREW_ATTRIBUTES})
+    data['color'] = cr.color.value
+    data['last_match'] = cr.last_match.isoformat() if cr.last_match else None
+    return data
+
+
+def _crew_from_json(data: Dict) -> Crew:
+    data = dict(data)
+    extra = {attribute: data.pop(attribute) for attribute in _EXTRA_CREW_ATTRIBUTES if attribute in data}
+    data['color'] = discord.Color(data['color'])
+    if data['last_match']:
+        data['last_match'] = datetime.fromisoformat(data['last_match'])
+    cr = Crew(**data)
+    for attribute, value in extra.items():
+        setattr(cr, attribute, value)
+    return cr
+
+
+def _discard(items: list, value):
+    if value in items:
+        items.remove(value)
+
+
 def parse_from_end(text: str) -> int:
     split = text.split()
     return int(split[-1])
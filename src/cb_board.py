@@ -0,0 +1,94 @@
+import hashlib
+import json
+from typing import Callable, Dict, List, Optional
+
+import discord
+
+from .battle import BattleType
+from .constants import CB_BOARD_HISTORY
+
+
+def embed_hash(embed: discord.Embed) -> str:
+    # battle_summary picks a random color every time, so it is left out
+    content = embed.to_dict()
+    content.pop('color', None)
+    return hashlib.sha1(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+class CbBoard:
+    """Keeps the current_cbs channel showing one message per battle type, edited in place.
+
+    `render(battle_type)` gives the embeds that type should show, none if it has no battles. A refresh only edits
+    messages whose embed changed, sends messages for types that just got battles and deletes the ones for types
+    that no longer have any. The board's messages from before a restart are reused, and messages from anyone else
+    are never touched."""
+
+    def __init__(self, channel: Callable[[], discord.TextChannel],
+                 render: Callable[[BattleType], List[discord.Embed]]):
+        self._channel = channel
+        self._render = render
+        self.messages: Dict[BattleType, List[discord.Message]] = {}
+        self.hashes: Dict[BattleType, List[str]] = {}
+        self._spare: Optional[List[discord.Message]] = None
+        self.edits = self.sends = self.deletes = 0
+
+    async def _adopt(self, channel: discord.TextChannel):
+        me = channel.guild.me
+        self._spare = [message async for message in channel.history(limit=CB_BOARD_HISTORY, oldest_first=True)
+                       if message.author.id == me.id]
+
+    async def _place(self, channel: discord.TextChannel, message: Optional[discord.Message],
+                     embed: discord.Embed) -> discord.Message:
+        if message is None and self._spare:
+            message = self._spare.pop(0)
+        if message is not None:
+            try:
+                await message.edit(content=None, embed=embed)
+                self.edits += 1
+                return message
+            except discord.errors.NotFound:
+                pass
+        self.sends += 1
+        return await channel.send(embed=embed)
+
+    async def _delete(self, message: discord.Message):
+        try:
+            await message.delete()
+        except discord.errors.NotFound:
+            pass
+        self.deletes += 1
+
+    async def refresh(self):
+        channel = self._channel()
+        if channel is None:
+            return
+        if self._spare is None:
+            await self._adopt(channel)
+        for battle_type in BattleType:
+            embeds = self._render(battle_type)
+            hashes = [embed_hash(embed) for embed in embeds]
+            before = self.hashes.get(battle_type, [])
+            if hashes == before:
+                continue
+            messages = self.messages.get(battle_type, [])
+            placed = []
+            try:
+                for i, (embed, content_hash) in enumerate(zip(embeds, hashes)):
+                    message = messages[i] if i < len(messages) else None
+                    if message is not None and i < len(before) and before[i] == content_hash:
+                        placed.append(message)
+                    else:
+                        placed.append(await self._place(channel, message, embed))
+            finally:
+                # Without new hashes a failed type is redone next refresh, onto whatever messages it has now
+                self.messages[battle_type] = placed + messages[len(placed):]
+            for message in messages[len(embeds):]:
+                await self._delete(message)
+            self.messages[battle_type] = placed
+            self.hashes[battle_type] = hashes
+        while self._spare:
+            await self._delete(self._spare.pop())
+
+    def forget(self):
+        """Makes the next refresh edit every message, for when they were changed by hand."""
+        self.hashes.clear()
@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+
+class CoalescingUpdater:
+    """Runs `refresh` at most once per `interval` seconds however often it is marked dirty.
+
+    Marks that land while waiting or refreshing fold into one more refresh, which reads whatever is latest when it
+    runs, so callers never wait on it."""
+
+    def __init__(self, refresh: Callable[[], Awaitable], interval: float, name: str = 'coalesced update'):
+        self._refresh = refresh
+        self.interval = interval
+        self.name = name
+        self.dirty = False
+        self.refreshes = 0
+        self._last = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = asyncio.Lock()
+
+    def mark_dirty(self):
+        self.dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self.dirty:
+            if self._last is not None:
+                delay = self._last + self.interval - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await self._refresh_now()
+
+    async def _refresh_now(self):
+        async with self._running:
+            if not self.dirty:
+                return
+            self.dirty = False
+            self._last = asyncio.get_running_loop().time()
+            self.refreshes += 1
+            try:
+                await self._refresh()
+            except Exception:
+                logging.exception(f'{self.name} failed')
+
+    async def flush(self):
+        """Refreshes right away if anything is pending."""
+        await self._refresh_now()
+
+    def cancel(self):
+        """Drops any pending refresh, for when what it would update is about to go away."""
+        self.dirty = False
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
@@ -0,0 +1,72 @@
+import asyncio
+import time
+from collections import Counter
+from typing import Dict, Set
+
+from src.constants import COMMAND_CACHE_TTL
+from src.db_async import adb
+
+
+class CommandCache:
+    """In memory copy of the disabled channels and deactivated commands, plus command usage counts
+    that are written to the database in batches instead of once per command."""
+
+    def __init__(self, ttl: float = COMMAND_CACHE_TTL):
+        self.ttl = ttl
+        self.disabled: Set[int] = set()
+        self.deactivated: Dict[str, bool] = {}
+        self.usage: Counter = Counter()
+        self._loaded_at = None
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    @property
+    def stale(self) -> bool:
+        return self._loaded_at is None or self._loaded_at + self.ttl < time.monotonic()
+
+    async def refresh(self):
+        async with self._lock:
+            if not self.stale:
+                return
+            disabled = await adb.disabled_channels()
+            deactivated = await adb.command_activations()
+            self.disabled = set(disabled)
+            self.deactivated = deactivated
+            self._loaded_at = time.monotonic()
+
+    async def channel_disabled(self, channel_id: int) -> bool:
+        if self.stale:
+            await self.refresh()
+        return channel_id in self.disabled
+
+    async def command_deactivated(self, command_name: str) -> bool:
+        if self.stale:
+            await self.refresh()
+        return self.deactivated.get(command_name, False)
+
+    async def set_channel_disabled(self, channel_id: int, disabled: bool):
+        if disabled:
+            await adb.add_disabled_channel(channel_id)
+            self.disabled.add(channel_id)
+        else:
+            await adb.remove_disabled_channel(channel_id)
+            self.disabled.discard(channel_id)
+
+    async def set_command_deactivated(self, command_name: str, deactivated: bool):
+        await adb.set_command_activation(command_name, deactivated)
+        self.deactivated[command_name] = deactivated
+
+    def record_use(self, command_name: str):
+        self.usage[command_name] += 1
+
+    async def flush_usage(self):
+        if not self.usage:
+            return
+        counts, self.usage = self.usage, Counter()
+        try:
+            await adb.add_command_uses(counts)
+        except Exception:
+            self.usage.update(counts)
+            raise
@@ -0,0 +1,196 @@
+import bisect
+import collections
+import contextlib
+import contextvars
+import dataclasses
+import functools
+import logging
+import threading
+import time
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from src.constants import PROFILE_BUCKETS_SECONDS, PROFILE_SAMPLES
+
+# Phases every invocation reports, decorator checks add one phase each under their own name
+DB = 'db'
+HTTP = 'discord'
+RENDER = 'render'
+OTHER = 'other'
+
+
+@dataclasses.dataclass
+class Invocation:
+    command: str
+    started: float
+    checks: Dict[str, float] = dataclasses.field(default_factory=dict)
+    phases: Dict[str, float] = dataclasses.field(default_factory=lambda: collections.defaultdict(float))
+    api_calls: int = 0
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] += seconds
+
+
+_invocation: contextvars.ContextVar[Optional[Invocation]] = contextvars.ContextVar('invocation', default=None)
+
+
+def check_passed(name: str, start: float):
+    """Called by a check decorator just before it hands off to the command, `start` being when it was entered."""
+    invocation = _invocation.get()
+    if invocation is not None:
+        invocation.checks[name] = invocation.checks.get(name, 0.0) + time.perf_counter() - start
+
+
+def add_db_time(seconds: float):
+    invocation = _invocation.get()
+    if invocation is not None:
+        invocation.add(DB, seconds)
+
+
+@contextlib.contextmanager
+def phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        invocation = _invocation.get()
+        if invocation is not None:
+            invocation.add(name, time.perf_counter() - start)
+
+
+@dataclasses.dataclass
+class CommandProfile:
+    calls: int = 0
+    errors: int = 0
+    api_calls: int = 0
+    total_seconds: float = 0.0
+    phase_seconds: Dict[str, float] = dataclasses.field(default_factory=lambda: collections.defaultdict(float))
+    # One count per PROFILE_BUCKETS_SECONDS upper bound and a last one for anything slower
+    buckets: List[int] = dataclasses.field(default_factory=lambda: [0] * (len(PROFILE_BUCKETS_SECONDS) + 1))
+    # (finished wall clock time, total seconds) of the latest invocations
+    recent: Deque[Tuple[float, float]] = dataclasses.field(
+        default_factory=lambda: collections.deque(maxlen=PROFILE_SAMPLES))
+
+    def percentile(self, fraction: float, since: float = 0.0) -> Optional[float]:
+        samples = sorted(total for finished, total in self.recent if finished >= since)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+class CommandProfiler:
+    """Latency of every command invocation split into check decorators, db calls, Discord HTTP calls and rendering.
+
+    start and finish are called from the cog's before and after invoke hooks, the parts are reported from wherever
+    they happen through the invocation kept in a context variable, so they only count toward the command whose
+    task made them. Checks are inclusive of any db or HTTP time they spend, `other` is what is left once db, HTTP
+    and rendering time are taken out of the total."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.commands: Dict[str, CommandProfile] = {}
+        # Other parts of the bot add their own lines to /metrics
+        self.collectors: List[Callable[[], List[str]]] = []
+
+    def start(self, command: str):
+        _invocation.set(Invocation(command, time.perf_counter()))
+
+    def finish(self, failed: bool = False) -> Optional[Invocation]:
+        invocation = _invocation.get()
+        if invocation is None:
+            return None
+        _invocation.set(None)
+        total = time.perf_counter() - invocation.started
+        invocation.add(OTHER, max(0.0, total - sum(invocation.phases.values())))
+        with self._lock:
+            profile = self.commands.setdefault(invocation.command, CommandProfile())
+            profile.calls += 1
+            profile.errors += failed
+            profile.api_calls += invocation.api_calls
+            profile.total_seconds += total
+            for name, seconds in list(invocation.phases.items()) + list(invocation.checks.items()):
+                profile.phase_seconds[name] += seconds
+            profile.buckets[bisect.bisect_left(PROFILE_BUCKETS_SECONDS, total)] += 1
+            profile.recent.append((time.time(), total))
+        return invocation
+
+    def instrument_http(self, http):
+        """Times every request a discord.py HTTPClient makes and counts it toward the running command."""
+        request = http.request
+
+        @functools.wraps(request)
+        async def timed_request(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await request(*args, **kwargs)
+            finally:
+                invocation = _invocation.get()
+                if invocation is not None:
+                    invocation.api_calls += 1
+                    invocation.add(HTTP, time.perf_counter() - start)
+
+        http.request = timed_request
+
+    def report(self, limit: int = 10) -> str:
+        hour_ago = time.time() - 60 * 60
+        with self._lock:
+            ranked = sorted(self.commands.items(), key=lambda item: -item[1].total_seconds)[:limit]
+            lines = [f'{"command":<18}{"calls":>6}{"p50":>7}{"p95":>7}{"p95 1h":>8}{"api":>6}  breakdown']
+            for name, profile in ranked:
+                p95_hour = profile.percentile(.95, hour_ago)
+                breakdown = sorted(profile.phase_seconds.items(), key=lambda item: -item[1])[:4]
+                lines.append(
+                    f'{name[:17]:<18}{profile.calls:>6}{profile.percentile(.5) * 1000:>7.0f}'
+                    f'{profile.percentile(.95) * 1000:>7.0f}'
+                    f'{p95_hour * 1000 if p95_hour is not None else 0:>8.0f}'
+                    f'{profile.api_calls / profile.calls:>6.1f}  '
+                    + ' '.join(f'{part} {seconds / profile.total_seconds:.0%}' for part, seconds in breakdown))
+        return '\n'.join(lines)
+
+    def metrics(self) -> str:
+        """Prometheus text exposition of everything recorded since start up."""
+        lines = ['# HELP scs_command_seconds Command latency from before to after invoke.',
+                 '# TYPE scs_command_seconds histogram']
+        with self._lock:
+            profiles = sorted(self.commands.items())
+            for name, profile in profiles:
+                cumulative = 0
+                for bound, count in zip(PROFILE_BUCKETS_SECONDS, profile.buckets):
+                    cumulative += count
+                    lines.append(f'scs_command_seconds_bucket{{command="{name}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'scs_command_seconds_bucket{{command="{name}",le="+Inf"}} {profile.calls}')
+                lines.append(f'scs_command_seconds_sum{{command="{name}"}} {profile.total_seconds:.6f}')
+                lines.append(f'scs_command_seconds_count{{command="{name}"}} {profile.calls}')
+            lines += ['# HELP scs_command_phase_seconds_total Time spent in each part of a command.',
+                      '# TYPE scs_command_phase_seconds_total counter']
+            for name, profile in profiles:
+                for part, seconds in sorted(profile.phase_seconds.items()):
+                    lines.append(f'scs_command_phase_seconds_total{{command="{name}",phase="{part}"}} {seconds:.6f}')
+            lines += ['# HELP scs_discord_api_calls_total Discord HTTP requests made by a command.',
+                      '# TYPE scs_discord_api_calls_total counter']
+            lines += [f'scs_discord_api_calls_total{{command="{name}"}} {profile.api_calls}'
+                      for name, profile in profiles]
+            lines += ['# HELP scs_command_errors_total Invocations that raised.',
+                      '# TYPE scs_command_errors_total counter']
+            lines += [f'scs_command_errors_total{{command="{name}"}} {profile.errors}' for name, profile in profiles]
+        for collect in self.collectors:
+            lines += collect()
+        return '\n'.join(lines) + '\n'
+
+    async def serve_metrics(self, port: int) -> web.AppRunner:
+        """Serves `metrics` at http://127.0.0.1:port/metrics until the returned runner is cleaned up."""
+
+        async def handle(request: web.Request) -> web.Response:
+            return web.Response(text=self.metrics(), content_type='text/plain', charset='utf-8')
+
+        app = web.Application()
+        app.router.add_get('/metrics', handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, '127.0.0.1', port).start()
+        logging.info(f'Serving command metrics on http://127.0.0.1:{port}/metrics')
+        return runner
+
+
+profiler = CommandProfiler()
@@ -5,6 +5,28 @@ from enum import Enum
 load_dotenv()
 CACHE_TIME_SECONDS = 300
 CACHE_TIME_BACKUP = CACHE_TIME_SECONDS + 20  # 320 seconds (This is a backup to normal cache)
+CACHE_RECONCILE_EVERY = 6  # Recaches between full rebuilds, member and role events keep the cache current between them
+RECACHE_PHASE_ALERT_SECONDS = 60  # A recache phase slower than this is called out in recache_logs
+RECACHE_HISTORY = 48  # Recache runs kept for ,recachereport
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 1))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+DB_POOL_TIMEOUT = 30  # Seconds to wait for a free connection before giving up
+DB_EXECUTOR_THREADS = int(os.getenv('DB_EXECUTOR_THREADS', DB_POOL_MAX_SIZE))
+DB_SLOW_QUERY_MS = int(os.getenv('DB_SLOW_QUERY_MS', 250))  # db_helpers calls slower than this go in the slow log
+DB_SLOW_LOG_SIZE = 50
+DB_LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+PROFILE_SAMPLES = 500  # Recent invocations per command kept for percentiles
+PROFILE_BUCKETS_SECONDS = (.05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))  # Serves /metrics on localhost when set
+COMMAND_CACHE_TTL = 600  # Seconds before disabled channels and deactivated commands are re-read
+COMMAND_USAGE_FLUSH_SECONDS = 60
+ROLE_SYNC_PAGE_SIZE = 1000  # Rows per multi-row INSERT when syncing member roles
+CREW_DOCS_SNAPSHOT = 'crew_docs_snapshot.json'
+CREW_DOCS_TIMEOUT = 20  # Seconds to wait on the sheets API before using the snapshot
+CACHE_SNAPSHOT = 'cache_snapshot.json'
+CACHE_SNAPSHOT_MAX_AGE = 24 * 60 * 60  # Older warm start snapshots are ignored
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+MIGRATION_LOCK_ID = 7_355_608  # pg_advisory_lock key held while migrations run
 OVERFLOW_SERVER = 'Overflow Beta' if os.getenv('VERSION') == 'ALPHA' else 'SCS Overflow Server'
 
 TRACK = ['Track 1', 'Track 2', 'Move Locked Next Join']
@@ -62,6 +84,16 @@ SHEET_HISTORY = 'scoresheet_history'
 GAMBIT_ANNOUNCE = 819098161221468200
 GAMBIT_BOT_ID = 813645001271672852
 GAMBIT_ROLE = 'Gambit'
+GAMBIT_RESET_WIN = 220  # Paid for winning a 0 G-Coin bet while bankrupt
+OUTBOUND_CONCURRENCY = 5  # Queued messages in flight at once
+OUTBOUND_CHANNEL_PER_SECOND = 1  # Discord allows 5 messages per 5 seconds in a channel
+OUTBOUND_CHANNEL_BURST = 5
+OUTBOUND_MAX_DEPTH = 2000  # Log lines or DMs waiting past this are dropped, dm_all's never are
+DM_PER_SECOND = 5  # Keeps mass DMs under Discord's spam detection
+DM_PROGRESS_EVERY = 25
+GAMBIT_EDIT_INTERVAL = float(os.getenv('GAMBIT_EDIT_INTERVAL', 5))  # Seconds between announcement embed edits
+CB_BOARD_EDIT_INTERVAL = float(os.getenv('CB_BOARD_EDIT_INTERVAL', 5))  # Seconds between current cbs edits
+CB_BOARD_HISTORY = 50  # Messages looked through for the board's own after a restart
 YES = '✅'
 NO = '⛔'
 NORMAL = '👍'
@@ -171,4 +203,9 @@ TRIFORCE = ['Wisdom', 'Courage', 'Power']
 OPTIONS = ['1️⃣', '2️⃣', '3️⃣', '4️⃣']
 DEFAULT_K = 50
 STARTING_K = 100
-K_CHANGE = 10
\ No newline at end of file
+K_CHANGE = 10
+STARTING_RATING = 1500
+FAKE_CREW_ID = 339  # Stand in opponent for failed registration battles, reset to STARTING_RATING each time
+DECAY_CUTOFFS = (7, 14, 21, 28, 1000)  # Days without a cb before each decay level
+DECAY_ELO_LOSS = (0, DEFAULT_K / 2, DEFAULT_K, DEFAULT_K * 2, 0)
+DECAY_EXEMPT = ('EFB', 'EVIL', 'S~R', 'JettFakes')  # Crew tags that never decay
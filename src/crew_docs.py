@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os.path
+import pickle
+import time
+from typing import Dict, List, Optional, Tuple
+
+from googleapiclient.discovery import build
+from google_auth_oauthlib.flow import InstalledAppFlow
+from google.auth.transport.requests import Request
+
+from .constants import CREW_DOCS_SNAPSHOT, CREW_DOCS_TIMEOUT
+from .crew import Crew
+
+# If modifying these scopes, delete the file token.pickle.
+
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets.readonly']
+DOCS_ID = '1kZVLo1emzCU7dc4bJrxPxXfgL8Z19YVg1Oy3U6jEwSA'
+CREW_INFO_RANGE = 'Crew Information!A4:E2160'
+
+
+def social_links(links: str) -> str:
+    social = []
+    for link in links.split(' '):
+        if 'discord.gg' in link or 'smashcrewserver.com' in link:
+            social.append(f'[Discord]({link})')
+        elif 'twitter.com' in link:
+            social.append(f'[Twitter]({link})')
+        elif 'x.com' in link:
+            social.append(f'[Twitter]({link})')
+        elif 'instagram.com' in link:
+            social.append(f'[Insta]({link})')
+        elif 'youtube.com' in link:
+            social.append(f'[Youtube]({link})')
+        elif len(link) > 4:
+            social.append(f'[Other]({link})')
+    return ' '.join(social)
+
+
+def crews_from_rows(values: List[List[str]]) -> Dict[str, Crew]:
+    crews_by_name = {}
+    for row in values:
+        row = row + [''] * (5 - len(row))
+        social = social_links(row[2]) if row[2] else ''
+        crews_by_name[row[0]] = Crew(name=row[0], abbr=row[1], social=social, icon=row[3])
+    return crews_by_name
+
+
+def values_digest(values: List[List[str]]) -> str:
+    return hashlib.sha256(json.dumps(values, separators=(',', ':')).encode()).hexdigest()
+
+
+class CrewDocsLoader:
+    """Reads the crew information range of the crew docs without blocking the event loop.
+
+    The sheets service is built once and reused, the last good copy of the range is kept on disk and used when
+    the API is down or slower than CREW_DOCS_TIMEOUT, and `load` reports whether anything changed since the last
+    call so callers can skip rebuilding the crews."""
+
+    def __init__(self, snapshot_path: str = CREW_DOCS_SNAPSHOT, timeout: float = CREW_DOCS_TIMEOUT):
+        self.snapshot_path = snapshot_path
+        self.timeout = timeout
+        self.digest: Optional[str] = None
+        self.fetched_at: float = 0
+        self.from_snapshot = False
+        self._creds = None
+        self._service = None
+        self._pending: Optional[asyncio.Future] = None
+        self._lock = asyncio.Lock()
+
+    def _credentials(self):
+        creds = self._creds
+        if not creds and os.path.exists('token.pickle'):
+            with open('token.pickle', 'rb') as token:
+                creds = pickle.load(token)
+        # If there are no (valid) credentials available, let the user log in.
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file(
+                    'credentials.json', SCOPES)
+                creds = flow.run_local_server(port=0)
+            # Save the credentials for the next run
+            with open('token.pickle', 'wb') as token:
+                pickle.dump(creds, token)
+            self._service = None
+        self._creds = creds
+        return creds
+
+    def fetch(self) -> List[List[str]]:
+        creds = self._credentials()
+        if not self._service:
+            self._service = build('sheets', 'v4', credentials=creds, cache_discovery=False)
+        result = self._service.spreadsheets().values().get(spreadsheetId=DOCS_ID, range=CREW_INFO_RANGE).execute()
+        values = result.get('values', [])
+        if not values:
+            raise ValueError('Crews Sheet Not Found')
+        return values
+
+    def read_snapshot(self) -> Optional[List[List[str]]]:
+        if not os.path.exists(self.snapshot_path):
+            return None
+        with open(self.snapshot_path) as snapshot:
+            return json.load(snapshot)['values']
+
+    def write_snapshot(self, values: List[List[str]]):
+        temp_path = f'{self.snapshot_path}.tmp'
+        with open(temp_path, 'w') as snapshot:
+            json.dump({'fetched_at': self.fetched_at, 'values': values}, snapshot)
+        os.replace(temp_path, self.snapshot_path)
+
+    async def load(self) -> Tuple[List[List[str]], bool]:
+        """Returns the crew rows and whether they differ from the rows returned by the previous call."""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            # A fetch that timed out keeps running, the next load waits on it instead of starting another one.
+            if self._pending is None or self._pending.done():
+                self._pending = loop.run_in_executor(None, self.fetch)
+            try:
+                values = await asyncio.wait_for(asyncio.shield(self._pending), self.timeout)
+                self.from_snapshot = False
+            except Exception as error:
+                values = self.read_snapshot()
+                if values is None:
+                    raise
+                logging.warning(f'Crew docs unavailable ({error!r}), using the last good snapshot.')
+                self.from_snapshot = True
+            digest = values_digest(values)
+            changed = digest != self.digest
+            if not self.from_snapshot:
+                self.fetched_at = time.time()
+                if changed:
+                    await loop.run_in_executor(None, self.write_snapshot, values)
+            self.digest = digest
+            return values, changed
@@ -0,0 +1,77 @@
+import asyncio
+import contextvars
+import dataclasses
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from src import db_helpers
+from src.constants import DB_EXECUTOR_THREADS
+
+
+@dataclasses.dataclass
+class CallTiming:
+    calls: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    queued_seconds: float = 0.0
+
+    @property
+    def avg_ms(self) -> float:
+        if not self.calls:
+            return 0.0
+        return self.total_seconds / self.calls * 1000
+
+
+class AsyncDb:
+    """Runs the blocking db_helpers functions on a worker thread pool so coroutines can await them.
+
+    `await adb.member_gcoins(member)` is the awaitable version of `member_gcoins(member)`,
+    `await adb.run(func, ...)` does the same for any other blocking callable."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='db')
+        self.timings: Dict[str, CallTiming] = {}
+
+    def __getattr__(self, name: str) -> Callable:
+        func = getattr(db_helpers, name)
+        if not callable(func):
+            raise AttributeError(f'db_helpers.{name} is not callable.')
+
+        @functools.wraps(func)
+        async def runner(*args, **kwargs):
+            return await self.run(func, *args, **kwargs)
+
+        return runner
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        submitted = time.perf_counter()
+        started = []
+
+        def call():
+            started.append(time.perf_counter())
+            return context.run(func, *args, **kwargs)
+
+        try:
+            return await loop.run_in_executor(self._executor, call)
+        finally:
+            finished = time.perf_counter()
+            begin = started[0] if started else finished
+            self._record(func.__name__, begin - submitted, finished - begin)
+
+    def _record(self, name: str, queued: float, elapsed: float):
+        timing = self.timings.setdefault(name, CallTiming())
+        timing.calls += 1
+        timing.total_seconds += elapsed
+        timing.max_seconds = max(timing.max_seconds, elapsed)
+        timing.queued_seconds += queued
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+adb = AsyncDb(DB_EXECUTOR_THREADS)
@@ -1,19 +1,27 @@
 import datetime
+import io
+import logging
 import os
 import sys
+import time
 import traceback
 from typing import List, Tuple, Optional, Iterable, Dict, Sequence, Any, Mapping, Set, TYPE_CHECKING
 from collections import defaultdict
 
 import discord
 import psycopg2
+import psycopg2.extras
+import psycopg2.sql
 
 from src.battle import Battle, InfoMatch, TimerMatch, ForfeitMatch, BattleType
 from src.character import Character
 from src.crew import Crew, DbCrew
-from src.db_config import config
+from src.db_pool import get_connection, release_connection
+from src.db_stats import db_stats
 from src.elo_helpers import EloPlayer, rating_update
-from src.gambit import Gambit
+from src.elo_replay import EloReplay, ReplayBattle, replay_elo
+from src.gambit import Gambit, Payout, settle_bets
+from src.weight_helpers import replay_weights, weight, weight_changes
 from src.constants import *
 
 if TYPE_CHECKING:
@@ -48,10 +56,8 @@ def add_thanks(user: discord.Member) -> str:
     conn = None
     ret = ''
     try:
-        # read database configuration
-        params = config()
-        # connect to the PostgreSQL database
-        conn = psycopg2.connect(**params)
+        # check a connection out of the pool
+        conn = get_connection()
         # create a new cursor
         cur = conn.cursor()
         # execute the INSERT statement
@@ -74,7 +80,7 @@ def add_thanks(user: discord.Member) -> str:
 
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return ret
 
 
@@ -86,8 +92,7 @@ def thank_board(user: discord.Member) -> discord.Embed:
     conn = None
     desc = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(board)
         leaderboard = cur.fetchmany(10)
@@ -102,86 +107,107 @@ def thank_board(user: discord.Member) -> discord.Embed:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return discord.Embed(title='Top thankers!', color=discord.Color.gold(), description='\n'.join(desc))
 
 
 def add_member_and_roles(member: discord.Member) -> None:
     add_member = """INSERT into members (id, nickname, discord_name)
      values(%s, %s, %s) ON CONFLICT DO NOTHING;"""
-    add_role = """INSERT into roles (id, name, guild_id)
-     values(%s, %s, %s) ON CONFLICT DO NOTHING;"""
-    add_mem_role = """INSERT into current_member_roles (member_id, role_id, gained)
-     values(%s, %s, current_timestamp) ON CONFLICT DO NOTHING;"""
+    add_roles = """INSERT into roles (id, name, guild_id)
+     values %s ON CONFLICT DO NOTHING;"""
+    add_mem_roles = """INSERT into current_member_roles (member_id, role_id, gained)
+     values %s ON CONFLICT DO NOTHING;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(add_member, (member.id, member.display_name, member.name))
-        for role in member.roles:
-            cur.execute(add_role, (role.id, role.name, role.guild.id))
-            cur.execute(add_mem_role, (member.id, role.id))
+        psycopg2.extras.execute_values(cur, add_roles, [(role.id, role.name, role.guild.id) for role in member.roles])
+        psycopg2.extras.execute_values(cur, add_mem_roles, [(member.id, role.id) for role in member.roles],
+                                       template='(%s, %s, current_timestamp)')
         conn.commit()
         cur.close()
     except (Exception, psycopg2.DatabaseError) as error:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
 def update_member_roles(member: discord.Member) -> None:
-    add_member = """INSERT into members (id, nickname, discord_name)
-     values(%s, %s, %s) ON CONFLICT DO NOTHING;"""
-    find_roles = """SELECT roles.id, roles.name from current_member_roles, roles, members 
-                        where members.id = %s 
-                            and current_member_roles.member_id = members.id 
-                            and roles.id = current_member_roles.role_id
-                            and roles.guild_id = %s
-                            and roles.name != '@everyone';"""
-    add_role = """INSERT into roles (id, name, guild_id)
-     values(%s, %s, %s) ON CONFLICT DO NOTHING;"""
-    add_mem_role = """INSERT into current_member_roles (member_id, role_id, gained)
-     values(%s, %s, current_timestamp);"""
-    delete_current = """DELETE FROM current_member_roles 
-        where member_id = %s
-        and role_id = %s
-        returning gained;"""
-
-    add_member_history = """INSERT into member_roles_history (member_id, role_id, gained, lost)
-     values(%s, %s, %s, current_timestamp);"""
-    conn = None
-    try:
-        params = config()
-        conn = psycopg2.connect(**params)
-        cur = conn.cursor()
-        cur.execute(add_member, (member.id, member.display_name, member.name))
-        cur.execute(find_roles, (str(member.id), member.guild.id,))
-        returned = cur.fetchall()
-        expected = set(row[0] for row in returned)
-        actual = set(role.id for role in member.roles if role.name != '@everyone')
-
-        lost = expected - actual
-        gained = actual - expected
-        for role_id in gained:
-            role = member.guild.get_role(role_id)
-            cur.execute(add_role, (role.id, role.name, role.guild.id))
-            cur.execute(add_mem_role, (member.id, role.id))
-        for role_id in lost:
-            cur.execute(delete_current, (member.id, role_id,))
-            gained = cur.fetchone()[0]
-            cur.execute(add_member_history, (member.id, role_id, gained))
-
-        conn.commit()
-        cur.close()
-    except (Exception, psycopg2.DatabaseError) as error:
-        log_error_and_reraise(error)
-    finally:
-        if conn is not None:
-            conn.close()
-    return
+    sync_member_roles((member,))
+
+
+def sync_member_roles(members: Iterable[discord.Member]) -> Tuple[int, int]:
+    """Brings current_member_roles in line with the roles these members have in their guilds, moving lost roles
+    to member_roles_history. Runs the same handful of statements however many members are synced, the member
+    role pairs go in with a single COPY. Returns the number of roles gained and lost."""
+    add_members = """INSERT into members (id, nickname, discord_name)
+     values %s ON CONFLICT DO NOTHING;"""
+    add_roles = """INSERT into roles (id, name, guild_id)
+     values %s ON CONFLICT DO NOTHING;"""
+    create_synced = """CREATE TEMP TABLE synced_roles (member_id bigint, guild_id bigint, role_id bigint)
+     ON COMMIT DROP;"""
+    copy_synced = """COPY synced_roles (member_id, guild_id, role_id) FROM STDIN;"""
+    move_lost = """WITH lost AS (
+        DELETE FROM current_member_roles
+        USING roles, (SELECT DISTINCT member_id, guild_id FROM synced_roles) synced
+        where current_member_roles.member_id = synced.member_id
+            and roles.id = current_member_roles.role_id
+            and roles.guild_id = synced.guild_id
+            and roles.name != '@everyone'
+            and NOT EXISTS (
+                SELECT 1 FROM synced_roles
+                where synced_roles.member_id = current_member_roles.member_id
+                    and synced_roles.role_id = current_member_roles.role_id
+            )
+        returning current_member_roles.member_id, current_member_roles.role_id, current_member_roles.gained)
+    INSERT into member_roles_history (member_id, role_id, gained, lost)
+        SELECT member_id, role_id, gained, current_timestamp FROM lost;"""
+    add_gained = """INSERT into current_member_roles (member_id, role_id, gained)
+        SELECT DISTINCT synced_roles.member_id, synced_roles.role_id, current_timestamp FROM synced_roles
+        where synced_roles.role_id is not NULL
+            and NOT EXISTS (
+                SELECT 1 FROM current_member_roles
+                where current_member_roles.member_id = synced_roles.member_id
+                    and current_member_roles.role_id = synced_roles.role_id
+            );"""
+    member_rows, role_rows, synced = {}, {}, []
+    for member in members:
+        member_rows[member.id] = (member.id, member.display_name, member.name)
+        roles = [role for role in member.roles if role.name != '@everyone']
+        for role in roles:
+            role_rows[role.id] = (role.id, role.name, role.guild.id)
+            synced.append(f'{member.id}\t{member.guild.id}\t{role.id}\n')
+        if not roles:
+            # Keeps a member who lost every role in the sync so their old roles are moved to history.
+            synced.append(f'{member.id}\t{member.guild.id}\t\\N\n')
+    if not member_rows:
+        return 0, 0
+    conn = None
+    gained, lost = 0, 0
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        psycopg2.extras.execute_values(cur, add_members, list(member_rows.values()), page_size=ROLE_SYNC_PAGE_SIZE)
+        if role_rows:
+            psycopg2.extras.execute_values(cur, add_roles, list(role_rows.values()), page_size=ROLE_SYNC_PAGE_SIZE)
+        cur.execute(create_synced)
+        cur.copy_expert(copy_synced, io.StringIO(''.join(synced)))
+        cur.execute(move_lost)
+        lost = cur.rowcount
+        cur.execute(add_gained)
+        gained = cur.rowcount
+        conn.commit()
+        cur.close()
+    except (Exception, psycopg2.DatabaseError) as error:
+        log_error_and_reraise(error)
+    finally:
+        if conn is not None:
+            release_connection(conn)
+    return gained, lost
 
 
 def add_member_and_crew(member: discord.Member, crew: Crew) -> None:
@@ -202,8 +228,7 @@ def add_member_and_crew(member: discord.Member, crew: Crew) -> None:
 
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(add_member, (member.id, member.display_name, member.name))
 
@@ -223,7 +248,7 @@ def add_member_and_crew(member: discord.Member, crew: Crew) -> None:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -236,8 +261,7 @@ def new_crew(crew: Crew):
 
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
 
         cur.execute(add_crew, (crew.role_id, crew.name, crew.abbr, crew.overflow, crew.name))
@@ -247,7 +271,7 @@ def new_crew(crew: Crew):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -261,8 +285,7 @@ def find_member_roles(member: discord.Member) -> List[str]:
     conn = None
     everything = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(roles, (str(member.id), member.guild.id,))
         everything = [row[0] for row in cur.fetchall()]
@@ -272,7 +295,7 @@ def find_member_roles(member: discord.Member) -> List[str]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return everything
 
 
@@ -285,8 +308,7 @@ def all_member_roles(member_id: int) -> List[int]:
     conn = None
     everything = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(roles, (str(member_id),))
         everything = [row[0] for row in cur.fetchall()]
@@ -296,7 +318,7 @@ def all_member_roles(member_id: int) -> List[int]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return everything
 
 
@@ -310,8 +332,7 @@ def remove_member_role(member_id: int, role_id: int) -> None:
      values(%s, %s, %s, current_timestamp);"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
 
         cur.execute(delete_current, (member_id, role_id,))
@@ -325,7 +346,7 @@ def remove_member_role(member_id: int, role_id: int) -> None:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -334,8 +355,7 @@ def add_member_role(member_id: int, role_id: int) -> None:
      values(%s, %s, current_timestamp);"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
 
         cur.execute(add_mem_role, (member_id, role_id,))
@@ -345,7 +365,7 @@ def add_member_role(member_id: int, role_id: int) -> None:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -375,8 +395,7 @@ def id_from_crew(cr: Crew) -> int:
     cr_id = 0
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_role_id(cr.role_id, cur)
         if not cr_id:
@@ -387,7 +406,7 @@ def id_from_crew(cr: Crew) -> int:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return cr_id
 
 
@@ -399,8 +418,7 @@ def add_character(name: str):
         );"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(add_char, (name, name))
         conn.commit()
@@ -409,7 +427,7 @@ def add_character(name: str):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -420,66 +438,150 @@ def char_id_from_name(name: str, cursor) -> int:
     return char_id
 
 
+def _track_last_battle(battle_id: int, cur):
+    newer = """insert into crew_last_battle (crew_id, league_id, battle_id)
+    select distinct sides.crew_id, battle.league_id, battle.id
+    from battle,
+         lateral (values (battle.crew_1), (battle.crew_2)) as sides(crew_id)
+    where battle.id = %s
+      and sides.crew_id is not null
+    on conflict (crew_id, league_id) do update set battle_id = excluded.battle_id
+        where crew_last_battle.battle_id < excluded.battle_id;"""
+    cur.execute(newer, (battle_id,))
+
+
+def _untrack_last_battle(battle_id: int, cur):
+    """Run once the battle is deleted, points its crews back at their newest remaining battle in that league."""
+    forget = """delete from crew_last_battle where battle_id = %s returning crew_id, league_id;"""
+    previous = """insert into crew_last_battle (crew_id, league_id, battle_id)
+    select distinct on (sides.crew_id) sides.crew_id, battle.league_id, battle.id
+    from battle,
+         lateral (values (battle.crew_1), (battle.crew_2)) as sides(crew_id)
+    where battle.league_id = %s
+      and sides.crew_id = any(%s)
+    order by sides.crew_id, battle.id desc
+    on conflict (crew_id, league_id) do nothing;"""
+    cur.execute(forget, (battle_id,))
+    forgotten = defaultdict(list)
+    for crew_id, league_id in cur.fetchall():
+        forgotten[league_id].append(crew_id)
+    for league_id, crew_ids in forgotten.items():
+        cur.execute(previous, (league_id, crew_ids))
+
+
+_fighter_ids: Dict[str, int] = {}
+
+
+def fighter_ids(names: Iterable[str], cursor) -> Dict[str, int]:
+    """Fighter ids by name from a map loaded once per process, the map is only reloaded when a name is missing."""
+    names = set(names)
+    if not names <= _fighter_ids.keys():
+        cursor.execute("""SELECT name, id from fighters;""")
+        _fighter_ids.update(cursor.fetchall())
+    return {name: _fighter_ids[name] for name in names}
+
+
+def crew_ids_from_names(names: Iterable[str], cursor) -> Dict[str, int]:
+    cursor.execute("""SELECT name, id from crews where name = any(%s);""", (list(set(names)),))
+    return dict(cursor.fetchall())
+
+
 def add_finished_battle(battle: Battle, link: str, league: int) -> int:
+    conn = None
+    battle_id = -1
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        battle_id = _add_finished_battle(battle, link, league, cur)
+        conn.commit()
+        cur.close()
+    except (Exception, psycopg2.DatabaseError) as error:
+        log_error_and_reraise(error)
+    finally:
+        if conn is not None:
+            release_connection(conn)
+    return battle_id
+
+
+def _add_finished_battle(battle: Battle, link: str, league: int, cur) -> int:
     add_battle = """INSERT into battle (crew_1, crew_2, final_score, link, winner, finished, league_id, mvps, players)
      values(%s, %s, %s, %s, %s, current_timestamp, %s, %s, %s)  RETURNING id;"""
     add_member_stats = """
-            insert into member_stats(member_id) values (%s) on conflict do nothing;"""
+            insert into member_stats(member_id) select unnest(%s::bigint[]) on conflict do nothing;"""
     add_mvp = """
-        update member_stats set mvps = mvps + 1 where member_id = %s;
+        update member_stats set mvps = mvps + 1 where member_id = any(%s);
     """
-    add_match = """INSERT into match (p1, p2, p1_taken, p2_taken, winner, battle_id, p1_char_id, p2_char_id, match_order)
-     values(%s, %s, %s, %s, %s, %s, %s, %s, %s);"""
+    add_matches = """INSERT into match (p1, p2, p1_taken, p2_taken, winner, battle_id, p1_char_id, p2_char_id, match_order)
+     values %s;"""
+
+    played = [(order, match) for order, match in enumerate(battle.matches)
+              if not isinstance(match, (TimerMatch, InfoMatch, ForfeitMatch))]
+    crew_ids = crew_ids_from_names((battle.team1.name, battle.team2.name), cur)
+    char_ids = fighter_ids([match.p1.char.base for _, match in played] + [match.p2.char.base for _, match in played],
+                           cur)
+    mvps = [mvp.id for mvp in battle.team1.mvp() + battle.team2.mvp()]
+    if mvps:
+        cur.execute(add_member_stats, (mvps,))
+        cur.execute(add_mvp, (mvps,))
+    cur.execute(add_battle, (
+        crew_ids.get(battle.team1.name),
+        crew_ids.get(battle.team2.name),
+        battle.winner().stocks,
+        link,
+        crew_ids.get(battle.winner().name),
+        league,
+        mvps,
+        battle.team1.num_players,
+    ))
+    battle_id = cur.fetchone()[0]
+    _track_last_battle(battle_id, cur)
+    psycopg2.extras.execute_values(cur, add_matches, [(
+        match.p1.id,
+        match.p2.id,
+        match.p1_taken,
+        match.p2_taken,
+        match.p1.id if match.winner == 1 else match.p2.id,
+        battle_id,
+        char_ids[match.p1.char.base],
+        char_ids[match.p2.char.base],
+        order
+    ) for order, match in played])
+    return battle_id
 
-    update_view = """refresh MATERIALIZED view crew_stats;"""
 
+def record_battle(battle: Battle, link: str, league: int, elo: bool = False) -> Tuple[
+        int, Optional[Tuple[int, int, int, int, int, int, int, int]]]:
+    """add_finished_battle, battle_weight_changes and (if `elo`) battle_elo_changes in one transaction, so a
+    confirmed battle is either fully recorded or not at all. Returns the battle id and the elo changes."""
     conn = None
-    battle_id = -1
+    battle_id, elo_changes = -1, None
+    stages = {}
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
-
-        mvps = []
-        for mvp in battle.team1.mvp() + battle.team2.mvp():
-            mvps.append(mvp.id)
-            cur.execute(add_member_stats, (mvp.id,))
-            cur.execute(add_mvp, (mvp.id,))
-        cur.execute(add_battle, (
-            crew_id_from_name(battle.team1.name, cur),
-            crew_id_from_name(battle.team2.name, cur),
-            battle.winner().stocks,
-            link,
-            crew_id_from_name(battle.winner().name, cur),
-            league,
-            mvps,
-            battle.team1.num_players,
-        ))
-        battle_id = cur.fetchone()[0]
-        for order, match in enumerate(battle.matches):
-            if isinstance(match, TimerMatch) or isinstance(match, InfoMatch) or isinstance(match, ForfeitMatch):
-                continue
-            winner_id = match.p1.id if match.winner == 1 else match.p2.id
-            cur.execute(add_match, (
-                match.p1.id,
-                match.p2.id,
-                match.p1_taken,
-                match.p2_taken,
-                winner_id,
-                battle_id,
-                char_id_from_name(match.p1.char.base, cur),
-                char_id_from_name(match.p2.char.base, cur),
-                order
-            ))
-        # cur.execute(update_view)
+        start = time.perf_counter()
+        battle_id = _add_finished_battle(battle, link, league, cur)
+        stages['battle'] = time.perf_counter()
+        _battle_weight_changes(battle_id, cur, 'member_season_stats')
+        _battle_weight_changes(battle_id, cur, 'member_stats')
+        stages['weights'] = time.perf_counter()
+        if elo:
+            elo_changes = _battle_elo_changes(battle_id, cur)
+            stages['elo'] = time.perf_counter()
         conn.commit()
+        stages['commit'] = time.perf_counter()
         cur.close()
+        timings = []
+        for stage, finished in stages.items():
+            timings.append(f'{stage} {(finished - start) * 1000:.1f} ms')
+            start = finished
+        logging.info(f'Recorded battle {battle_id}: ' + ', '.join(timings))
     except (Exception, psycopg2.DatabaseError) as error:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
-    return battle_id
+            release_connection(conn)
+    return battle_id, elo_changes
 
 
 def add_non_ss_battle(winner: Crew, loser: Crew, size: int, score: int, link: str, league: int) -> int:
@@ -490,8 +592,7 @@ def add_non_ss_battle(winner: Crew, loser: Crew, size: int, score: int, link: st
     conn = None
     battle_id = -1
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(add_battle, (
             crew_id_from_crews(winner, cur),
@@ -503,6 +604,7 @@ def add_non_ss_battle(winner: Crew, loser: Crew, size: int, score: int, link: st
             size,
         ))
         battle_id = cur.fetchone()[0]
+        _track_last_battle(battle_id, cur)
         # cur.execute(update_view)
         conn.commit()
         cur.close()
@@ -510,7 +612,7 @@ def add_non_ss_battle(winner: Crew, loser: Crew, size: int, score: int, link: st
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return battle_id
 
 
@@ -520,8 +622,7 @@ def add_failed_reg_battle(winner: Crew, size: int, score: int, link: str, league
     conn = None
     battle_id = -1
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(add_battle, (
             crew_id_from_crews(winner, cur),
@@ -533,13 +634,14 @@ def add_failed_reg_battle(winner: Crew, size: int, score: int, link: str, league
             size,
         ))
         battle_id = cur.fetchone()[0]
+        _track_last_battle(battle_id, cur)
         conn.commit()
         cur.close()
     except (Exception, psycopg2.DatabaseError) as error:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return battle_id
 
 
@@ -549,8 +651,7 @@ def add_weird_reg_battle(loser: Crew, size: int, score: int, link: str, league:
     conn = None
     battle_id = -1
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(add_battle, (
             crew_id_from_crews(loser, cur),
@@ -562,18 +663,36 @@ def add_weird_reg_battle(loser: Crew, size: int, score: int, link: str, league:
             size,
         ))
         battle_id = cur.fetchone()[0]
+        _track_last_battle(battle_id, cur)
         conn.commit()
         cur.close()
     except (Exception, psycopg2.DatabaseError) as error:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return battle_id
 
 
 def battle_elo_changes(battle_id: int, forfeit=False) -> Tuple[
     int, int, int, int, int, int, int, int]:
+    elo = 0, 0, 0, 0, 0, 0, 0, 0
+    conn = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        elo = _battle_elo_changes(battle_id, cur, forfeit)
+        conn.commit()
+        cur.close()
+    except (Exception, psycopg2.DatabaseError) as error:
+        log_error_and_reraise(error)
+    finally:
+        if conn is not None:
+            release_connection(conn)
+    return elo
+
+
+def _battle_elo_changes(battle_id: int, cur, forfeit=False) -> Tuple[int, int, int, int, int, int, int, int]:
     find_battle = """
      select winner,
        Case
@@ -599,267 +718,148 @@ values (%s, %s, %s, %s, %s);"""
     set_crew_rating_forfeit = """update crew_ratings
     set rating = %s
         where crew_id = %s and league_id = %s;"""
-    winner_elo, winner_change, loser_elo, loser_change, d_winner_change, d_final, winner_k, loser_k = 0, 0, 0, 0, 0, 0, 0, 0
-    conn = None
-    try:
-        params = config()
-        conn = psycopg2.connect(**params)
-        cur = conn.cursor()
-        # Find the battle
-        cur.execute(find_battle, (battle_id,))
-        winner, loser, league_id = cur.fetchone()
-        # Get the winner rating
-        cur.execute(crew_rating, (winner, league_id, winner, league_id))
-        winner_elo, winner_k = cur.fetchone()
-        winner_player = EloPlayer(winner, winner_elo, winner_k)
-        # Get the loser rating
-        cur.execute(crew_rating, (loser, league_id, loser, league_id))
-        loser_elo, loser_k = cur.fetchone()
-        # Losers have default K
-        loser_player = EloPlayer(loser, loser_elo, DEFAULT_K)
-        # Calculate changes
-        winner_change, loser_change = rating_update(winner_player, loser_player, 1)
-
-        # Add battle results
-        winner_new_elo = winner_elo + winner_change
-        cur.execute(battle_rating, (battle_id, winner, winner_elo, winner_new_elo, league_id))
-        loser_new_elo = loser_elo + loser_change
-        cur.execute(battle_rating, (battle_id, loser, loser_elo, loser_new_elo, league_id))
-        # Update team ratings
-        if forfeit:
-            cur.execute(set_crew_rating_forfeit, (winner_new_elo, winner, league_id))
-            cur.execute(set_crew_rating_forfeit, (loser_new_elo, loser, league_id))
-        else:
-            cur.execute(set_crew_rating, (winner_new_elo, K_CHANGE, DEFAULT_K, winner, league_id))
-            cur.execute(set_crew_rating, (loser_new_elo, K_CHANGE, DEFAULT_K, loser, league_id))
-
-        conn.commit()
-        cur.close()
-    except (Exception, psycopg2.DatabaseError) as error:
-        log_error_and_reraise(error)
-    finally:
-        if conn is not None:
-            conn.close()
+    d_winner_change, d_final = 0, 0
+    # Find the battle
+    cur.execute(find_battle, (battle_id,))
+    winner, loser, league_id = cur.fetchone()
+    # Get the winner rating
+    cur.execute(crew_rating, (winner, league_id, winner, league_id))
+    winner_elo, winner_k = cur.fetchone()
+    winner_player = EloPlayer(winner, winner_elo, winner_k)
+    # Get the loser rating
+    cur.execute(crew_rating, (loser, league_id, loser, league_id))
+    loser_elo, loser_k = cur.fetchone()
+    # Losers have default K
+    loser_player = EloPlayer(loser, loser_elo, DEFAULT_K)
+    # Calculate changes
+    winner_change, loser_change = rating_update(winner_player, loser_player, 1)
+
+    # Add battle results
+    winner_new_elo = winner_elo + winner_change
+    cur.execute(battle_rating, (battle_id, winner, winner_elo, winner_new_elo, league_id))
+    loser_new_elo = loser_elo + loser_change
+    cur.execute(battle_rating, (battle_id, loser, loser_elo, loser_new_elo, league_id))
+    # Update team ratings
+    if forfeit:
+        cur.execute(set_crew_rating_forfeit, (winner_new_elo, winner, league_id))
+        cur.execute(set_crew_rating_forfeit, (loser_new_elo, loser, league_id))
+    else:
+        cur.execute(set_crew_rating, (winner_new_elo, K_CHANGE, DEFAULT_K, winner, league_id))
+        cur.execute(set_crew_rating, (loser_new_elo, K_CHANGE, DEFAULT_K, loser, league_id))
     return winner_elo, winner_change, loser_elo, loser_change, d_winner_change, d_final, winner_k, loser_k
 
 
 def battle_weight_changes(battle_id: int, reverse: bool = False, season: bool = False):
-    # TODO modify this to handle MC/BF matches
-    find_matches = """select p1, p2, p1_taken, p2_taken from match where battle_id = %s;"""
-    mvps = """select mvps from battle where id = %s;"""
-    current_weight = """
-    with current as (
-        insert into member_stats(member_id) values (%s) on conflict do nothing returning weighted_taken, lost)
-    select  greatest(weighted_taken, 1) as weighted_taken, greatest(lost, 1) as lost from current
-    union all
-    select greatest(weighted_taken, 1) as weighted_taken, greatest(lost, 1) as lost from member_stats where member_id = %s;"""
-
-    update_weight = """update member_stats set weighted_taken = weighted_taken + %s, taken = taken + %s,
-        lost = lost + %s, played  = played + %s, mvps = mvps + %s
-        where member_id = %s;"""
     conn = None
-    battle_weight_changes_season(battle_id, reverse)
-    if season:
-        return
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
-        cur = conn.cursor()
-        # Find the matches
-        cur.execute(find_matches, (battle_id,))
-        matches = cur.fetchall()
-        # Get each performance
-        player_weights = {}
-        player_taken = defaultdict(int)
-        player_weighted_taken = defaultdict(int)
-        player_lost = defaultdict(int)
-        for p1, p2, p1_taken, p2_taken in matches:
-            if p1 not in player_weights:
-                cur.execute(current_weight, (p1, p1))
-                ret = cur.fetchone()
-                if ret:
-                    player_weights[p1] = ret[0] / ret[1]
-            if p2 not in player_weights:
-                cur.execute(current_weight, (p2, p2))
-                ret = cur.fetchone()
-                if ret:
-                    player_weights[p2] = ret[0] / ret[1]
-            if reverse:
-                player_taken[p1] -= p1_taken
-                player_taken[p2] -= p2_taken
-                player_weighted_taken[p1] -= p1_taken * player_weights[p2]
-                player_lost[p1] -= p2_taken
-                player_weighted_taken[p2] -= p2_taken * player_weights[p1]
-                player_lost[p2] -= p1_taken
-            else:
-                player_taken[p1] += p1_taken
-                player_taken[p2] += p2_taken
-                player_weighted_taken[p1] += p1_taken * player_weights[p2]
-                player_lost[p1] += p2_taken
-                player_weighted_taken[p2] += p2_taken * player_weights[p1]
-                player_lost[p2] += p1_taken
-
-        played = 0 if reverse else 1
-        cur.execute(mvps, (battle_id,))
-        mvp_list = cur.fetchone()[0]
-
-        for player in player_taken:
-            mvp = 1 if player in mvp_list else 0
-            cur.execute(update_weight,
-                        (player_weighted_taken[player], player_taken[player], player_lost[player], played, mvp, player))
-
+        conn = get_connection()
+        cur = conn.cursor()
+        _battle_weight_changes(battle_id, cur, 'member_season_stats', reverse)
+        if not season:
+            _battle_weight_changes(battle_id, cur, 'member_stats', reverse)
         conn.commit()
         cur.close()
     except (Exception, psycopg2.DatabaseError) as error:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
 def battle_weight_changes_season(battle_id: int, reverse: bool = False):
+    battle_weight_changes(battle_id, reverse, season=True)
+
+
+def _battle_weight_changes(battle_id: int, cur, stats_table: str, reverse: bool = False):
     # TODO modify this to handle MC/BF matches
+    stats = psycopg2.sql.Identifier(stats_table)
     find_matches = """select p1, p2, p1_taken, p2_taken from match where battle_id = %s;"""
     mvps = """select mvps from battle where id = %s;"""
-    current_weight = """
-    with current as (
-        insert into member_season_stats(member_id) values (%s) on conflict do nothing returning weighted_taken, lost)
-    select  greatest(weighted_taken, 1) as weighted_taken, greatest(lost, 1) as lost from current
-    union all
-    select greatest(weighted_taken, 1) as weighted_taken, greatest(lost, 1) as lost from member_season_stats where member_id = %s;"""
-
-    update_weight = """update member_season_stats set weighted_taken = weighted_taken + %s, taken = taken + %s,
-        lost = lost + %s, played  = played + %s, mvps = mvps + %s
-        where member_id = %s;"""
-    conn = None
-    try:
-        params = config()
-        conn = psycopg2.connect(**params)
-        cur = conn.cursor()
-        # Find the matches
-        cur.execute(find_matches, (battle_id,))
-        matches = cur.fetchall()
-        # Get each performance
-        player_weights = {}
-        player_taken = defaultdict(int)
-        player_weighted_taken = defaultdict(int)
-        player_lost = defaultdict(int)
-        for p1, p2, p1_taken, p2_taken in matches:
-            if p1 not in player_weights:
-                cur.execute(current_weight, (p1, p1))
-                ret = cur.fetchone()
-                if ret:
-                    player_weights[p1] = ret[0] / ret[1]
-            if p2 not in player_weights:
-                cur.execute(current_weight, (p2, p2))
-                ret = cur.fetchone()
-                if ret:
-                    player_weights[p2] = ret[0] / ret[1]
-            if reverse:
-                player_taken[p1] -= p1_taken
-                player_taken[p2] -= p2_taken
-                player_weighted_taken[p1] -= p1_taken * player_weights[p2]
-                player_lost[p1] -= p2_taken
-                player_weighted_taken[p2] -= p2_taken * player_weights[p1]
-                player_lost[p2] -= p1_taken
-            else:
-                player_taken[p1] += p1_taken
-                player_taken[p2] += p2_taken
-                player_weighted_taken[p1] += p1_taken * player_weights[p2]
-                player_lost[p1] += p2_taken
-                player_weighted_taken[p2] += p2_taken * player_weights[p1]
-                player_lost[p2] += p1_taken
+    add_stats = psycopg2.sql.SQL("""
+        insert into {stats}(member_id) select unnest(%s::bigint[]) on conflict do nothing;""").format(stats=stats)
+    current_weights = psycopg2.sql.SQL("""
+    select member_id, weighted_taken, lost from {stats} where member_id = any(%s);""").format(stats=stats)
+    update_weights = psycopg2.sql.SQL("""update {stats} set weighted_taken = {stats}.weighted_taken + v.weighted_taken,
+        taken = {stats}.taken + v.taken, lost = {stats}.lost + v.lost, played = {stats}.played + v.played,
+        mvps = {stats}.mvps + v.mvps
+        from (values %s) as v(member_id, weighted_taken, taken, lost, played, mvps)
+        where {stats}.member_id = v.member_id;""").format(stats=stats)
+    # Find the matches
+    cur.execute(find_matches, (battle_id,))
+    matches = cur.fetchall()
+    players = list({player for match in matches for player in match[:2]})
+    if not players:
+        return
+    # Get every weight at once
+    cur.execute(add_stats, (players,))
+    cur.execute(current_weights, (players,))
+    weights = {member_id: weight(weighted_taken, lost) for member_id, weighted_taken, lost in cur.fetchall()}
+    changes = weight_changes(matches, weights, reverse)
 
-        played = 0 if reverse else 1
-        cur.execute(mvps, (battle_id,))
-        mvp_list = cur.fetchone()[0]
+    played = 0 if reverse else 1
+    cur.execute(mvps, (battle_id,))
+    mvp_list = cur.fetchone()[0] or []
+    psycopg2.extras.execute_values(cur, update_weights.as_string(cur), [
+        (player, change.weighted_taken, change.taken, change.lost, played, 1 if player in mvp_list else 0)
+        for player, change in changes.items()], template='(%s, %s::float8, %s, %s, %s, %s)')
 
-        for player in player_taken:
-            mvp = 1 if player in mvp_list else 0
-            cur.execute(update_weight,
-                        (player_weighted_taken[player], player_taken[player], player_lost[player], played, mvp, player))
 
+def master_weight_changes(battle_id: int, reverse: bool = False):
+    conn = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        _battle_weight_changes(battle_id, cur, 'master_member_stats', reverse)
         conn.commit()
         cur.close()
     except (Exception, psycopg2.DatabaseError) as error:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
-def master_weight_changes(battle_id: int, reverse: bool = False):
-    find_matches = """select p1, p2, p1_taken, p2_taken from match where battle_id = %s;"""
-    mvps = """select mvps from battle where id = %s;"""
-    current_weight = """
-    with current as (
-        insert into master_member_stats(member_id) values (%s) on conflict do nothing returning weighted_taken, lost)
-    select  greatest(weighted_taken, 1) as weighted_taken, greatest(lost, 1) as lost from current
-    union all
-    select greatest(weighted_taken, 1) as weighted_taken, greatest(lost, 1) as lost from master_member_stats where member_id = %s;"""
-
-    update_weight = """update master_member_stats set weighted_taken = weighted_taken + %s, taken = taken + %s,
-        lost = lost + %s, played  = played + %s, mvps = mvps + %s
-        where member_id = %s;"""
+def recompute_member_stats(league_ids: Sequence[int], stats_table: str = 'member_season_stats') -> int:
+    """Rebuilds weighted_taken, taken, lost and played in `stats_table` from the match history of these leagues,
+    replaying the battles in order in memory instead of one battle_weight_changes call each. Every row of the
+    table is reset first, so pass all the leagues the table covers. Returns the number of players written."""
+    stats = psycopg2.sql.Identifier(stats_table)
+    find_matches = """select match.battle_id, p1, p2, p1_taken, p2_taken from match, battle
+        where battle.id = match.battle_id and battle.league_id = any(%s)
+        order by match.battle_id;"""
+    reset_stats = psycopg2.sql.SQL("""update {stats} set weighted_taken = 0, taken = 0, lost = 0, played = 0;""").format(
+        stats=stats)
+    add_stats = psycopg2.sql.SQL("""
+        insert into {stats}(member_id) select unnest(%s::bigint[]) on conflict do nothing;""").format(stats=stats)
+    set_stats = psycopg2.sql.SQL("""update {stats} set weighted_taken = v.weighted_taken, taken = v.taken,
+        lost = v.lost, played = v.played
+        from (values %s) as v(member_id, weighted_taken, taken, lost, played)
+        where {stats}.member_id = v.member_id;""").format(stats=stats)
     conn = None
+    players = {}
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
-        cur = conn.cursor()
-        # Find the matches
-        cur.execute(find_matches, (battle_id,))
-        matches = cur.fetchall()
-        # Get each performance
-        player_weights = {}
-        player_taken = defaultdict(int)
-        player_weighted_taken = defaultdict(int)
-        player_lost = defaultdict(int)
-        for p1, p2, p1_taken, p2_taken in matches:
-            if p1 not in player_weights:
-                cur.execute(current_weight, (p1, p1))
-                ret = cur.fetchone()
-                if ret:
-                    player_weights[p1] = ret[0] / ret[1]
-            if p2 not in player_weights:
-                cur.execute(current_weight, (p2, p2))
-                ret = cur.fetchone()
-                if ret:
-                    player_weights[p2] = ret[0] / ret[1]
-            if reverse:
-                player_taken[p1] -= p1_taken
-                player_taken[p2] -= p2_taken
-                player_weighted_taken[p1] -= p1_taken * player_weights[p2]
-                player_lost[p1] -= p2_taken
-                player_weighted_taken[p2] -= p2_taken * player_weights[p1]
-                player_lost[p2] -= p1_taken
-            else:
-                player_taken[p1] += p1_taken
-                player_taken[p2] += p2_taken
-                player_weighted_taken[p1] += p1_taken * player_weights[p2]
-                player_lost[p1] += p2_taken
-                player_weighted_taken[p2] += p2_taken * player_weights[p1]
-                player_lost[p2] += p1_taken
-
-        played = 0 if reverse else 1
-
-        cur.execute(mvps, (battle_id,))
-        mvp_list = cur.fetchone()[0]
-
-        for player in player_taken:
-            mvp = 1 if player in mvp_list else 0
-            cur.execute(update_weight,
-                        (player_weighted_taken[player], player_taken[player], player_lost[player], played, mvp, player))
-
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute(find_matches, (list(league_ids),))
+        battles = defaultdict(list)
+        for battle_id, p1, p2, p1_taken, p2_taken in cur.fetchall():
+            battles[battle_id].append((p1, p2, p1_taken, p2_taken))
+        players = replay_weights(battles.values())
+        cur.execute(reset_stats)
+        cur.execute(add_stats, (list(players),))
+        psycopg2.extras.execute_values(cur, set_stats.as_string(cur), [
+            (player, totals.weighted_taken, totals.taken, totals.lost, totals.played)
+            for player, totals in players.items()], template='(%s, %s::float8, %s, %s, %s)', page_size=1000)
         conn.commit()
         cur.close()
     except (Exception, psycopg2.DatabaseError) as error:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
-    return
+            release_connection(conn)
+    return len(players)
 
 
 def power_rankings() -> List[Tuple[str, int, int, int]]:
@@ -877,8 +877,7 @@ order by tf_group, coalesce(wins,0)desc;"""
     conn = None
     ids = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(everything)
         ids = cur.fetchall()
@@ -888,7 +887,7 @@ order by tf_group, coalesce(wins,0)desc;"""
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return ids
 
 
@@ -907,8 +906,7 @@ order by tf_group, coalesce(wins,0)desc;"""
     conn = None
     ids = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(everything)
         ids = cur.fetchall()
@@ -918,7 +916,7 @@ order by tf_group, coalesce(wins,0)desc;"""
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return ids
 
 
@@ -934,8 +932,7 @@ order by rating desc;"""
     conn = None
     ids = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(everything, (CURRENT_LEAGUE_ID,))
         ids = cur.fetchall()
@@ -945,7 +942,7 @@ order by rating desc;"""
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return ids
 
 
@@ -954,8 +951,7 @@ def all_battle_ids() -> Sequence[int]:
     conn = None
     ids = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(everything)
         ids = cur.fetchall()
@@ -965,7 +961,7 @@ def all_battle_ids() -> Sequence[int]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return ids
 
 
@@ -974,8 +970,7 @@ def crews_by_rating() -> Sequence[int]:
     conn = None
     ids = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(everything)
         ids = cur.fetchall()
@@ -985,7 +980,7 @@ def crews_by_rating() -> Sequence[int]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return ids
 
 
@@ -993,8 +988,7 @@ def destiny_pair(cr1_id: int, cr2_id: int):
     pair = """update destiny_gain set opponent = %s where crew_id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(pair, (cr1_id, cr2_id))
         cur.execute(pair, (cr2_id, cr1_id))
@@ -1004,7 +998,7 @@ def destiny_pair(cr1_id: int, cr2_id: int):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -1012,8 +1006,7 @@ def destiny_opt(cr_id: int, out: bool):
     pair = """update destiny_gain set opt_out = %s where crew_id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(pair, (out, cr_id))
         conn.commit()
@@ -1022,7 +1015,7 @@ def destiny_opt(cr_id: int, out: bool):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -1030,8 +1023,7 @@ def destiny_unpair(cr1_id: int, cr2_id: int):
     pair = """update destiny_gain set opponent = null where crew_id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(pair, (cr1_id,))
         cur.execute(pair, (cr2_id,))
@@ -1041,7 +1033,7 @@ def destiny_unpair(cr1_id: int, cr2_id: int):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -1051,8 +1043,7 @@ def current_league_name() -> Tuple[str, datetime.date, bool]:
 """
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(league_name)
         ret = cur.fetchone()
@@ -1065,7 +1056,7 @@ def current_league_name() -> Tuple[str, datetime.date, bool]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return name, start_date,reset
 
 
@@ -1074,8 +1065,7 @@ def destiny_result(winner_id: int, loser_id: int):
     winner = """update destiny_gain set rank = rank + 1 where crew_id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(both, (winner_id, loser_id))
         cur.execute(winner, (winner_id,))
@@ -1085,7 +1075,7 @@ def destiny_result(winner_id: int, loser_id: int):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -1100,8 +1090,7 @@ where c1.id = battle.crew_1
     conn = None
     crew1, crew2, finished, link = '', '', datetime.datetime.now().date(), ''
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(everything, (battle_id,))
         ret = cur.fetchone()
@@ -1116,7 +1105,7 @@ where c1.id = battle.crew_1
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return crew1, crew2, finished.date(), link
 
 
@@ -1150,8 +1139,7 @@ def battle_cancel(battle_id: int) -> str:
     link = ''
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         # Find rating change per crew
         cur.execute(find_mvps, (battle_id,))
@@ -1175,13 +1163,14 @@ def battle_cancel(battle_id: int) -> str:
         # Delete the battle
         cur.execute(move_battle, (battle_id,))
         cur.execute(delete_battle, (battle_id,))
+        _untrack_last_battle(battle_id, cur)
         conn.commit()
         cur.close()
     except (Exception, psycopg2.DatabaseError) as error:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return link
 
 
@@ -1194,8 +1183,7 @@ def crew_correct(member: discord.Member, current: str) -> bool:
     conn = None
     db_crew = ''
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(find_crew, (member.id,))
         db_crew = cur.fetchone()
@@ -1209,7 +1197,7 @@ def crew_correct(member: discord.Member, current: str) -> bool:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return current == db_crew
 
 
@@ -1235,22 +1223,18 @@ def all_crews() -> List[DbCrew]:
        hardcap
 
 FROM crews
-         left join (select battle.finished                                                              as finished,
+         left join (select distinct on (newest_battle.crew_id) battle.finished                         as finished,
                            opp_crew.name || case when battle.winner = crew_id then '(W)' else '(L)' end as opp,
                            newest_battle.crew_id                                                        as cid
-                    from (select max(battle.id) as battle_id, crews.id as crew_id
-                          from battle,
-                               crews
-                          where (crews.id = battle.crew_1
-                              or crews.id = battle.crew_2)
-                          group by crews.id)
-                             as newest_battle,
+                    from crew_last_battle as newest_battle,
                          battle,
                          crews as opp_crew
                     where newest_battle.battle_id = battle.id
                       and opp_crew.id = case
                                             when newest_battle.crew_id = battle.crew_2 then battle.crew_1
-                                            else battle.crew_2 end) as last_battle on last_battle.cid = crews.id
+                                            else battle.crew_2 end
+                    order by newest_battle.crew_id, newest_battle.battle_id desc) as last_battle
+                   on last_battle.cid = crews.id
          left join (select count(distinct member_id) as member_count, crew_id
                     from current_member_crews
                     group by crew_id) as members on members.crew_id = crews.id
@@ -1258,8 +1242,7 @@ where disbanded = false;"""
     conn = None
     crews = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(everything)
         crew_info = cur.fetchall()
@@ -1272,27 +1255,29 @@ where disbanded = false;"""
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return crews
 
 
 def all_crew_usage(offset: int = 0) -> List[List]:
-    # TODO Update this to handle year too
-    everything = """select count(distinct (players.player)) as total, crews.name, crews.id
+    everything = """with usage_month as (select date_trunc('month', current_timestamp) - make_interval(months => %s) as start)
+select count(distinct (players.player)) as total, crews.name, crews.id
 from (
          select p1 as player, crew_1 as cr
          from match,
-              battle
+              battle,
+              usage_month
          where match.battle_id = battle.id
-           and extract(month from battle.finished) = extract(month from current_timestamp) - %s
-           and extract(year from battle.finished) = extract(year from current_timestamp)
+           and battle.finished >= usage_month.start
+           and battle.finished < usage_month.start + interval '1 month'
          union
          select p2 as player, crew_2 as cr
          from match,
-              battle
+              battle,
+              usage_month
          where match.battle_id = battle.id
-           and extract(month from battle.finished) = extract(month from current_timestamp) - %s
-           and extract(year from battle.finished) = extract(year from current_timestamp))
+           and battle.finished >= usage_month.start
+           and battle.finished < usage_month.start + interval '1 month')
          as players,
      crews
 where crews.id = players.cr
@@ -1301,10 +1286,9 @@ order by total desc;"""
     conn = None
     crews = [[]]
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
-        cur.execute(everything, (offset, offset))
+        cur.execute(everything, (offset,))
         crews = cur.fetchall()
         conn.commit()
         cur.close()
@@ -1312,7 +1296,7 @@ order by total desc;"""
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return crews
 
 
@@ -1325,8 +1309,7 @@ def all_crew_destiny() -> List[List]:
     conn = None
     crews = [[]]
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(everything)
         crews = cur.fetchall()
@@ -1336,7 +1319,7 @@ def all_crew_destiny() -> List[List]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return crews
 
 
@@ -1349,15 +1332,15 @@ from (
          from match,
               battle
          where match.battle_id = battle.id
-           and extract(month from battle.finished) = 12
-           and extract(year from battle.finished) = extract(year from current_timestamp) - 1
+           and battle.finished >= date_trunc('year', current_timestamp) - interval '1 month'
+           and battle.finished < date_trunc('year', current_timestamp)
          union
          select p2 as player, crew_2 as cr
          from match,
               battle
          where match.battle_id = battle.id
-           and extract(month from battle.finished) = 12
-           and extract(year from battle.finished) = extract(year from current_timestamp) - 1)
+           and battle.finished >= date_trunc('year', current_timestamp) - interval '1 month'
+           and battle.finished < date_trunc('year', current_timestamp))
          as players,
      crews
 where crews.id = players.cr
@@ -1366,10 +1349,9 @@ order by total desc;"""
     conn = None
     crews = [[]]
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
-        cur.execute(everything, (offset, offset))
+        cur.execute(everything)
         crews = cur.fetchall()
         conn.commit()
         cur.close()
@@ -1377,31 +1359,30 @@ order by total desc;"""
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return crews
 
 
 def crew_usage(cr: Crew, month_mod: int = 0) -> Dict[int, List[str]]:
     team_1 = """select distinct(p1) as players, battle.link
-        from match, battle, crews
-            where match.battle_id = battle.id and crews.id = battle.crew_1 and crews.id = %s
-            and extract(month from battle.finished) = extract(month from current_timestamp) - %s
-            and extract(year from battle.finished) = extract(year from current_timestamp);
+        from match, battle
+            where match.battle_id = battle.id and battle.crew_1 = %s
+            and battle.finished >= date_trunc('month', current_timestamp) - make_interval(months => %s)
+            and battle.finished < date_trunc('month', current_timestamp) - make_interval(months => %s - 1);
             """
     team_2 = """select distinct(p2) as players, battle.link
-        from match, battle, crews
-            where match.battle_id = battle.id and crews.id = battle.crew_2 and crews.id = %s
-            and extract(month from battle.finished) = extract(month from current_timestamp) - %s
-            and extract(year from battle.finished) = extract(year from current_timestamp);
+        from match, battle
+            where match.battle_id = battle.id and battle.crew_2 = %s
+            and battle.finished >= date_trunc('month', current_timestamp) - make_interval(months => %s)
+            and battle.finished < date_trunc('month', current_timestamp) - make_interval(months => %s - 1);
             """
     conn = None
     players = {}
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_crews(cr, cur)
-        cur.execute(team_1, (cr_id, month_mod))
+        cur.execute(team_1, (cr_id, month_mod, month_mod))
         t1 = cur.fetchall()
         if t1:
             for member, link in t1:
@@ -1410,7 +1391,7 @@ def crew_usage(cr: Crew, month_mod: int = 0) -> Dict[int, List[str]]:
                 else:
                     players[member] = [link]
 
-        cur.execute(team_2, (cr_id, month_mod))
+        cur.execute(team_2, (cr_id, month_mod, month_mod))
         t2 = cur.fetchall()
         if t2:
             for member, link in t2:
@@ -1425,28 +1406,27 @@ def crew_usage(cr: Crew, month_mod: int = 0) -> Dict[int, List[str]]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return players
 
 
 def crew_usage_jan(cr: Crew, month_mod: int = 0) -> Dict[int, List[str]]:
     team_1 = """select distinct(p1) as players, battle.link
-        from match, battle, crews
-            where match.battle_id = battle.id and crews.id = battle.crew_1 and crews.id = %s
-            and extract(month from battle.finished) = 12
-            and extract(year from battle.finished) = extract(year from current_timestamp) - 1;
+        from match, battle
+            where match.battle_id = battle.id and battle.crew_1 = %s
+            and battle.finished >= date_trunc('year', current_timestamp) - interval '1 month'
+            and battle.finished < date_trunc('year', current_timestamp);
             """
     team_2 = """select distinct(p2) as players, battle.link
-        from match, battle, crews
-            where match.battle_id = battle.id and crews.id = battle.crew_2 and crews.id = %s
-            and extract(month from battle.finished) = 12
-            and extract(year from battle.finished) = extract(year from current_timestamp) - 1;
+        from match, battle
+            where match.battle_id = battle.id and battle.crew_2 = %s
+            and battle.finished >= date_trunc('year', current_timestamp) - interval '1 month'
+            and battle.finished < date_trunc('year', current_timestamp);
             """
     conn = None
     players = {}
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_crews(cr, cur)
         cur.execute(team_1, (cr_id,))
@@ -1473,7 +1453,7 @@ def crew_usage_jan(cr: Crew, month_mod: int = 0) -> Dict[int, List[str]]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return players
 
 def set_hardcap(crew: Crew) -> None:
@@ -1481,8 +1461,7 @@ def set_hardcap(crew: Crew) -> None:
 
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_name(crew.name, cur)
         cur.execute(update_hardcap, (crew.hardcap, cr_id))
@@ -1492,7 +1471,7 @@ def set_hardcap(crew: Crew) -> None:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
 
 def update_crew(crew: Crew) -> None:
     current = """SELECT id, discord_id, tag, name, rank, overflow FROM crews
@@ -1508,8 +1487,7 @@ def update_crew(crew: Crew) -> None:
     WHERE id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(current, (crew.role_id,))
         old = cur.fetchone()
@@ -1532,7 +1510,7 @@ def update_crew(crew: Crew) -> None:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
 
 def hardcap_info(crew: Crew) -> Tuple[int, int]:
     unique_players =  """ SELECT COUNT(DISTINCT player_id) AS unique_players
@@ -1563,8 +1541,7 @@ where (crew_1 = %s or crew_2 = %s)
     conn = None
     players, battles = 0, 0
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         crew_id = crew_id_from_name(crew.name, cur)
         print(crew.name, crew_id)
@@ -1582,7 +1559,7 @@ where (crew_1 = %s or crew_2 = %s)
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return players, battles
 
 def hardcap_info_current(crew: Crew, season_ids: List[int]) -> Tuple[int, int]:
@@ -1613,8 +1590,7 @@ where (crew_1 = %s or crew_2 = %s)
     players, battles = 0, 0
     player_set = set()
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         crew_id = crew_id_from_name(crew.name, cur)
         print(crew.name, crew_id)
@@ -1634,7 +1610,7 @@ where (crew_1 = %s or crew_2 = %s)
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return len(player_set), battles
 
 
@@ -1650,8 +1626,7 @@ def update_crew_tomain(crew: Crew, new_role_id: int) -> None:
     WHERE id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         crew_id = crew_id_from_name(crew.name, cur)
         cur.execute(current, (crew_id,))
@@ -1666,7 +1641,7 @@ def update_crew_tomain(crew: Crew, new_role_id: int) -> None:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
 
 
 def update_member_crew(member_id: int, new_crew: Crew) -> None:
@@ -1677,8 +1652,7 @@ def update_member_crew(member_id: int, new_crew: Crew) -> None:
      values(%s, %s, current_timestamp) ON CONFLICT DO NOTHING;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(delete_current, (member_id,))
         current = cur.fetchone()
@@ -1694,7 +1668,7 @@ def update_member_crew(member_id: int, new_crew: Crew) -> None:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
 
 
 def find_member_crew(member_id: int) -> str:
@@ -1703,8 +1677,7 @@ def find_member_crew(member_id: int) -> str:
     conn = None
     crew_name = ''
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(find_current, (member_id,))
         current = cur.fetchone()
@@ -1716,7 +1689,7 @@ def find_member_crew(member_id: int) -> str:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return crew_name
 
 
@@ -1730,8 +1703,7 @@ def cooldown_finished() -> List[int]:
     conn = None
     current = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(finished)
         current = cur.fetchall()
@@ -1741,7 +1713,7 @@ def cooldown_finished() -> List[int]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return [c[0] for c in current]
 
 
@@ -1753,8 +1725,7 @@ def cooldown_current() -> List[Tuple[int, datetime.timedelta]]:
     conn = None
     current = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(cooldown)
         current = cur.fetchall()
@@ -1764,7 +1735,7 @@ def cooldown_current() -> List[Tuple[int, datetime.timedelta]]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return [(c[0], c[1]) for c in current]
 
 
@@ -1774,8 +1745,7 @@ def remove_expired_cooldown(user_id: int) -> None:
             where role_id = 786492456027029515 and member_id=%s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(cooldown, (user_id,))
         conn.commit()
@@ -1784,7 +1754,7 @@ def remove_expired_cooldown(user_id: int) -> None:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
 
 
 def all_battles_in_league(league: int) -> List[str]:
@@ -1800,8 +1770,7 @@ def all_battles_in_league(league: int) -> List[str]:
     conn = None
     out = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(battles, (league,))
         everything = cur.fetchall()
@@ -1822,7 +1791,7 @@ def all_battles_in_league(league: int) -> List[str]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return out
 
 
@@ -1838,8 +1807,7 @@ def all_battles() -> List[str]:
     conn = None
     out = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(battles)
         everything = cur.fetchall()
@@ -1860,7 +1828,7 @@ def all_battles() -> List[str]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return out
 
 
@@ -1875,7 +1843,7 @@ def crew_record(cr: Crew, league: Optional[int] = 0) -> Tuple:
         full outer join 
         (select crews.name, count(*) as matches 
             from crews, battle 
-                where (crews.id = battle.crew_1 or crews.id = battle.crew_2) and crews.id = %s 
+                where crews.id = %s and (battle.crew_1 = %s or battle.crew_2 = %s)
                     group by crews.name
         ) as bttls on bttls.name = wins.name) as crew_wrs;
     """
@@ -1889,7 +1857,7 @@ def crew_record(cr: Crew, league: Optional[int] = 0) -> Tuple:
     full outer join 
     (select crews.name, count(*) as matches 
         from crews, battle 
-            where (crews.id = battle.crew_1 or crews.id = battle.crew_2) and crews.id = %s and battle.league_id = %s 
+            where crews.id = %s and (battle.crew_1 = %s or battle.crew_2 = %s) and battle.league_id = %s
                 group by crews.name
     ) as bttls on bttls.name = wins.name) as crew_wrs;
 """
@@ -1903,23 +1871,22 @@ def crew_record(cr: Crew, league: Optional[int] = 0) -> Tuple:
         full outer join 
         (select crews.name, count(*) as matches 
             from crews, battle 
-                where (crews.id = battle.crew_1 or crews.id = battle.crew_2) and crews.id = %s and battle.league_id in (20,21,22)
+                where crews.id = %s and (battle.crew_1 = %s or battle.crew_2 = %s) and battle.league_id in (20,21,22)
                     group by crews.name
         ) as bttls on bttls.name = wins.name) as crew_wrs;
     """
     conn = None
     ret = ()
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         crew_id = crew_id_from_role_id(cr.role_id, cur)
         if league == 20:
-            cur.execute(record_with_season, (crew_id, crew_id))
+            cur.execute(record_with_season, (crew_id, crew_id, crew_id, crew_id))
         elif league:
-            cur.execute(record_with_league, (crew_id, league, crew_id, league))
+            cur.execute(record_with_league, (crew_id, league, crew_id, crew_id, crew_id, league))
         else:
-            cur.execute(record, (crew_id, crew_id))
+            cur.execute(record, (crew_id, crew_id, crew_id, crew_id))
         ret = cur.fetchone()
         if not ret:
             ret = (cr.name, 0, 0)
@@ -1929,7 +1896,7 @@ def crew_record(cr: Crew, league: Optional[int] = 0) -> Tuple:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return ret
 
 
@@ -1946,8 +1913,7 @@ def crew_matches(cr: Crew) -> List[str]:
     conn = None
     out = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_role_id(cr.role_id, cur)
         cur.execute(battles, (cr_id, cr_id,))
@@ -1972,7 +1938,7 @@ def crew_matches(cr: Crew) -> List[str]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return out
 
 
@@ -1986,8 +1952,7 @@ def player_stocks(member: discord.Member, season: bool = False) -> Tuple[float,
     out = []
     vals = (0, 0)
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         query = taken2 if season else taken
         cur.execute(query, (member.id,))
@@ -1997,7 +1962,7 @@ def player_stocks(member: discord.Member, season: bool = False) -> Tuple[float,
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return vals if vals else (0, 0, 0, 0)
 
 
@@ -2058,8 +2023,7 @@ from (select mvps.battle_id, mvp, sent.id, sent.name
     conn = None
     out = 0
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(mvps, (member.id,))
         out = cur.fetchone()[0]
@@ -2068,7 +2032,7 @@ from (select mvps.battle_id, mvp, sent.id, sent.name
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return out
 
 
@@ -2110,8 +2074,7 @@ from (select count(distinct (match.battle_id)) as battle_count, fighters.name
     out = []
     vals = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         query = season_chars if season else chars
         cur.execute(query, (member.id, member.id,))
@@ -2121,7 +2084,7 @@ from (select count(distinct (match.battle_id)) as battle_count, fighters.name
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return vals
 
 
@@ -2135,8 +2098,7 @@ def ba_chars(member: discord.Member) -> Tuple[Tuple[int, str]]:
     out = []
     vals = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(chars, (member.id,))
         vals = cur.fetchall()
@@ -2145,7 +2107,7 @@ def ba_chars(member: discord.Member) -> Tuple[Tuple[int, str]]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return vals
 
 
@@ -2155,8 +2117,7 @@ def set_vod(battle_id: int, vod: str) -> None:
     ;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(update, (vod, battle_id))
         conn.commit()
@@ -2167,7 +2128,7 @@ def set_vod(battle_id: int, vod: str) -> None:
         raise error
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -2219,8 +2180,7 @@ from (select count(distinct (match.battle_id)) as battles
     out = []
     vals = (0, 0)
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         query = win_loss_season if season else win_loss
         cur.execute(query, (member.id, member.id, member.id, member.id,))
@@ -2230,7 +2190,7 @@ from (select count(distinct (match.battle_id)) as battles
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return vals if vals else (0, 0)
 
 
@@ -2248,8 +2208,7 @@ from (select count(distinct (match_number)) as number
     conn = None
     vals = (0, 0)
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(win_loss, (member.id, member.id))
         vals = cur.fetchone()
@@ -2258,7 +2217,7 @@ from (select count(distinct (match_number)) as number
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return vals if vals else (0, 0)
 
 
@@ -2269,8 +2228,7 @@ def freeze_crew(cr: Crew, end: datetime.date):
     """
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_role_id(cr.role_id, cur)
         cur.execute(freeze, (end, cr_id))
@@ -2281,7 +2239,7 @@ def freeze_crew(cr: Crew, end: datetime.date):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -2293,8 +2251,7 @@ def auto_unfreeze() -> Tuple[Tuple[str]]:
     conn = None
     out = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(unfreeze)
         out = cur.fetchall()
@@ -2305,7 +2262,7 @@ def auto_unfreeze() -> Tuple[Tuple[str]]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return out
 
 
@@ -2314,8 +2271,7 @@ def disabled_channels() -> Iterable[int]:
     conn = None
     out = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(channels)
         out = cur.fetchall()
@@ -2326,7 +2282,7 @@ def disabled_channels() -> Iterable[int]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return [o[0] for o in out]
 
 
@@ -2335,8 +2291,7 @@ def add_disabled_channel(id_num: int):
      values(%s) ON CONFLICT DO NOTHING;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(add_channel, (id_num,))
         conn.commit()
@@ -2346,7 +2301,7 @@ def add_disabled_channel(id_num: int):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -2354,8 +2309,7 @@ def remove_disabled_channel(id_num: int):
     del_channel = """delete from disabled_channels where id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(del_channel, (id_num,))
         conn.commit()
@@ -2365,7 +2319,7 @@ def remove_disabled_channel(id_num: int):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -2376,8 +2330,7 @@ def set_command_activation(command_name: int, activation: bool):
     do update set deactivated = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(deactivate, (command_name, activation, activation))
         conn.commit()
@@ -2387,7 +2340,7 @@ def set_command_activation(command_name: int, activation: bool):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -2397,8 +2350,7 @@ def command_lookup(command_name: int) -> Tuple[str, bool, int]:
     conn = None
     cmd = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(lookup, (command_name,))
         cmd = cur.fetchone()
@@ -2412,7 +2364,7 @@ def command_lookup(command_name: int) -> Tuple[str, bool, int]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return cmd
 
 
@@ -2422,8 +2374,7 @@ def increment_command_used(command_name: str):
                         where cname = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(increment, (command_name,))
         conn.commit()
@@ -2433,7 +2384,47 @@ def increment_command_used(command_name: str):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
+    return
+
+
+def command_activations() -> Dict[str, bool]:
+    lookup = """ select cname, deactivated from commands;"""
+    conn = None
+    out = []
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute(lookup)
+        out = cur.fetchall()
+        conn.commit()
+        cur.close()
+
+    except (Exception, psycopg2.DatabaseError) as error:
+        log_error_and_reraise(error)
+    finally:
+        if conn is not None:
+            release_connection(conn)
+    return {cname: bool(deactivated) for cname, deactivated in out}
+
+
+def add_command_uses(counts: Mapping[str, int]):
+    increment = """ INSERT INTO commands (cname, called) values %s
+                        on CONFLICT (cname)
+                        do update set called = commands.called + excluded.called;"""
+    conn = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        psycopg2.extras.execute_values(cur, increment, list(counts.items()))
+        conn.commit()
+        cur.close()
+
+    except (Exception, psycopg2.DatabaseError) as error:
+        log_error_and_reraise(error)
+    finally:
+        if conn is not None:
+            release_connection(conn)
     return
 
 
@@ -2442,8 +2433,7 @@ def command_leaderboard():
     conn = None
     desc = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(leaderboard)
         board = cur.fetchall()
@@ -2456,7 +2446,7 @@ def command_leaderboard():
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return desc
 
 
@@ -2465,8 +2455,7 @@ def new_member_gcoins(member: discord.Member) -> int:
     conn = None
     coins = 0
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(create, (member.id,))
         res = cur.fetchone()
@@ -2478,7 +2467,7 @@ def new_member_gcoins(member: discord.Member) -> int:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return coins
 
 
@@ -2487,8 +2476,7 @@ def refund_member_gcoins(member: discord.Member, amount: int) -> int:
     conn = None
     coins = 0
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(refund, (amount, member.id,))
         res = cur.fetchone()
@@ -2500,7 +2488,7 @@ def refund_member_gcoins(member: discord.Member, amount: int) -> int:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return coins
 
 
@@ -2509,8 +2497,7 @@ def member_gcoins(member: discord.Member) -> int:
     conn = None
     coins = 0
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(gcoins, (member.id,))
         res = cur.fetchone()
@@ -2523,7 +2510,7 @@ def member_gcoins(member: discord.Member) -> int:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return coins
 
 
@@ -2532,8 +2519,7 @@ def is_gambiter(member: discord.Member) -> bool:
     conn = None
     gambiter = False
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(gcoins, (member.id,))
         res = cur.fetchone()
@@ -2546,7 +2532,7 @@ def is_gambiter(member: discord.Member) -> bool:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return gambiter
 
 
@@ -2554,8 +2540,7 @@ def new_gambit(c1: Crew, c2: Crew, message_id: int):
     create = """ insert into current_gambit (team_1, team_2, message_id) values(%s, %s, %s);"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         id_1 = crew_id_from_role_id(c1.role_id, cur)
         id_2 = crew_id_from_role_id(c2.role_id, cur)
@@ -2567,63 +2552,38 @@ def new_gambit(c1: Crew, c2: Crew, message_id: int):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
-def current_gambit() -> Gambit:
-    teams = """ 
-    select c1.name, c2.name, current_gambit.locked, current_gambit.message_id, c1.id, c2.id
+def live_gambit_state() -> Tuple[Optional[Gambit], List[Tuple[int, str, str, int]]]:
+    """The current gambit without its totals and every (member_id, nickname, crew, amount) bet, to seed LiveGambit."""
+    teams = """select c1.name, c2.name, current_gambit.locked, current_gambit.message_id
         from current_gambit, crews as c1, crews as c2
             where current_gambit.team_1 = c1.id and current_gambit.team_2 = c2.id;"""
-    t1_bet = """select coalesce(sum(amount),0)
-        from current_gambit
-            join current_bets on current_gambit.team_1 = current_bets.team;
-    """
-    t2_bet = """select coalesce(sum(amount),0)
-        from current_gambit
-            join current_bets on current_gambit.team_2 = current_bets.team;"""
-    top_bet = """
-    SELECT nickname, MAX(amount) amount
-        FROM current_bets, members, crews
-            where team = %s and members.id=current_bets.member_id and crews.id = team
-                group by member_id, nickname, crews.name;
-    """
+    bets = """select current_bets.member_id, coalesce(members.nickname, ''), crews.name, current_bets.amount
+        from current_bets
+            join crews on crews.id = current_bets.team
+            left join members on members.id = current_bets.member_id;"""
     conn = None
-    t1, t1_bets, t2, t2_bets, locked, m_id, tb1, tb2 = '', 0, '', 0, True, 0, (), ()
+    gambit, bet_rows = None, []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(teams)
         crews = cur.fetchone()
-        if not crews:
-            return None
-
-        t1, t2, locked, m_id, c1_id, c2_id = crews
-        cur.execute(t1_bet)
-        t1_bets = cur.fetchone()[0]
-        cur.execute(t2_bet)
-        t2_bets = cur.fetchone()[0]
-        cur.execute(top_bet, (c1_id,))
-
-        top_bet_1 = cur.fetchone()
-        if top_bet_1:
-            tb1 = top_bet_1
-        cur.execute(top_bet, (c2_id,))
-        top_bet_2 = cur.fetchone()
-        if top_bet_2:
-            tb2 = top_bet_2
-
+        if crews:
+            gambit = Gambit(*crews)
+            cur.execute(bets)
+            bet_rows = cur.fetchall()
         conn.commit()
         cur.close()
-
     except (Exception, psycopg2.DatabaseError) as error:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
-    return Gambit(t1, t2, locked, m_id, t1_bets, t2_bets, tb1, tb2)
+            release_connection(conn)
+    return gambit, bet_rows
 
 
 def member_bet(member: discord.Member) -> Tuple[str, int]:
@@ -2634,8 +2594,7 @@ def member_bet(member: discord.Member) -> Tuple[str, int]:
     conn = None
     team, amount = '', 0
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(bet, (member.id,))
         res = cur.fetchone()
@@ -2648,7 +2607,7 @@ def member_bet(member: discord.Member) -> Tuple[str, int]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return team, amount
 
 
@@ -2663,8 +2622,7 @@ def make_bet(member: discord.Member, cr: Crew, amount: int):
     conn = None
     coins = 0
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         crew_id = crew_id_from_role_id(cr.role_id, cur)
 
@@ -2680,29 +2638,7 @@ def make_bet(member: discord.Member, cr: Crew, amount: int):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
-    return coins
-
-
-def archive_bet(member: discord.Member, amount: int, gambit_id: int):
-    archive = """ insert into past_bets
-        (member_id, result, gambit_id) values (%s, %s, %s);"""
-
-    conn = None
-    coins = 0
-    try:
-        params = config()
-        conn = psycopg2.connect(**params)
-        cur = conn.cursor()
-        cur.execute(archive, (member.id, amount, gambit_id))
-        conn.commit()
-        cur.close()
-
-    except (Exception, psycopg2.DatabaseError) as error:
-        log_error_and_reraise(error)
-    finally:
-        if conn is not None:
-            conn.close()
+            release_connection(conn)
     return coins
 
 
@@ -2710,8 +2646,7 @@ def lock_gambit(status: bool):
     lock = """ update current_gambit set locked = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(lock, (status,))
         conn.commit()
@@ -2720,7 +2655,7 @@ def lock_gambit(status: bool):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -2730,8 +2665,7 @@ def all_bets() -> Tuple[Tuple[int, int, str]]:
     conn = None
     bets = ()
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(bet_list)
         bets = cur.fetchall()
@@ -2741,7 +2675,7 @@ def all_bets() -> Tuple[Tuple[int, int, str]]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return bets
 
 
@@ -2750,8 +2684,7 @@ def cancel_gambit():
     remove_bets = "delete from current_bets;"
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(cancel)
         cur.execute(remove_bets)
@@ -2761,31 +2694,55 @@ def cancel_gambit():
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
-def archive_gambit(winner: str, loser: str, winning_total: int, losing_total: int) -> int:
+def settle_gambit(winner: str, loser: str) -> Tuple[int, List[Payout], Dict[int, int], int, int]:
+    """Archives the current gambit, pays out and archives every bet and clears the gambit in one transaction.
+    Returns the archived gambit id, the payouts, each bettor's G-Coins afterwards and the winning and losing totals,
+    which come from the locked bets rather than anything cached."""
     archive = """insert into gambit_results (winning_crew, losing_crew, winning_total, losing_total, finished)
      values(%s, %s, %s, %s, current_date) returning id;"""
+    bet_list = """select member_id, amount, name
+        from current_bets, crews where team = crews.id
+        for update of current_bets;"""
+    pay_winners = """update gambiters set gcoins = gcoins + paid.amount
+        from (values %s) as paid(member_id, amount)
+        where gambiters.member_id = paid.member_id;"""
+    archive_bets = """insert into past_bets (member_id, result, gambit_id) values %s;"""
+    balances = """select member_id, gcoins from gambiters where member_id = any(%s);"""
     conn = None
-    gambit_id = 0
+    gambit_id, payouts, coins, winning_total, losing_total = 0, [], {}, 0, 0
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         winner_id = crew_id_from_name(winner, cur)
         loser_id = crew_id_from_name(loser, cur)
+        cur.execute(bet_list)
+        bets = cur.fetchall()
+        winning_total = sum(amount for _, amount, crew in bets if crew == winner)
+        losing_total = sum(amount for _, amount, crew in bets if crew == loser)
         cur.execute(archive, (winner_id, loser_id, winning_total, losing_total))
         gambit_id = cur.fetchone()[0]
+        payouts = settle_bets(bets, winner, winning_total, losing_total)
+        psycopg2.extras.execute_values(cur, pay_winners,
+                                       [(payout.member_id, payout.result) for payout in payouts if payout.won],
+                                       template='(%s::bigint, %s::int)')
+        psycopg2.extras.execute_values(cur, archive_bets,
+                                       [(payout.member_id, payout.result, gambit_id) for payout in payouts])
+        cur.execute(balances, ([payout.member_id for payout in payouts],))
+        coins = dict(cur.fetchall())
+        cur.execute("""delete from current_gambit;""")
+        cur.execute("""delete from current_bets;""")
         conn.commit()
         cur.close()
     except (Exception, psycopg2.DatabaseError) as error:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
-    return gambit_id
+            release_connection(conn)
+    return gambit_id, payouts, coins, winning_total, losing_total
 
 
 def gambit_standings() -> Tuple[Tuple[int, int, int, int, str]]:
@@ -2804,8 +2761,7 @@ def gambit_standings() -> Tuple[Tuple[int, int, int, int, str]]:
     conn = None
     standings = ()
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(leaderboard)
         standings = cur.fetchall()
@@ -2815,7 +2771,7 @@ def gambit_standings() -> Tuple[Tuple[int, int, int, int, str]]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return standings
 
 
@@ -2826,8 +2782,7 @@ def past_gambits() -> Tuple[Tuple[int, str, str, int, int, datetime.date]]:
     conn = None
     all_past = ()
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(matches)
         all_past = cur.fetchall()
@@ -2837,7 +2792,7 @@ def past_gambits() -> Tuple[Tuple[int, str, str, int, int, datetime.date]]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return all_past
 
 
@@ -2846,8 +2801,7 @@ def past_bets() -> Tuple[Tuple[int, int, int]]:
     conn = None
     all_past = ()
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(bets)
         all_past = cur.fetchall()
@@ -2857,7 +2811,7 @@ def past_bets() -> Tuple[Tuple[int, int, int]]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return all_past
 
 
@@ -2865,21 +2819,20 @@ def crew_flairs() -> Dict[str, int]:
     flairs = """
     select crews.name, count(member_id) as total
         from current_member_crews, crews
-            where crew_id = crews.id and DATE_PART('day', current_timestamp - joined) <30
+            where crew_id = crews.id and joined > current_timestamp - interval '30 days'
                 group by crews.name, crews.id
                     order by total desc;"""
     old_flairs = """
     select count(distinct(member_id)) as total, crews.name
         from member_crews_history, crews
-            where crew_id = crews.id and DATE_PART('day', current_timestamp - joined) <30
+            where crew_id = crews.id and joined > current_timestamp - interval '30 days'
             and member_id != 775586622241505281
                 group by crews.name, crews.id
                     order by total desc;"""
     conn = None
     cr = {}
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(flairs)
         new = cur.fetchall()
@@ -2900,7 +2853,7 @@ def crew_flairs() -> Dict[str, int]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return cr
 
 
@@ -2909,8 +2862,7 @@ def slots(cr: Crew) -> Tuple[int, int]:
     conn = None
     slot = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_role_id(cr.role_id, cur)
         cur.execute(both, (cr_id,))
@@ -2921,7 +2873,7 @@ def slots(cr: Crew) -> Tuple[int, int]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return slot
 
 
@@ -2930,8 +2882,7 @@ def extra_slots(cr: Crew) -> Tuple[int, int, int]:
     conn = None
     slot = ()
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_role_id(cr.role_id, cur)
         cur.execute(both, (cr_id,))
@@ -2942,7 +2893,7 @@ def extra_slots(cr: Crew) -> Tuple[int, int, int]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return slot
 
 
@@ -2952,8 +2903,7 @@ def mod_slot(cr: Crew, change: int) -> int:
     conn = None
     after = 0
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_role_id(cr.role_id, cur)
         cur.execute(mod, (change, cr_id))
@@ -2964,7 +2914,7 @@ def mod_slot(cr: Crew, change: int) -> int:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return after
 
 
@@ -2974,8 +2924,7 @@ def cur_slot_set(cr: Crew, change: int) -> int:
     conn = None
     after = 0
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_role_id(cr.role_id, cur)
         cur.execute(mod, (change, cr_id))
@@ -2986,7 +2935,7 @@ def cur_slot_set(cr: Crew, change: int) -> int:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return after
 
 
@@ -2995,8 +2944,7 @@ def total_slot_set(cr: Crew, total: int) -> None:
                 where id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_crews(cr, cur)
         if not total or not cr_id:
@@ -3009,7 +2957,7 @@ def total_slot_set(cr: Crew, total: int) -> None:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -3018,8 +2966,7 @@ def softcap_set(cr: Crew, softcap_max: int) -> None:
                 where id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_crews(cr, cur)
         if not softcap_max or not cr_id:
@@ -3032,7 +2979,7 @@ def softcap_set(cr: Crew, softcap_max: int) -> None:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -3050,8 +2997,7 @@ def member_crew_history(member_id: int) -> List[Tuple[str, datetime.datetime, bo
     conn = None
     hist = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
 
         cur.execute(joins, (member_id,))
@@ -3070,7 +3016,7 @@ def member_crew_history(member_id: int) -> List[Tuple[str, datetime.datetime, bo
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return hist
 
 
@@ -3083,8 +3029,7 @@ def member_crew_and_date(member_id: int) -> Tuple[str, datetime.datetime]:
     conn = None
     cr = ()
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
 
         cur.execute(current, (member_id,))
@@ -3095,7 +3040,7 @@ def member_crew_and_date(member_id: int) -> Tuple[str, datetime.datetime]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return cr
 
 
@@ -3104,8 +3049,7 @@ def record_flair(member: discord.Member, crew: Crew):
      values(%s, %s, current_timestamp) ON CONFLICT DO NOTHING;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_crews(crew, cur)
         cur.execute(record, (member.id, cr_id))
@@ -3115,7 +3059,7 @@ def record_flair(member: discord.Member, crew: Crew):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -3128,8 +3072,7 @@ def record_unflair(member_id: int, crew: Crew, join_cd: bool) -> Tuple[int, int,
     conn = None
     unflairs, remaining, total = 0, 0, 0
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_crews(crew, cur)
         cur.execute(record, (member_id, cr_id))
@@ -3146,7 +3089,7 @@ def record_unflair(member_id: int, crew: Crew, join_cd: bool) -> Tuple[int, int,
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return unflairs, remaining, total
 
 
@@ -3157,8 +3100,7 @@ def set_return_slots(crew: Crew, number: int) -> Tuple[int, int, int]:
     conn = None
     unflairs, remaining, total = 0, 0, 0
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_crews(crew, cur)
         cur.execute(cr_record, (number, cr_id,))
@@ -3174,7 +3116,7 @@ def set_return_slots(crew: Crew, number: int) -> Tuple[int, int, int]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return unflairs, remaining, total
 
 
@@ -3184,8 +3126,7 @@ def disband_crew(crew: Crew) -> None:
     where crews.id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_crews(crew, cur)
         today = datetime.date.today()
@@ -3199,7 +3140,7 @@ def disband_crew(crew: Crew) -> None:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -3209,8 +3150,7 @@ def disband_crew_from_id(cr_id) -> None:
     where crews.id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_role_id(cr_id, cur)
         today = datetime.date.today()
@@ -3224,7 +3164,7 @@ def disband_crew_from_id(cr_id) -> None:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -3233,8 +3173,7 @@ def ba_elo(member: discord.Member) -> int:
     conn = None
     out = 0
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(member_elo, (member.id,))
         res = cur.fetchone()
@@ -3245,7 +3184,7 @@ def ba_elo(member: discord.Member) -> int:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return out
 
 
@@ -3256,8 +3195,7 @@ def get_member_elo(member_id: int) -> Optional[EloPlayer]:
     conn = None
     player = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
 
         cur.execute(member_elo, (member_id,))
@@ -3272,7 +3210,7 @@ def get_member_elo(member_id: int) -> Optional[EloPlayer]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return player
 
 
@@ -3292,8 +3230,7 @@ def add_ba_match(winner: EloPlayer, loser: EloPlayer, winner_chars: List[Charact
     conn = None
     try:
 
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         winner_char_ids = [char_id_from_name(char.base, cur) for char in winner_chars]
         cur.execute(add_winner_match, (
@@ -3317,7 +3254,7 @@ def add_ba_match(winner: EloPlayer, loser: EloPlayer, winner_chars: List[Charact
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -3333,8 +3270,7 @@ def ba_standings() -> Tuple[Tuple[str, int, int, int]]:
     conn = None
     standings = ()
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(leaderboard)
         standings = cur.fetchall()
@@ -3344,7 +3280,7 @@ def ba_standings() -> Tuple[Tuple[str, int, int, int]]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return standings
 
 
@@ -3356,8 +3292,7 @@ def db_crew_members(cr: Crew) -> List[int]:
     conn = None
     members = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         crew_id = crew_id_from_crews(cr, cur)
         cur.execute(mems, (crew_id,))
@@ -3368,7 +3303,7 @@ def db_crew_members(cr: Crew) -> List[int]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return [mem[0] for mem in members]
 
 
@@ -3380,8 +3315,7 @@ def name_from_id(mem_id: int) -> str:
     conn = None
     name = ''
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(get_name, (mem_id,))
         ret = cur.fetchone()
@@ -3393,7 +3327,7 @@ def name_from_id(mem_id: int) -> str:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return name
 
 
@@ -3407,8 +3341,7 @@ limit 1;"""
     conn = None
     first = datetime.datetime.now()
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         crew_id = crew_id_from_crews(cr, cur)
         cur.execute(get_first, (crew_id, crew_id))
@@ -3421,7 +3354,7 @@ limit 1;"""
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return first.date()
 
 
@@ -3441,31 +3374,25 @@ from crew_ratings,
         and crew_id = crews.id
         and crews.disbanded = FALSE) crew_count,
      crews
-         left join (select battle.finished                                                              as finished,
+         left join (select distinct on (newest_battle.crew_id) battle.finished                         as finished,
                            opp_crew.name || case when battle.winner = crew_id then '(W)' else '(L)' end as opp,
                            newest_battle.crew_id                                                        as cid
-                    from (select max(battle.id) as battle_id, crews.id as crew_id
-                          from battle,
-                               crews
-                          where (crews.id = battle.crew_1
-                              or crews.id = battle.crew_2)
-                          group by crews.id)
-                             as newest_battle,
+                    from crew_last_battle as newest_battle,
                          battle,
                          crews as opp_crew
                     where newest_battle.battle_id = battle.id
                       and opp_crew.id = case
                                             when newest_battle.crew_id = battle.crew_2 then battle.crew_1
-                                            else battle.crew_2 end) as last_battle on last_battle.cid = crews.id
-         left join (select count(case when battle.winner = crews.id then 1 end)  as wins,
-                           count(case when battle.winner != crews.id then 1 end) as losses,
-                           crews.id                                              as crew
+                                            else battle.crew_2 end
+                    order by newest_battle.crew_id, newest_battle.battle_id desc) as last_battle
+                   on last_battle.cid = crews.id
+         left join (select count(case when battle.winner = sides.crew_id then 1 end)  as wins,
+                           count(case when battle.winner != sides.crew_id then 1 end) as losses,
+                           sides.crew_id                                              as crew
                     from battle,
-                         crews
-                    where (crews.id = battle.crew_1
-                        or crews.id = battle.crew_2)
-                      and battle.league_id = 20
-                    group by crews.id) as battles on battles.crew = crews.id
+                         lateral (values (battle.crew_1), (battle.crew_2)) as sides(crew_id)
+                    where battle.league_id = 20
+                    group by sides.crew_id) as battles on battles.crew = crews.id
 
 where crew_ratings.crew_id = crews.id
   and crew_ratings.league_id = 20
@@ -3475,8 +3402,7 @@ order by rating desc;
     conn = None
     ret = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(bf_crews)
         ret = cur.fetchall()
@@ -3486,7 +3412,7 @@ order by rating desc;
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return ret
 
 
@@ -3506,31 +3432,25 @@ from crew_ratings,
         and crew_id = crews.id
         and crews.disbanded = FALSE) crew_count,
      crews
-         left join (select battle.finished                                                              as finished,
+         left join (select distinct on (newest_battle.crew_id) battle.finished                         as finished,
                            opp_crew.name || case when battle.winner = crew_id then '(W)' else '(L)' end as opp,
                            newest_battle.crew_id                                                        as cid
-                    from (select max(battle.id) as battle_id, crews.id as crew_id
-                          from battle,
-                               crews
-                          where (crews.id = battle.crew_1
-                              or crews.id = battle.crew_2)
-                          group by crews.id)
-                             as newest_battle,
+                    from crew_last_battle as newest_battle,
                          battle,
                          crews as opp_crew
                     where newest_battle.battle_id = battle.id
                       and opp_crew.id = case
                                             when newest_battle.crew_id = battle.crew_2 then battle.crew_1
-                                            else battle.crew_2 end) as last_battle on last_battle.cid = crews.id
-         left join (select count(case when battle.winner = crews.id then 1 end)  as wins,
-                           count(case when battle.winner != crews.id then 1 end) as losses,
-                           crews.id                                              as crew
+                                            else battle.crew_2 end
+                    order by newest_battle.crew_id, newest_battle.battle_id desc) as last_battle
+                   on last_battle.cid = crews.id
+         left join (select count(case when battle.winner = sides.crew_id then 1 end)  as wins,
+                           count(case when battle.winner != sides.crew_id then 1 end) as losses,
+                           sides.crew_id                                              as crew
                     from battle,
-                         crews
-                    where (crews.id = battle.crew_1
-                        or crews.id = battle.crew_2)
-                      and battle.league_id = %s
-                    group by crews.id) as battles on battles.crew = crews.id
+                         lateral (values (battle.crew_1), (battle.crew_2)) as sides(crew_id)
+                    where battle.league_id = %s
+                    group by sides.crew_id) as battles on battles.crew = crews.id
 
 where crew_ratings.crew_id = crews.id
   and crew_ratings.league_id = %s
@@ -3540,8 +3460,7 @@ order by rating desc;
     conn = None
     ret = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(bf_crews, (CURRENT_LEAGUE_ID,CURRENT_LEAGUE_ID,CURRENT_LEAGUE_ID))
         ret = cur.fetchall()
@@ -3551,32 +3470,22 @@ order by rating desc;
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return ret
 
 
 def crew_to_last_played() -> Sequence[Tuple[str, datetime.datetime]]:
     crews_and_battles = """
-    select crews.name, last_battle.finished
+    select crews.name, battle.finished
      from crews
-        left join ( select battle.finished, newest_battle.crew_id
-from (select max(battle.id) as battle_id, crews.id as crew_id
-      from battle,
-           crews
-      where (crews.id = battle.crew_1
-          or crews.id = battle.crew_2) and battle.league_id = %s
-      group by crews.id)
-         as newest_battle,
-     battle
-    where newest_battle.battle_id = battle.id) as last_battle on last_battle.crew_id = crews.id
+        left join crew_last_battle on crew_last_battle.crew_id = crews.id and crew_last_battle.league_id = %s
+        left join battle on battle.id = crew_last_battle.battle_id
 where disbanded = false;
-    ;
 """
     conn = None
     ret = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(crews_and_battles, (CURRENT_LEAGUE_ID,))
         ret = cur.fetchall()
@@ -3586,7 +3495,7 @@ where disbanded = false;
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return ret
 
 
@@ -3605,22 +3514,18 @@ from crew_ratings,
         and crew_id = crews.id
         and crews.disbanded = FALSE) crew_count,
      crews
-         left join (select battle.finished                                                              as finished,
+         left join (select distinct on (newest_battle.crew_id) battle.finished                         as finished,
                            opp_crew.name || case when battle.winner = crew_id then '(W)' else '(L)' end as opp,
                            newest_battle.crew_id                                                        as cid
-                    from (select max(battle.id) as battle_id, crews.id as crew_id
-                          from battle,
-                               crews
-                          where (crews.id = battle.crew_1
-                              or crews.id = battle.crew_2)
-                          group by crews.id)
-                             as newest_battle,
+                    from crew_last_battle as newest_battle,
                          battle,
                          crews as opp_crew
                     where newest_battle.battle_id = battle.id
                       and opp_crew.id = case
                                             when newest_battle.crew_id = battle.crew_2 then battle.crew_1
-                                            else battle.crew_2 end) as last_battle on last_battle.cid = crews.id
+                                            else battle.crew_2 end
+                    order by newest_battle.crew_id, newest_battle.battle_id desc) as last_battle
+                   on last_battle.cid = crews.id
 
 where crew_ratings.crew_id = crews.id
   and crew_ratings.league_id = 16
@@ -3630,8 +3535,7 @@ order by rating desc;
     conn = None
     ret = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(bf_crews)
         ret = cur.fetchall()
@@ -3641,7 +3545,7 @@ order by rating desc;
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return ret
 
 
@@ -3688,8 +3592,7 @@ def destiny_crews() -> Sequence[Tuple[str, str, int, str, int, str, int]]:
     conn = None
     ret = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(bf_crews)
         ret = cur.fetchall()
@@ -3699,7 +3602,7 @@ def destiny_crews() -> Sequence[Tuple[str, str, int, str, int, str, int]]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return ret
 
 
@@ -3709,8 +3612,7 @@ def init_rating(crew: Crew, rating: int, k: int = STARTING_K):
     """
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_crews(crew, cur)
         if not cr_id:
@@ -3723,7 +3625,7 @@ def init_rating(crew: Crew, rating: int, k: int = STARTING_K):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 def reset_k( k: int = DEFAULT_K):
@@ -3733,8 +3635,7 @@ def reset_k( k: int = DEFAULT_K):
     """
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(set_rating, ( k, CURRENT_LEAGUE_ID))
 
@@ -3745,7 +3646,7 @@ def reset_k( k: int = DEFAULT_K):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -3754,8 +3655,7 @@ def init_crew_rating(crew_id: int, rating: int, league_id: int):
     %s, %s, %s, %s) on conflict (crew_id, league_id) do nothing ;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(set_rating, (crew_id, league_id, rating, STARTING_K))
         conn.commit()
@@ -3764,18 +3664,114 @@ def init_crew_rating(crew_id: int, rating: int, league_id: int):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
+def _league_battles(league_id: int, cur) -> Tuple[List[ReplayBattle], Optional[datetime.datetime]]:
+    """A league's battles in order for replay_elo (battles with no players are the forfeits, which keep K), and
+    when its K values were reset if it is the current season and reset_k has run."""
+    find_battles = """select id, winner,
+       Case
+           when winner = crew_1 then crew_2
+           else crew_1 END as loser,
+       players = 0, finished
+from battle
+where league_id = %s
+order by id;"""
+    find_season = """select start_date, reset from current_season where league_id = %s;"""
+    cur.execute(find_battles, (league_id,))
+    battles = [ReplayBattle(*row) for row in cur.fetchall()]
+    cur.execute(find_season, (league_id,))
+    season = cur.fetchone()
+    k_reset_at = None
+    if season and season[0] and season[1]:
+        k_reset_at = datetime.datetime.combine(season[0], datetime.time()) + datetime.timedelta(days=14)
+    return battles, k_reset_at
+
+
+def league_history(league_id: int) -> Tuple[List[ReplayBattle], Optional[datetime.datetime], Dict[int, int]]:
+    """Everything the rating simulator needs for a league: its battles, when K was reset and the actual ratings."""
+    find_ratings = """select crew_id, rating from crew_ratings where league_id = %s;"""
+    conn = None
+    battles, k_reset_at, ratings = [], None, {}
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        battles, k_reset_at = _league_battles(league_id, cur)
+        cur.execute(find_ratings, (league_id,))
+        ratings = dict(cur.fetchall())
+        conn.commit()
+        cur.close()
+    except (Exception, psycopg2.DatabaseError) as error:
+        log_error_and_reraise(error)
+    finally:
+        if conn is not None:
+            release_connection(conn)
+    return battles, k_reset_at, ratings
+
+
+def crew_ids_from_tags(tags: Iterable[str]) -> Set[int]:
+    find_ids = """select id from crews where tag = any(%s);"""
+    conn = None
+    ids = set()
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute(find_ids, (list(tags),))
+        ids = {row[0] for row in cur.fetchall()}
+        conn.commit()
+        cur.close()
+    except (Exception, psycopg2.DatabaseError) as error:
+        log_error_and_reraise(error)
+    finally:
+        if conn is not None:
+            release_connection(conn)
+    return ids
+
+
+def replay_league_ratings(league_id: int) -> EloReplay:
+    """Recomputes crew_ratings and battle_ratings for a league from its battle history in one pass, every crew
+    starts from STARTING_RATING and STARTING_K like initalize_ratings sets them."""
+    del_battle_ratings = """delete from battle_ratings where league_id = %s;"""
+    add_battle_ratings = """insert into battle_ratings (battle_id, crew_id, rating_before, rating_after, league_id)
+    values %s;"""
+    add_crew_ratings = """insert into crew_ratings(crew_id, league_id)
+    select unnest(%s::bigint[]), %s on conflict do nothing;"""
+    set_crew_ratings = """update crew_ratings set rating = v.rating, k = v.k
+    from (values %s) as v(crew_id, league_id, rating, k)
+    where crew_ratings.crew_id = v.crew_id and crew_ratings.league_id = v.league_id;"""
+    conn = None
+    replay = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        battles, k_reset_at = _league_battles(league_id, cur)
+        replay = replay_elo(battles, pinned={FAKE_CREW_ID: STARTING_RATING}, k_reset_at=k_reset_at)
+        cur.execute(del_battle_ratings, (league_id,))
+        psycopg2.extras.execute_values(cur, add_battle_ratings,
+                                       [row + (league_id,) for row in replay.battle_ratings()], page_size=1000)
+        ratings = replay.crew_ratings()
+        cur.execute(add_crew_ratings, (list(ratings), league_id))
+        psycopg2.extras.execute_values(cur, set_crew_ratings, [
+            (crew_id, league_id, rating, k) for crew_id, (rating, k) in ratings.items()], page_size=1000)
+        conn.commit()
+        cur.close()
+    except (Exception, psycopg2.DatabaseError) as error:
+        log_error_and_reraise(error)
+    finally:
+        if conn is not None:
+            release_connection(conn)
+    return replay
+
+
 def reset_fake_crew_rating(league_id: int):
     set_rating = """update crew_ratings
     set rating = 1500
         where crew_id = 339 and league_id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(set_rating, (league_id,))
         conn.commit()
@@ -3784,7 +3780,7 @@ def reset_fake_crew_rating(league_id: int):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -3819,8 +3815,7 @@ where fighters.id = picks.cid;
     conn = None
     out = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(get_chars)
         chars = defaultdict(list)
@@ -3837,25 +3832,16 @@ where fighters.id = picks.cid;
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return out
 
 
-def crew_rankings() -> Mapping[str, Tuple[int, int, int]]:
-    ranking = """
-    select crews.name,
-           crew_id,
-           rank() over (order by rating desc) placement,
-           rating,
-            crew_count.cc
+def league_ratings() -> Dict[str, int]:
+    """Ratings of every crew that has not disbanded in the current league, what the Leaderboard is seeded from."""
+    ratings = """
+    select crews.name, rating
     from crew_ratings,
-         crews,
-         (select count(*) as cc
-      from crew_ratings,
-           crews
-      where league_id = %s
-        and crew_id = crews.id
-        and crews.disbanded = FALSE) crew_count
+         crews
     where league_id = %s
       and crew_ratings.crew_id = crews.id
       and crews.disbanded = false;
@@ -3863,22 +3849,17 @@ def crew_rankings() -> Mapping[str, Tuple[int, int, int]]:
     conn = None
     mapping = {}
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
-
-        cur.execute(ranking, (CURRENT_LEAGUE_ID,CURRENT_LEAGUE_ID))
-        ret = cur.fetchall()
-        if ret:
-            for name, _, rank, rating, count in ret:
-                mapping[name] = (rank, rating, len(ret))
+        cur.execute(ratings, (CURRENT_LEAGUE_ID,))
+        mapping = dict(cur.fetchall())
         conn.commit()
         cur.close()
     except (Exception, psycopg2.DatabaseError) as error:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return mapping
 
 
@@ -3890,8 +3871,7 @@ def charge(member_id: int, amount: int, reason: str = 'None Specified') -> int:
     conn = None
     coins = 0
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(gcoins, (amount, member_id,))
         res = cur.fetchone()
@@ -3905,7 +3885,7 @@ def charge(member_id: int, amount: int, reason: str = 'None Specified') -> int:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return coins
 
 
@@ -3913,8 +3893,7 @@ def record_nicknames(member_nicks: Sequence[Tuple[int, str]]):
     record = """update members set nickname = %s where id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         for i, nick in enumerate(member_nicks):
             cur.execute(record, (nick[1], nick[0]))
@@ -3924,7 +3903,7 @@ def record_nicknames(member_nicks: Sequence[Tuple[int, str]]):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 def elo_decay(crew: Crew, amount: int):
@@ -3932,23 +3911,22 @@ def elo_decay(crew: Crew, amount: int):
     record = """insert into elo_decay (crew_id, amount, league_id, happened) values
     (%s, %s, 8, CURRENT_TIMESTAMP);"""
     reduce = """update crew_ratings set rating = rating - %s 
-    where crew_id = %s and league_id = 16;"""
+    where crew_id = %s and league_id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_crews(crew, cur)
         cur.execute(modify, (cr_id,))
         cur.execute(record, (cr_id, amount))
-        cur.execute(reduce, (amount, cr_id))
+        cur.execute(reduce, (amount, cr_id, CURRENT_LEAGUE_ID))
         conn.commit()
         cur.close()
     except (Exception, psycopg2.DatabaseError) as error:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -3956,8 +3934,7 @@ def reset_decay(crew: Crew):
     modify = """update crews set decay_level = 0 where id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_crews(crew, cur)
         cur.execute(modify, (cr_id,))
@@ -3967,7 +3944,7 @@ def reset_decay(crew: Crew):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -3976,8 +3953,7 @@ def nickname_lookup(member_id: int) -> str:
     conn = None
     name = ''
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(lookup, (member_id,))
         res = cur.fetchone()
@@ -3990,7 +3966,7 @@ def nickname_lookup(member_id: int) -> str:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return name
 
 
@@ -3999,8 +3975,7 @@ def members_in_server() -> Tuple[Set[int], Set[int]]:
     conn = None
     in_server, out_server = set(), set()
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(lookup)
         res = cur.fetchall()
@@ -4017,7 +3992,7 @@ def members_in_server() -> Tuple[Set[int], Set[int]]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return (in_server, out_server)
 
 
@@ -4026,8 +4001,7 @@ def update_member_status(in_server: Tuple[int], out_server: Tuple[int]) -> None:
     where id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         for mem_id in in_server:
             cur.execute(update_in_server, (True, mem_id))
@@ -4040,7 +4014,7 @@ def update_member_status(in_server: Tuple[int], out_server: Tuple[int]) -> None:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
 
 
 def members_roles() -> Tuple[Set[int], Set[int]]:
@@ -4048,8 +4022,7 @@ def members_roles() -> Tuple[Set[int], Set[int]]:
     conn = None
     in_server, out_server = set(), set()
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(lookup)
         res = cur.fetchall()
@@ -4066,7 +4039,7 @@ def members_roles() -> Tuple[Set[int], Set[int]]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return in_server, out_server
 
 
@@ -4080,8 +4053,7 @@ from votes,
     out = None
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(lookup, (crew_id_from_crews(crew, cur),))
         res = cur.fetchall()
@@ -4094,7 +4066,7 @@ from votes,
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return out
 
 
@@ -4106,8 +4078,7 @@ on conflict (crew_id) do update set choice    = excluded.choice,
                           member_id = excluded.member_id;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(setup, (crew_id_from_crews(crew, cur), option, member_id))
         conn.commit()
@@ -4117,7 +4088,7 @@ on conflict (crew_id) do update set choice    = excluded.choice,
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
 
 
 def update_crew_tf(crew: Crew, triforce: int, group: int) -> None:
@@ -4125,8 +4096,7 @@ def update_crew_tf(crew: Crew, triforce: int, group: int) -> None:
     update crews set triforce = %s, tf_group = %s where id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(setup, triforce, group, (crew_id_from_crews(crew, cur)))
         conn.commit()
@@ -4136,7 +4106,7 @@ def update_crew_tf(crew: Crew, triforce: int, group: int) -> None:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
 
 
 def all_votes() -> List[str]:
@@ -4146,8 +4116,7 @@ def all_votes() -> List[str]:
     conn = None
     names = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(lookup)
         res = cur.fetchall()
@@ -4161,7 +4130,7 @@ def all_votes() -> List[str]:
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return names
 
 
@@ -4181,8 +4150,7 @@ where months > 0"""
     conn = None
     current = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(finished)
         current = cur.fetchall()
@@ -4192,7 +4160,7 @@ where months > 0"""
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return tuple((int(c[0]), str(c[1]), int(c[2])) for c in current)
 
 
@@ -4213,8 +4181,7 @@ where months > 0"""
     conn = None
     current = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(finished)
         current = cur.fetchall()
@@ -4224,7 +4191,7 @@ where months > 0"""
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return ((c[0], int(c[1])) for c in current)
 
 
@@ -4250,8 +4217,7 @@ def track_down_out(member_id: int):
     conn = None
     try:
 
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(current_track, (member_id,))
         ret = cur.fetchone()
@@ -4276,7 +4242,7 @@ def track_down_out(member_id: int):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return
 
 
@@ -4292,8 +4258,7 @@ where months = 0"""
     conn = None
     recent = False
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(finished, (mem_id,))
         current = cur.fetchall()
@@ -4305,7 +4270,7 @@ where months = 0"""
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return recent
 
 
@@ -4321,8 +4286,7 @@ where finished > (select (current_date) - extract(dow from (current_date))::inte
     conn = None
     recent = 0
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_crews(crew, cur)
         cur.execute(finished, (cr_id,))
@@ -4334,7 +4298,7 @@ where finished > (select (current_date) - extract(dow from (current_date))::inte
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return recent
 
 
@@ -4345,8 +4309,7 @@ select extra_slot_date > (select current_date - extract(dow from current_date)::
     conn = None
     recent = False
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_crews(crew, cur)
         cur.execute(finished, (cr_id,))
@@ -4358,7 +4321,7 @@ select extra_slot_date > (select current_date - extract(dow from current_date)::
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return recent
 
 
@@ -4367,8 +4330,7 @@ def set_extra_used(crew: Crew):
 update crews set extra_slot_date = current_date where id = %s;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cr_id = crew_id_from_crews(crew, cur)
         cur.execute(finished, (cr_id,))
@@ -4378,7 +4340,7 @@ update crews set extra_slot_date = current_date where id = %s;"""
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
 
 
 def add_bracket_predictions(member_id: int, match_list: Iterable['Match']):
@@ -4388,8 +4350,7 @@ def add_bracket_predictions(member_id: int, match_list: Iterable['Match']):
     DO UPDATE set winner = excluded.winner, loser = excluded.loser;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         for match in match_list:
             if match.winner:
@@ -4400,7 +4361,7 @@ def add_bracket_predictions(member_id: int, match_list: Iterable['Match']):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
 
 
 def add_bracket_questions(member_id: int, answers: Iterable[int]):
@@ -4410,8 +4371,7 @@ def add_bracket_questions(member_id: int, answers: Iterable[int]):
     DO UPDATE set answer = excluded.answer;"""
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         for i, answer in enumerate(answers):
             cur.execute(prediction, (member_id, i, answer))
@@ -4421,7 +4381,7 @@ def add_bracket_questions(member_id: int, answers: Iterable[int]):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
 
 
 def get_bracket_questions(member_id: int):
@@ -4432,8 +4392,7 @@ def get_bracket_questions(member_id: int):
     question_results = []
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(prediction, (member_id,))
         question_results = cur.fetchall()
@@ -4443,7 +4402,7 @@ def get_bracket_questions(member_id: int):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return question_results
 
 
@@ -4455,8 +4414,7 @@ def get_bracket_predictions(member_id: int):
     match_results = []
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(prediction, (member_id,))
         match_results = cur.fetchall()
@@ -4466,7 +4424,7 @@ def get_bracket_predictions(member_id: int):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return match_results
 
 
@@ -4478,8 +4436,7 @@ def get_bracket_predictions(member_id: int):
 #     match_results = []
 #     conn = None
 #     try:
-#         params = config()
-#         conn = psycopg2.connect(**params)
+#         conn = get_connection()
 #         cur = conn.cursor()
 #         cur.execute(prediction, (member_id,))
 #         match_results = cur.fetchall()
@@ -4489,7 +4446,7 @@ def get_bracket_predictions(member_id: int):
 #         log_error_and_reraise(error)
 #     finally:
 #         if conn is not None:
-#             conn.close()
+#             release_connection(conn)
 #     return match_results
 
 
@@ -4501,8 +4458,7 @@ def get_match_predictions(member_id: int):
     match_results = []
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(prediction, (member_id,))
         match_results = cur.fetchall()
@@ -4512,7 +4468,7 @@ def get_match_predictions(member_id: int):
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return match_results
 
 
@@ -4525,8 +4481,7 @@ def get_all_predictions():
     output = defaultdict(lambda: defaultdict(int))
     conn = None
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(prediction)
         match_results = cur.fetchall()
@@ -4538,7 +4493,7 @@ def get_all_predictions():
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return output
 
 
@@ -4558,8 +4513,7 @@ where cr1.id = bttles.winner
     conn = None
     matches = []
     try:
-        params = config()
-        conn = psycopg2.connect(**params)
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(everything)
         results = cur.fetchall()
@@ -4584,7 +4538,7 @@ where cr1.id = bttles.winner
         log_error_and_reraise(error)
     finally:
         if conn is not None:
-            conn.close()
+            release_connection(conn)
     return matches
 
 
@@ -4601,3 +4555,6 @@ from (SELECT EXTRACT(month FROM age(current_timestamp, gained)) as months, membe
          as b
 where months > 0
 """
+
+
+db_stats.instrument_module(globals(), __name__, exclude={'logfile', 'log_error_and_reraise'})
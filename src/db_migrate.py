@@ -0,0 +1,124 @@
+"""Versioned schema changes kept in the migrations directory.
+
+Files are named `NNN_description.sql` and run in version order, each in its own transaction, and every applied
+version is recorded in schema_migrations so it only ever runs once. The bot applies pending migrations on start up,
+run `python -m src.db_migrate` from the repository root to apply them by hand or `--status` to list them."""
+import logging
+import os
+import re
+import sys
+from typing import Collection, List, NamedTuple
+
+import psycopg2
+
+from .constants import MIGRATIONS_DIR, MIGRATION_LOCK_ID
+from .db_pool import get_connection, open_pool, release_connection
+
+MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    path: str
+
+    def sql(self) -> str:
+        with open(self.path, encoding='utf-8') as f:
+            return f.read()
+
+
+def discover(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    found = {}
+    for file_name in os.listdir(directory):
+        match = MIGRATION_FILE.match(file_name)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in found:
+            raise ValueError(f'{file_name} and {os.path.basename(found[version].path)} are both version {version}.')
+        found[version] = Migration(version, match.group(2), os.path.join(directory, file_name))
+    return [found[version] for version in sorted(found)]
+
+
+def pending(migrations: List[Migration], applied: Collection[int]) -> List[Migration]:
+    return [migration for migration in migrations if migration.version not in applied]
+
+
+def _applied_versions(cur) -> List[int]:
+    create = """create table if not exists schema_migrations
+    (
+        version integer primary key,
+        name    text        not null,
+        applied timestamptz not null default current_timestamp
+    );"""
+    cur.execute(create)
+    cur.execute("""select version from schema_migrations order by version;""")
+    return [version for version, in cur.fetchall()]
+
+
+def migration_status(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    conn = None
+    waiting = []
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        waiting = pending(discover(directory), _applied_versions(cur))
+        conn.commit()
+        cur.close()
+    finally:
+        if conn is not None:
+            release_connection(conn)
+    return waiting
+
+
+def migrate(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    """Applies every pending migration and returns them. Each transaction takes an advisory lock and checks the
+    version again so two processes never run the same migration, a failing migration is rolled back and stops the
+    ones after it."""
+    lock = """select pg_advisory_xact_lock(%s);"""
+    already_applied = """select exists(select 1 from schema_migrations where version = %s);"""
+    record = """insert into schema_migrations (version, name) values (%s, %s);"""
+    conn = None
+    done = []
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute(lock, (MIGRATION_LOCK_ID,))
+        applied = _applied_versions(cur)
+        conn.commit()
+        for migration in pending(discover(directory), applied):
+            try:
+                cur.execute(lock, (MIGRATION_LOCK_ID,))
+                cur.execute(already_applied, (migration.version,))
+                if cur.fetchone()[0]:
+                    conn.commit()
+                    continue
+                cur.execute(migration.sql())
+                cur.execute(record, (migration.version, migration.name))
+                conn.commit()
+            except psycopg2.DatabaseError:
+                conn.rollback()
+                logging.exception(f'Migration {migration.version} {migration.name} failed and was rolled back.')
+                raise
+            logging.info(f'Applied migration {migration.version} {migration.name}.')
+            done.append(migration)
+        cur.close()
+    finally:
+        if conn is not None:
+            release_connection(conn)
+    return done
+
+
+def main(args: List[str]):
+    logging.basicConfig(level=logging.INFO)
+    open_pool()
+    if '--status' in args:
+        for migration in migration_status():
+            print(f'pending {migration.version:03d} {migration.name}')
+        return
+    applied = migrate()
+    print(f'{len(applied)} migrations applied.')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
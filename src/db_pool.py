@@ -0,0 +1,222 @@
+import asyncio
+import contextlib
+import dataclasses
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+
+import psycopg2
+import psycopg2.extensions
+
+from src.constants import DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT
+from src.db_config import config
+from src.db_stats import InstrumentedCursor, note_acquire
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+@dataclasses.dataclass
+class PoolStats:
+    checkouts: int = 0
+    waits: int = 0
+    timeouts: int = 0
+    opened: int = 0
+    discarded: int = 0
+    acquire_seconds: float = 0.0
+    max_acquire_seconds: float = 0.0
+
+    @property
+    def avg_acquire_ms(self) -> float:
+        if not self.checkouts:
+            return 0.0
+        return self.acquire_seconds / self.checkouts * 1000
+
+
+class ConnectionPool:
+    """Thread safe pool of psycopg2 connections.
+
+    Checkouts block (up to `timeout` seconds) when `max_size` connections are already in use
+    instead of failing, and connections are rolled back before being reused."""
+
+    def __init__(self, connect: Callable[[], psycopg2.extensions.connection], min_size: int = 1,
+                 max_size: int = 10, timeout: float = 30.0):
+        if min_size > max_size:
+            raise ValueError(f'Pool min size {min_size} is larger than max size {max_size}.')
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle: Deque[psycopg2.extensions.connection] = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+        self.stats = PoolStats()
+
+    def open(self):
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            conn = self._new_connection()
+            with self._cond:
+                self._idle.append(conn)
+                self._cond.notify()
+
+    def _new_connection(self) -> psycopg2.extensions.connection:
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.stats.opened += 1
+        return conn
+
+    def getconn(self) -> psycopg2.extensions.connection:
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        conn = None
+        with self._cond:
+            waited = False
+            while not self._idle and self._size >= self.max_size:
+                waited = True
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self.stats.timeouts += 1
+                    raise PoolTimeout(f'No database connection free after {self.timeout} seconds.')
+                self._cond.wait(remaining)
+            if waited:
+                self.stats.waits += 1
+            if self._idle:
+                conn = self._idle.pop()
+            else:
+                self._size += 1
+        if conn is None:
+            conn = self._new_connection()
+        elapsed = time.perf_counter() - start
+        note_acquire(elapsed)
+        with self._cond:
+            self.stats.checkouts += 1
+            self.stats.acquire_seconds += elapsed
+            self.stats.max_acquire_seconds = max(self.stats.max_acquire_seconds, elapsed)
+        return conn
+
+    def putconn(self, conn: psycopg2.extensions.connection):
+        discard = bool(conn.closed)
+        if not discard and conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        if discard:
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
+        with self._cond:
+            if discard:
+                self._size -= 1
+                self.stats.discarded += 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    @contextlib.contextmanager
+    def connection(self):
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def closeall(self):
+        with self._cond:
+            while self._idle:
+                conn = self._idle.pop()
+                self._size -= 1
+                try:
+                    conn.close()
+                except psycopg2.Error:
+                    pass
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'max_size': self.max_size,
+                'checkouts': self.stats.checkouts,
+                'waits': self.stats.waits,
+                'timeouts': self.stats.timeouts,
+                'opened': self.stats.opened,
+                'discarded': self.stats.discarded,
+                'avg_acquire_ms': self.stats.avg_acquire_ms,
+                'max_acquire_ms': self.stats.max_acquire_seconds * 1000,
+            }
+
+
+class AsyncConnectionPool:
+    """asyncio front end for a ConnectionPool, blocking checkouts wait in a worker thread not the event loop."""
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+
+    async def getconn(self) -> psycopg2.extensions.connection:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.pool.getconn)
+
+    async def putconn(self, conn: psycopg2.extensions.connection):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.pool.putconn, conn)
+
+    @contextlib.asynccontextmanager
+    async def connection(self):
+        conn = await self.getconn()
+        try:
+            yield conn
+        finally:
+            await self.putconn(conn)
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                params = config()
+                _pool = ConnectionPool(lambda: psycopg2.connect(cursor_factory=InstrumentedCursor, **params),
+                                       DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT)
+    return _pool
+
+
+def get_async_pool() -> AsyncConnectionPool:
+    return AsyncConnectionPool(get_pool())
+
+
+def open_pool() -> ConnectionPool:
+    pool = get_pool()
+    pool.open()
+    return pool
+
+
+def get_connection() -> psycopg2.extensions.connection:
+    return get_pool().getconn()
+
+
+def release_connection(conn: psycopg2.extensions.connection):
+    get_pool().putconn(conn)
+
+
+def pool_stats() -> Dict[str, float]:
+    return get_pool().snapshot()
@@ -0,0 +1,193 @@
+import bisect
+import collections
+import contextvars
+import dataclasses
+import datetime
+import functools
+import inspect
+import logging
+import threading
+import time
+from typing import Callable, Collection, Deque, Dict, List, Mapping, NamedTuple, Optional
+
+import psycopg2.extensions
+
+from src.command_profiler import add_db_time
+from src.constants import DB_LATENCY_BUCKETS_MS, DB_SLOW_LOG_SIZE, DB_SLOW_QUERY_MS
+
+# Name of the bot command being run, set before each command so db calls can be traced back to it
+current_command: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('current_command', default=None)
+
+
+@dataclasses.dataclass
+class _Call:
+    acquire_seconds: float = 0.0
+    rows: int = 0
+    statements: int = 0
+
+
+_active_call: contextvars.ContextVar[Optional[_Call]] = contextvars.ContextVar('db_call', default=None)
+
+
+@dataclasses.dataclass
+class FunctionStats:
+    calls: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    acquire_seconds: float = 0.0
+    rows: int = 0
+    statements: int = 0
+    # One count per DB_LATENCY_BUCKETS_MS upper bound and a last one for anything slower
+    buckets: List[int] = dataclasses.field(default_factory=lambda: [0] * (len(DB_LATENCY_BUCKETS_MS) + 1))
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_seconds / self.calls * 1000 if self.calls else 0.0
+
+    def percentile_ms(self, fraction: float) -> float:
+        """Upper bound of the histogram bucket holding the call at `fraction`, the max once past the last bound."""
+        target = fraction * self.calls
+        seen = 0
+        for bound, count in zip(DB_LATENCY_BUCKETS_MS, self.buckets):
+            seen += count
+            if count and seen >= target:
+                return float(bound)
+        return self.max_seconds * 1000
+
+
+class SlowCall(NamedTuple):
+    when: datetime.datetime
+    function: str
+    command: Optional[str]
+    seconds: float
+    acquire_seconds: float
+    rows: int
+
+
+class DbStats:
+    """Per function timings of db_helpers calls since start up and a rolling log of the slow ones.
+
+    Calls made inside another db_helpers call count toward the outermost one."""
+
+    def __init__(self, slow_ms: float = DB_SLOW_QUERY_MS, slow_log_size: int = DB_SLOW_LOG_SIZE):
+        self.slow_seconds = slow_ms / 1000
+        self._lock = threading.Lock()
+        self.started = datetime.datetime.now()
+        self.functions: Dict[str, FunctionStats] = {}
+        self.commands: Dict[str, float] = collections.defaultdict(float)
+        self.slow: Deque[SlowCall] = collections.deque(maxlen=slow_log_size)
+
+    def instrument(self, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active_call.get() is not None:
+                return func(*args, **kwargs)
+            call = _Call()
+            token = _active_call.set(call)
+            failed = False
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                _active_call.reset(token)
+                self.record(func.__name__, elapsed, call, failed)
+
+        return wrapper
+
+    def instrument_module(self, namespace: Dict, module: str, exclude: Collection[str] = ()):
+        """Wraps every public function defined in `module` in place, call as `instrument_module(globals(), __name__)`
+        at the end of the module."""
+        for name, value in list(namespace.items()):
+            if inspect.isfunction(value) and value.__module__ == module and not name.startswith('_') \
+                    and name not in exclude:
+                namespace[name] = self.instrument(value)
+
+    def record(self, name: str, elapsed: float, call: _Call, failed: bool = False):
+        command = current_command.get()
+        add_db_time(elapsed)
+        with self._lock:
+            stats = self.functions.setdefault(name, FunctionStats())
+            stats.calls += 1
+            stats.errors += failed
+            stats.total_seconds += elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+            stats.acquire_seconds += call.acquire_seconds
+            stats.rows += call.rows
+            stats.statements += call.statements
+            stats.buckets[bisect.bisect_left(DB_LATENCY_BUCKETS_MS, elapsed * 1000)] += 1
+            if command:
+                self.commands[command] += elapsed
+            if elapsed >= self.slow_seconds:
+                self.slow.append(SlowCall(datetime.datetime.now(), name, command, elapsed, call.acquire_seconds,
+                                          call.rows))
+        if elapsed >= self.slow_seconds:
+            logging.warning(f'Slow db call {name} from {command or "background"}: {elapsed * 1000:.0f} ms, '
+                            f'{call.acquire_seconds * 1000:.0f} ms waiting for a connection, {call.rows} rows')
+
+    def top(self, limit: int = 10) -> List[tuple]:
+        """(name, stats) pairs with the most total time first."""
+        with self._lock:
+            ranked = sorted(self.functions.items(), key=lambda item: -item[1].total_seconds)
+            return [(name, dataclasses.replace(stats, buckets=list(stats.buckets))) for name, stats in
+                    ranked[:limit]]
+
+    def report(self, limit: int = 10, pool: Mapping[str, float] = None) -> str:
+        uptime = datetime.datetime.now() - self.started
+        with self._lock:
+            calls = sum(stats.calls for stats in self.functions.values())
+            commands = sorted(self.commands.items(), key=lambda item: -item[1])[:5]
+            slow = list(self.slow)[-5:]
+        lines = [f'{calls} db calls in {str(uptime).split(".")[0]}']
+        if pool:
+            lines.append(f'pool {pool["in_use"]}/{pool["max_size"]} in use, {pool["waits"]} waits, '
+                         f'{pool["timeouts"]} timeouts, avg acquire {pool["avg_acquire_ms"]:.1f} ms')
+        lines.append('')
+        lines.append(f'{"function":<28}{"calls":>7}{"total s":>9}{"avg":>8}{"p95":>7}{"max":>8}{"wait":>7}{"rows":>7}')
+        for name, stats in self.top(limit):
+            lines.append(f'{name[:27]:<28}{stats.calls:>7}{stats.total_seconds:>9.1f}{stats.avg_ms:>8.1f}'
+                         f'{stats.percentile_ms(.95):>7.0f}{stats.max_seconds * 1000:>8.0f}'
+                         f'{stats.acquire_seconds / stats.calls * 1000:>7.1f}{stats.rows // stats.calls:>7}')
+        if commands:
+            lines.append('')
+            lines.append('db time by command: ' + ', '.join(f'{name} {seconds:.1f}s' for name, seconds in commands))
+        if slow:
+            lines.append('')
+            lines.append(f'slowest recent (over {self.slow_seconds * 1000:.0f} ms):')
+            for call in reversed(slow):
+                lines.append(f'{call.when:%H:%M:%S} {call.function} ({call.command or "background"}) '
+                             f'{call.seconds * 1000:.0f} ms, {call.rows} rows')
+        return '\n'.join(lines)
+
+    def reset(self):
+        with self._lock:
+            self.started = datetime.datetime.now()
+            self.functions.clear()
+            self.commands.clear()
+            self.slow.clear()
+
+
+def note_acquire(seconds: float):
+    call = _active_call.get()
+    if call is not None:
+        call.acquire_seconds += seconds
+
+
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    """Counts statements and the rows they return or change toward the db_helpers call running them."""
+
+    def execute(self, query, vars=None):
+        try:
+            return super().execute(query, vars)
+        finally:
+            call = _active_call.get()
+            if call is not None:
+                call.statements += 1
+                call.rows += max(self.rowcount, 0)
+
+
+db_stats = DbStats()
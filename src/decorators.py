@@ -1,5 +1,7 @@
 import functools
+import time
 from typing import Iterable
+from .command_profiler import check_passed
 from .helpers import *
 
 
@@ -8,10 +10,12 @@ def ss_channel(func):
 
     @functools.wraps(func)
     async def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
         ctx = args[0]
         if '⚔' not in ctx.channel.name:
             await ctx.send('Cannot use this bot in this channel, try a channel with `⚔` in the channel name.')
             return
+        check_passed('ss_channel', start)
         return await func(self, *args, **kwargs)
 
     return wrapper
@@ -22,10 +26,12 @@ def gambit_channel(func):
 
     @functools.wraps(func)
     async def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
         ctx = args[0]
         if 'gambit-bot-commands' not in ctx.channel.name:
             await ctx.send(f'Please use gambit commands in <#{GAMBIT_BOT_ID}>.')
             return
+        check_passed('gambit_channel', start)
         return await func(self, *args, **kwargs)
 
     return wrapper
@@ -36,10 +42,12 @@ def main_only(func):
 
     @functools.wraps(func)
     async def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
         ctx = args[0]
         if SCS not in ctx.guild.name:
             await ctx.send('This command can only be used in the main SCS Server.')
             return
+        check_passed('main_only', start)
         return await func(self, *args, **kwargs)
 
     return wrapper
@@ -50,10 +58,12 @@ def testing_only(func):
 
     @functools.wraps(func)
     async def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
         ctx = args[0]
         if 'testing_grounds' not in ctx.channel.name:
             await ctx.send('This is a testing only command. You can only run it in a testing_grounds channel.')
             return
+        check_passed('testing_only', start)
         return await func(self, *args, **kwargs)
 
     return wrapper
@@ -64,12 +74,14 @@ def has_sheet(func):
 
     @functools.wraps(func)
     async def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
         ctx = args[0]
         battle = self.battle_map.get(key_string(ctx))
         if battle is None:
             await ctx.send('Battle is not started.')
             return
         # kwargs['battle'] = battle
+        check_passed('has_sheet', start)
         return await func(self, *args, **kwargs)
 
     return wrapper
@@ -80,12 +92,14 @@ def no_battle(func):
 
     @functools.wraps(func)
     async def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
         ctx = args[0]
         battle = self.battle_map.get(key_string(ctx))
         if battle is not None:
             await ctx.send('A battle is already going in this channel.')
             return
         # kwargs['battle'] = battle
+        check_passed('no_battle', start)
         return await func(self, *args, **kwargs)
 
     return wrapper
@@ -96,7 +110,7 @@ def is_lead(func):
 
     @functools.wraps(func)
     async def wrapper(self, *args, **kwargs):
-
+        start = time.perf_counter()
         ctx = args[0]
 
         battle = self.battle_map.get(key_string(ctx))
@@ -108,6 +122,7 @@ def is_lead(func):
             if not (any(role.name in ['Leader', 'Advisor', 'SCS Admin', 'v2 Minion'] for role in user.roles)):
                 await ctx.send('Only a leader or advisor or admin can run this command.')
                 return
+        check_passed('is_lead', start)
         return await func(self, *args, **kwargs)
 
     return wrapper
@@ -119,10 +134,12 @@ def role_call(required: Iterable):
     def wrapper(func):
         @functools.wraps(func)
         async def wrapped_f(self, *args, **kwargs):
+            start = time.perf_counter()
             ctx = args[0]
             if not check_roles(ctx.author, required):
                 await response_message(ctx, f'You need to be one of {required} to run {ctx.command.name}')
                 return
+            check_passed('role_call', start)
             return await func(self, *args, **kwargs)
 
         return wrapped_f
@@ -136,12 +153,14 @@ def banned_channels(disallowed: Iterable):
     def wrapper(func):
         @functools.wraps(func)
         async def wrapped_f(self, *args, **kwargs):
+            start = time.perf_counter()
             ctx = args[0]
             if ctx.channel.name in disallowed:
                 message = await response_message(ctx, f'{ctx.command.name} is banned in this channel.')
 
                 await message.delete(delay=5)
                 return
+            check_passed('banned_channels', start)
             return await func(self, *args, **kwargs)
 
         return wrapped_f
@@ -154,8 +173,10 @@ def cache_update(func):
 
     @functools.wraps(func)
     async def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
         ctx = args[0]
         await self.cache.update(self)
+        check_passed('cache_update', start)
         return await func(self, *args, **kwargs)
 
     return wrapper
@@ -166,6 +187,7 @@ def flairing_required(func):
 
     @functools.wraps(func)
     async def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
         ctx = args[0]
         if not (check_roles(ctx.author, STAFF_LIST)):
             if ctx.channel.name != FLAIRING_CHANNEL_NAME:
@@ -175,6 +197,7 @@ def flairing_required(func):
         if not self.cache.flairing_allowed:
             await ctx.send(f'Flaring is currently disabled, please wait for a mod to re-enable it.')
             return
+        check_passed('flairing_required', start)
         return await func(self, *args, **kwargs)
 
     return wrapper
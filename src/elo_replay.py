@@ -0,0 +1,95 @@
+import dataclasses
+import datetime
+from typing import Dict, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .constants import DEFAULT_K, K_CHANGE, STARTING_K, STARTING_RATING
+from .elo_helpers import EloPlayer, rating_update
+
+
+class ReplayBattle(NamedTuple):
+    battle_id: int
+    winner: int
+    loser: int
+    forfeit: bool = False
+    finished: Optional[datetime.datetime] = None
+
+
+@dataclasses.dataclass
+class EloReplay:
+    """Result of replaying a league, one row per crew in `crew_ids` and one row per battle in `battle_ids`.
+
+    Column 0 of the before/after arrays is the winner and column 1 the loser, `ks` holds each battle's K values
+    from before it was played, the same numbers battle_elo_changes reports."""
+    crew_ids: np.ndarray
+    ratings: np.ndarray
+    k: np.ndarray
+    battle_ids: np.ndarray
+    crews: np.ndarray
+    before: np.ndarray
+    after: np.ndarray
+    ks: np.ndarray
+
+    def crew_ratings(self) -> Dict[int, Tuple[int, int]]:
+        return {int(crew_id): (int(rating), int(k)) for crew_id, rating, k in zip(self.crew_ids, self.ratings, self.k)}
+
+    def changes(self) -> np.ndarray:
+        return self.after - self.before
+
+    def battle_ratings(self):
+        """(battle_id, crew_id, rating_before, rating_after) rows in the order battle_elo_changes inserts them."""
+        for battle, crews, before, after in zip(self.battle_ids, self.crews, self.before, self.after):
+            for side in (0, 1):
+                yield int(battle), int(self.crew_ids[crews[side]]), int(before[side]), int(after[side])
+
+
+def replay_elo(battles: Sequence[ReplayBattle], initial: Mapping[int, Tuple[int, int]] = None,
+               pinned: Mapping[int, int] = None, k_reset_at: Optional[datetime.datetime] = None,
+               default_k: int = DEFAULT_K, starting_k: int = STARTING_K, k_change: int = K_CHANGE) -> EloReplay:
+    """Plays `battles` in order the way battle_elo_changes would one at a time.
+
+    Crews missing from `initial` (crew id -> (rating, k)) start at STARTING_RATING and STARTING_K, crews in `pinned`
+    have their rating set back before every battle they play, and the K of every crew rated so far drops to
+    DEFAULT_K at the first battle finished after `k_reset_at` like reset_k does two weeks into a season. The K
+    constants can be overridden to try other policies."""
+    initial = initial or {}
+    pinned = pinned or {}
+    crew_ids = sorted({crew for battle in battles for crew in battle[1:3]} | set(initial))
+    position = {crew_id: i for i, crew_id in enumerate(crew_ids)}
+    ratings = np.full(len(crew_ids), STARTING_RATING, dtype=np.int64)
+    k = np.full(len(crew_ids), starting_k, dtype=np.int64)
+    # Crews that have a crew_ratings row yet, reset_k only touches those
+    rated = np.zeros(len(crew_ids), dtype=bool)
+    for crew_id, (rating, crew_k) in initial.items():
+        ratings[position[crew_id]], k[position[crew_id]] = rating, crew_k
+        rated[position[crew_id]] = True
+    pinned_positions = {position[crew_id]: rating for crew_id, rating in pinned.items() if crew_id in position}
+
+    count = len(battles)
+    crews = np.empty((count, 2), dtype=np.int64)
+    before = np.empty((count, 2), dtype=np.int64)
+    after = np.empty((count, 2), dtype=np.int64)
+    ks = np.empty((count, 2), dtype=np.int64)
+    for i, battle in enumerate(battles):
+        if k_reset_at and battle.finished and battle.finished >= k_reset_at:
+            k[rated] = default_k
+            k_reset_at = None
+        winner, loser = position[battle.winner], position[battle.loser]
+        rated[[winner, loser]] = True
+        for side in (winner, loser):
+            if side in pinned_positions:
+                ratings[side] = pinned_positions[side]
+        crews[i] = winner, loser
+        before[i] = ratings[winner], ratings[loser]
+        ks[i] = k[winner], k[loser]
+        # Losers have default K
+        winner_change, loser_change = rating_update(EloPlayer(battle.winner, int(ratings[winner]), int(k[winner])),
+                                                    EloPlayer(battle.loser, int(ratings[loser]), default_k), 1)
+        ratings[winner] += winner_change
+        ratings[loser] += loser_change
+        after[i] = ratings[winner], ratings[loser]
+        if not battle.forfeit:
+            k[[winner, loser]] = np.maximum(k[[winner, loser]] - k_change, default_k)
+    return EloReplay(np.array(crew_ids, dtype=np.int64), ratings, k,
+                     np.array([battle.battle_id for battle in battles], dtype=np.int64), crews, before, after, ks)
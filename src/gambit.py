@@ -1,7 +1,10 @@
+import contextlib
 import dataclasses
 import discord
 import math
-from typing import Tuple, List
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from .constants import GAMBIT_RESET_WIN
 
 
 @dataclasses.dataclass
@@ -75,3 +78,147 @@ class Gambit:
 
     def __str__(self):
         return f'{self.team1} vs {self.team2}\n {self.bets_1} - {self.bets_2}'
+
+
+class Payout(NamedTuple):
+    member_id: int
+    crew: str
+    bet: int
+    # Coins paid out to a winner, minus the bet for a loser. This is what past_bets records
+    result: int
+
+    @property
+    def won(self) -> bool:
+        return self.result > 0
+
+
+def settle_bets(bets: Iterable[Tuple[int, int, str]], winner: str, winning_total: int,
+                losing_total: int) -> List[Payout]:
+    """One Payout per (member_id, amount, crew) bet. Winners get their bet back plus their share of the losing side
+    rounded up, a winning 0 coin bet pays GAMBIT_RESET_WIN."""
+    ratio = losing_total / winning_total if winning_total else 0
+    payouts = []
+    for member_id, amount, crew in bets:
+        if crew == winner:
+            final = amount + math.ceil(amount * ratio)
+            payouts.append(Payout(member_id, crew, amount, final or GAMBIT_RESET_WIN))
+        else:
+            payouts.append(Payout(member_id, crew, amount, -amount))
+    return payouts
+
+
+def payout_messages(payout: Payout, total: int, winner: str, loser: str) -> List[str]:
+    if payout.won:
+        return [f'You won {payout.result} G-Coins on your bet of {payout.bet} on {payout.crew} over {loser}! '
+                f'Congrats you now have {total} G-Coins!']
+    messages = [f'You lost {payout.bet} G-Coins on your bet on {payout.crew} over {winner}.']
+    if total > 0:
+        messages.append(f'You now have {total} coins remaining.')
+    else:
+        messages.append('You are all out of G-Coins, but worry not! If you place a 0 G-Coin bet'
+                        f' when you are bankrupt, if you win, you get {GAMBIT_RESET_WIN} G-Coins!')
+    return messages
+
+
+def payout_dms(payouts: Iterable[Payout], coins: Mapping[int, int], winner: str, loser: str,
+               get_user: Callable[[int], Optional[discord.abc.User]]) -> List[Tuple[discord.abc.User, List[str]]]:
+    """(member, messages) for every bettor the bot can still see, ready for Outbound.dm_all."""
+    messages = []
+    for payout in payouts:
+        member = get_user(payout.member_id)
+        if member:
+            messages.append((member, payout_messages(payout, coins.get(payout.member_id, 0), winner, loser)))
+    return messages
+
+
+def top_payouts(payouts: Iterable[Payout]) -> Tuple[Optional[Payout], Optional[Payout]]:
+    """The biggest win and the biggest loss."""
+    payouts = list(payouts)
+    wins = [payout for payout in payouts if payout.won]
+    losses = [payout for payout in payouts if not payout.won and payout.bet]
+    return (max(wins, key=lambda payout: payout.result, default=None),
+            max(losses, key=lambda payout: payout.bet, default=None))
+
+
+class LiveGambit:
+    """The running gambit kept in memory, so odds and the announcement embed don't need the database on every bet.
+
+    Team totals and each team's top bettor are updated as bets come in. seed replaces everything with what the
+    database has, the periodic recache uses it to correct any drift."""
+
+    def __init__(self):
+        self.gambit: Optional[Gambit] = None
+        self.version = 0
+        # Bets written to the database that bet hasn't added yet
+        self.placing_bets = 0
+        self._bets: Dict[int, Tuple[str, int]] = {}
+        self._names: Dict[int, str] = {}
+        self._totals: Dict[str, int] = {}
+        self._top: Dict[str, Tuple[int, int]] = {}
+
+    def seed(self, gambit: Optional[Gambit], bets: Iterable[Tuple[int, str, str, int]]) -> Dict[str, int]:
+        """Loads the gambit and its (member_id, nickname, crew, amount) bets, returning how far each team's total was
+        off from what was kept in memory."""
+        before = dict(self._totals) if self.gambit else {}
+        self.gambit = dataclasses.replace(gambit, bets_1=0, bets_2=0, top_1=(), top_2=()) if gambit else None
+        self._bets, self._names, self._top = {}, {}, {}
+        self._totals = {gambit.team1: 0, gambit.team2: 0} if gambit else {}
+        for member_id, nickname, crew, amount in bets:
+            self._add(member_id, nickname, crew, amount)
+        self.version += 1
+        return {team: total - before[team] for team, total in self._totals.items()
+                if team in before and total != before[team]}
+
+    def start(self, team1: str, team2: str, message_id: int):
+        self.seed(Gambit(team1, team2, False, message_id), ())
+
+    def lock(self, locked: bool):
+        if self.gambit:
+            self.gambit.locked = locked
+            self.version += 1
+
+    def clear(self):
+        self.seed(None, ())
+
+    @contextlib.contextmanager
+    def placing(self):
+        """Wraps a bet's make_bet and its bet call. The recache doesn't seed while one is open, the database could
+        already have the bet that bet is about to add."""
+        self.placing_bets += 1
+        self.version += 1
+        try:
+            yield
+        finally:
+            self.placing_bets -= 1
+            self.version += 1
+
+    def bet(self, member_id: int, nickname: str, crew: str, amount: int) -> int:
+        """Adds to the member's bet like make_bet does and returns their total bet."""
+        self._add(member_id, nickname, crew, amount)
+        self.version += 1
+        return self._bets[member_id][1]
+
+    def _add(self, member_id: int, nickname: str, crew: str, amount: int):
+        _, current = self._bets.get(member_id, (crew, 0))
+        total = current + amount
+        self._bets[member_id] = crew, total
+        self._names[member_id] = nickname
+        self._totals[crew] = self._totals.get(crew, 0) + amount
+        top = self._top.get(crew)
+        if top is None or top[0] == member_id or total > self._bets[top[0]][1]:
+            self._top[crew] = member_id, total
+
+    def member_bet(self, member_id: int) -> Tuple[str, int]:
+        return self._bets.get(member_id, ('', 0))
+
+    def _top_bet(self, crew: str) -> Tuple[str, int]:
+        top = self._top.get(crew)
+        return (self._names[top[0]], top[1]) if top else ()
+
+    def current(self) -> Optional[Gambit]:
+        """A Gambit like current_gambit returns, None when no gambit is running."""
+        if not self.gambit:
+            return None
+        team1, team2 = self.gambit.team1, self.gambit.team2
+        return dataclasses.replace(self.gambit, bets_1=self._totals.get(team1, 0), bets_2=self._totals.get(team2, 0),
+                                   top_1=self._top_bet(team1), top_2=self._top_bet(team2))
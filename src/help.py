@@ -89,6 +89,15 @@ help_doc = dict(
     po=HelpDoc(Categories.staff, 'Prints all final stand cbs in a summary'),
     disable=HelpDoc(Categories.staff, 'Disables the bot in a channel', '', 'ChannelMention'),
     usage=HelpDoc(Categories.staff, 'Shows the usage stats of each command'),
+    update_elos=HelpDoc(Categories.staff, 'Recomputes every crew rating in a league from its battles. Admin only',
+                        usage='LeagueId'),
+    syncroles=HelpDoc(Categories.staff, 'Writes every member\'s current roles to the database. Admin only'),
+    recachereport=HelpDoc(Categories.staff, 'Shows how long each part of the recent recaches took. Admin only'),
+    latency=HelpDoc(Categories.staff, 'Shows command latency percentiles and where the time goes. Admin only', '',
+                    'Optional[Count]'),
+    dbstats=HelpDoc(Categories.staff, 'Shows the slowest database calls since the bot started. Admin only', '',
+                    'Optional[Count]'),
+    outboundreport=HelpDoc(Categories.staff, 'Shows queued, sent and dropped bot messages by lane. Admin only'),
 
     deactivate=HelpDoc(Categories.staff, 'Deactivates a command so the bot will not '
                                          'be able to use it till reactivation, also reactivates commands', '',
@@ -9,15 +9,17 @@ from oauth2client.service_account import ServiceAccountCredentials
 
 from .bracket import Bracket, draw_bracket
 from .character import string_to_emote
+from .command_profiler import RENDER, phase
 from .db_helpers import add_member_and_crew, crew_correct, all_crews, update_crew, cooldown_finished, \
     remove_expired_cooldown, cooldown_current, find_member_crew, new_crew, auto_unfreeze, new_member_gcoins, \
-    current_gambit, member_bet, member_gcoins, make_bet, slots, all_member_roles, update_member_crew, \
-    remove_member_role, mod_slot, record_unflair, add_member_role, ba_standings, player_stocks, player_record, \
-    player_mvps, player_chars, ba_record, ba_elo, ba_chars, db_crew_members, crew_rankings, disband_crew_from_id, \
-    trinity_crews, elo_decay, reset_decay, first_crew_flair, track_finished_out, track_down_out, track_finished, \
-    update_member_roles, recent_unflair, get_bracket_predictions, crew_usage, all_crew_usage, all_crew_destiny, \
-    crew_to_last_played, hardcap_info, set_hardcap, hardcap_info_current
+    make_bet, all_member_roles, update_member_crew, remove_member_role, mod_slot, record_unflair, add_member_role, \
+    ba_standings, player_mvps, league_ratings, disband_crew_from_id, trinity_crews, elo_decay, reset_decay, \
+    first_crew_flair, track_finished_out, track_down_out, track_finished, update_member_roles, recent_unflair, \
+    get_bracket_predictions, crew_usage, all_crew_usage, all_crew_destiny, crew_to_last_played, set_hardcap
+from .db_async import adb
 from .gambit import Gambit
+from .lookup import FuzzyIndex
+from .outbound import outbound
 from .sheet_helpers import update_all_sheets
 
 if TYPE_CHECKING:
@@ -127,7 +129,8 @@ def check_roles(user: discord.Member, roles: Iterable) -> bool:
 
 
 async def send_sheet(channel: Union[discord.TextChannel, Context], battle: Battle) -> discord.Message:
-    embed_split = split_embed(embed=battle.embed(), length=2000)
+    with phase(RENDER):
+        embed_split = split_embed(embed=battle.embed(), length=2000)
     if battle.battle_over():
         if not all(battle.confirms):
             footer = ''
@@ -147,13 +150,13 @@ async def send_sheet(channel: Union[discord.TextChannel, Context], battle: Battl
                         footer += f'{leader}, '
                     footer = footer[:-2]
                     footer += ' please `,confirm`.'
-            await channel.send(footer)
+            await outbound.send(channel, footer)
     first = None
     for embed in embed_split:
         if not first:
-            first = await channel.send(embed=embed)
+            first = await outbound.send(channel, embed=embed)
         else:
-            await channel.send(embed=embed)
+            await outbound.send(channel, embed=embed)
     return first
 
 
@@ -247,7 +250,7 @@ def member_lookup(name: str, bot: 'ScoreSheetBot') -> Optional[discord.Member]:
     if len(name) >= 17:
         if (name.startswith('<') and name.endswith('>')) or name.isdigit():
             return user_by_id(name, bot)
-    true_name = process.extractOne(name, bot.cache.main_members.keys(), scorer=fuzz.ratio, score_cutoff=30)
+    true_name = bot.cache.member_index.extract_one(name, scorer=fuzz.ratio, score_cutoff=30)
     if true_name:
         return bot.cache.main_members[true_name[0]]
     else:
@@ -257,7 +260,7 @@ def member_lookup(name: str, bot: 'ScoreSheetBot') -> Optional[discord.Member]:
 def crew_lookup(crew_str: str, bot: 'ScoreSheetBot') -> Optional[Crew]:
     if crew_str.lower() in bot.cache.crews_by_tag:
         return bot.cache.crews_by_tag[crew_str.lower()]
-    true_crew = process.extractOne(crew_str, bot.cache.crews_by_name.keys(), score_cutoff=40)
+    true_crew = bot.cache.crew_index.extract_one(crew_str, scorer=fuzz.WRatio, score_cutoff=40)
     if true_crew:
         return bot.cache.crews_by_name[true_crew[0]]
     else:
@@ -271,8 +274,8 @@ def ambiguous_lookup(name: str, bot: 'ScoreSheetBot') -> Union[discord.Member, C
         if (name.startswith('<') and name.endswith('>')) or name.isdigit():
             return user_by_id(name, bot)
 
-    true_name = process.extractOne(name, bot.cache.main_members.keys(), scorer=fuzz.ratio)
-    true_crew = process.extractOne(name, bot.cache.crews_by_name.keys(), scorer=fuzz.ratio)
+    true_name = bot.cache.member_index.extract_one(name, scorer=fuzz.ratio)
+    true_crew = bot.cache.crew_index.extract_one(name, scorer=fuzz.ratio)
     if not true_crew:
         if not true_name:
             raise ValueError(f'{name} didn\'t match a crew or a name')
@@ -437,15 +440,7 @@ async def response_message(ctx: Context, msg: str) -> discord.Message:
 
 
 def crew_members(crew_input: Crew, bot: 'ScoreSheetBot') -> List[discord.Member]:
-    members = []
-    for member in discord.utils.get(bot.bot.guilds, name=SCS).members:
-        try:
-            cr = crew(member, bot)
-        except ValueError:
-            cr = None
-        if cr == crew_input.name:
-            members.append(member)
-    return members
+    return bot.cache.members_from_ids(bot.cache.crew_member_ids.get(crew_input.name, ()))
 
 
 def split_possibilities(two_things: str, sep: Optional[str] = ' ') -> List[Tuple[str, str]]:
@@ -456,18 +451,23 @@ def split_possibilities(two_things: str, sep: Optional[str] = ' ') -> List[Tuple
     return out
 
 
-def best_of_possibilities(combined: str, bot: 'ScoreSheetBot', only_use_crews=False):
-    pos = split_possibilities(combined)
-    all_role_names = {} if only_use_crews else {role.name for role in bot.cache.scs.roles}
-    all_role_names = set.union(set(bot.cache.crews), all_role_names)
-    best = ['', '', 0]
-    for sep in pos:
+def _score_splits(combined: str, bot: 'ScoreSheetBot', index: FuzzyIndex):
+    splits = []
+    for sep in split_possibilities(combined):
         if sep[0].lower() in bot.cache.crews_by_tag:
             sep = (bot.cache.crews_by_tag[sep[0].lower()].name, sep[1])
 
         if sep[1].lower() in bot.cache.crews_by_tag:
             sep = (sep[0], bot.cache.crews_by_tag[sep[1].lower()].name)
-        first, second = search_two_roles_in_list(sep[0], sep[1], all_role_names)
+        splits.append(sep)
+    matches = index.extract_many({part for sep in splits for part in sep}, scorer=fuzz.WRatio)
+    return [(sep, matches[sep[0]], matches[sep[1]]) for sep in splits]
+
+
+def best_of_possibilities(combined: str, bot: 'ScoreSheetBot', only_use_crews=False):
+    index = bot.cache.crew_index if only_use_crews else bot.cache.role_index
+    best = ['', '', 0]
+    for _, first, second in _score_splits(combined, bot, index):
         value = first[1] + second[1]
         if value > best[2]:
             best = [first[0], second[0], value]
@@ -475,34 +475,23 @@ def best_of_possibilities(combined: str, bot: 'ScoreSheetBot', only_use_crews=Fa
 
 
 def single_crew_plus_string(combined: str, bot: 'ScoreSheetBot'):
-    pos = split_possibilities(combined)
-    all_role_names = set(bot.cache.crews)
     best = ['', '', 0]
-    for sep in pos:
-        if sep[0].lower() in bot.cache.crews_by_tag:
-            sep = (bot.cache.crews_by_tag[sep[0].lower()].name, sep[1])
-
-        if sep[1].lower() in bot.cache.crews_by_tag:
-            sep = (sep[0], bot.cache.crews_by_tag[sep[1].lower()].name)
-        first, second = search_two_roles_in_list(sep[0], sep[1], all_role_names)
+    for sep, first, second in _score_splits(combined, bot, bot.cache.crew_index):
         value = max(first[1], second[1])
         if value > best[2]:
             best = [first[0], sep[1], value]
     return best
 
 
-def members_with_str_role(role: str, bot: 'ScoreSheetBot') -> Tuple[str, List[discord.Member], List[int]]:
-    all_role_names = {role.name for role in bot.cache.scs.roles}
-    all_role_names = set.union(set(bot.cache.crews), all_role_names)
-
-    actual = process.extractOne(role, all_role_names)[0]
+async def members_with_str_role(role: str, bot: 'ScoreSheetBot') -> Tuple[str, List[discord.Member], List[int]]:
+    actual = bot.cache.role_index.extract_one(role, scorer=fuzz.WRatio)[0]
     if role.lower() in bot.cache.crews_by_tag:
         actual = bot.cache.crews_by_tag[role.lower()].name
     out = []
     extra = []
     if actual in bot.cache.crews:
         cr = crew_lookup(actual, bot)
-        db_members = db_crew_members(cr)
+        db_members = await adb.db_crew_members(cr)
         mems = crew_members(cr, bot)
         for mem in mems:
             if mem.id in db_members:
@@ -511,20 +500,11 @@ def members_with_str_role(role: str, bot: 'ScoreSheetBot') -> Tuple[str, List[di
         extra = db_members
 
     else:
-        for member in bot.cache.scs.members:
-            role_names = {r.name for r in member.roles}
-            if actual in role_names:
-                out.append(member)
+        out = bot.cache.members_from_ids(bot.cache.role_member_ids(actual))
     return actual, out, extra
 
 
-def search_two_roles_in_list(first_role: str, second_role: str, everything):
-    first = process.extractOne(first_role, everything)
-    second = process.extractOne(second_role, everything)
-    return first, second
-
-
-def overlap_members(first: str, second: str, bot: 'ScoreSheetBot') -> List[discord.Member]:
+def _overlap_sets(first: str, second: str, bot: 'ScoreSheetBot') -> Tuple[Set[int], Set[int]]:
     crew_role = None
     other_role = None
     if first in bot.cache.crews:
@@ -536,51 +516,19 @@ def overlap_members(first: str, second: str, bot: 'ScoreSheetBot') -> List[disco
     if second in bot.cache.crews:
         crew_role = second
         other_role = first
-    out = []
     if crew_role:
-        for member in bot.cache.scs.members:
-            try:
-                if crew(member, bot) == crew_role:
-                    for role in member.roles:
-                        if role.name == other_role:
-                            out.append(member)
-            except ValueError:
-                continue
-    else:
-        for member in bot.cache.scs.members:
-            role_names = {role.name for role in member.roles}
-            if first in role_names and second in role_names:
-                out.append(member)
-    return out
+        return bot.cache.crew_member_ids.get(crew_role, set()), bot.cache.role_member_ids(other_role)
+    return bot.cache.role_member_ids(first), bot.cache.role_member_ids(second)
+
+
+def overlap_members(first: str, second: str, bot: 'ScoreSheetBot') -> List[discord.Member]:
+    base, other = _overlap_sets(first, second, bot)
+    return bot.cache.members_from_ids(base & other)
 
 
 def noverlap_members(first: str, second: str, bot: 'ScoreSheetBot') -> List[discord.Member]:
-    crew_role = None
-    other_role = None
-    if first in bot.cache.crews:
-        if second in bot.cache.crews:
-            raise ValueError(f'Interpreted as {first} and {second}. '
-                             f'You can\'t have members on two crews! Try to be more specific.')
-        crew_role = first
-        other_role = second
-    if second in bot.cache.crews:
-        crew_role = second
-        other_role = first
-    out = []
-    if crew_role:
-        for member in bot.cache.scs.members:
-            try:
-                if crew(member, bot) == crew_role:
-                    if not check_roles(member, [other_role]):
-                        out.append(member)
-            except ValueError:
-                continue
-    else:
-        for member in bot.cache.scs.members:
-            role_names = {role.name for role in member.roles}
-            if first in role_names and second not in role_names:
-                out.append(member)
-    return out
+    base, other = _overlap_sets(first, second, bot)
+    return bot.cache.members_from_ids(base - other)
 
 
 async def wait_for_reaction_on_message(confirm: str, cancel: Optional[str],
@@ -656,22 +604,21 @@ async def wait_for_multiple_reactions(reactions: List[str], message: discord.Mes
 
 async def handle_decay(bot: 'ScoreSheetBot'):
     # TODO Make this start 2 weeks after the reset
-    cutoffs = [7, 14, 21, 28, 1000]
-    elo_loss = [0, DEFAULT_K / 2, DEFAULT_K, DEFAULT_K * 2, 0]
+    cutoffs = DECAY_CUTOFFS
+    elo_loss = DECAY_ELO_LOSS
     crews = bot.cache.crews_by_name.values()
-    crews_to_plated = crew_to_last_played()
+    crews_to_plated = await adb.crew_to_last_played()
     last_played = {cr[0]: cr[1] for cr in crews_to_plated}
     crews_to_message = []
-    exempt = ['EFB', 'EVIL', 'S~R', 'JettFakes']
     for cr in crews:
-        if cr.abbr in exempt or not top_percentage(cr):
+        if cr.abbr in DECAY_EXEMPT or not top_percentage(cr):
             continue
         if cr.name in last_played:
             timing = last_played[cr.name]
         else:
             timing = None
         if not timing:
-            first_flair = first_crew_flair(cr)
+            first_flair = await adb.first_crew_flair(cr)
             first_flair = datetime(first_flair.year, first_flair.month, first_flair.day)
             timing = datetime(2024, month=7, day=1)
             if first_flair > timing:
@@ -683,9 +630,10 @@ async def handle_decay(bot: 'ScoreSheetBot'):
 
         if time_since.days > cutoffs[cr.decay_level]:
             crews_to_message.append((cr, timing))
-            elo_decay(cr, elo_loss[cr.decay_level])
+            await adb.elo_decay(cr, elo_loss[cr.decay_level])
+            bot.cache_value.ratings_changed({cr.name: cr.trinity_rating - elo_loss[cr.decay_level]})
         elif cr.decay_level > 0 and time_since.days < cutoffs[0]:
-            reset_decay(cr)
+            await adb.reset_decay(cr)
 
     for cr, timing in crews_to_message:
         next_cutoff = timing + timedelta(days=cutoffs[cr.decay_level + 1])
@@ -704,14 +652,11 @@ async def handle_decay(bot: 'ScoreSheetBot'):
                        'if it has been more than a month since your last ranked crew battle.'
         message += '\nIf you have any questions you can ask in <#492166249174925312>.'
 
-        await bot.cache_value.channels.testing.send(message)
+        outbound.log(bot.cache_value.channels.testing, message)
         for leader_id in cr.leader_ids:
             leader = bot.bot.get_user(leader_id)
-            try:
-                if leader:
-                    await leader.send(message)
-            except discord.errors.Forbidden:
-                await bot.cache.channels.flairing_questions.send(f'{leader.mention}: {message}')
+            if leader:
+                outbound.dm(leader, message, fallback=bot.cache.channels.flairing_questions)
 
 
 def member_crew_to_db(member: discord.Member, bot: 'ScoreSheetBot'):
@@ -725,9 +670,9 @@ def member_crew_to_db(member: discord.Member, bot: 'ScoreSheetBot'):
         add_member_and_crew(member, member_crew)
 
 
-def calc_hardcap(cr: Crew) -> Tuple[int, int, int]:
+async def calc_hardcap(cr: Crew) -> Tuple[int, int, int]:
     base_cap = 50
-    players, battles = hardcap_info(cr)
+    players, battles = await adb.hardcap_info(cr)
     activity = players / (cr.member_count - len(cr.crew_staff))
 
     diversity = 0
@@ -745,9 +690,9 @@ def calc_hardcap(cr: Crew) -> Tuple[int, int, int]:
     return base_cap + diversity + cr_activity, diversity, cr_activity
 
 
-def calc_hardcap_current(cr: Crew) -> Tuple[int, int, int, int, float, int]:
+async def calc_hardcap_current(cr: Crew) -> Tuple[int, int, int, int, float, int]:
     base_cap = 50
-    players, battles = hardcap_info_current(cr, [CURRENT_LEAGUE_ID,35])
+    players, battles = await adb.hardcap_info_current(cr, [CURRENT_LEAGUE_ID,35])
     activity = players / (cr.member_count - len(cr.crew_staff))
 
     diversity = 0
@@ -764,16 +709,21 @@ def calc_hardcap_current(cr: Crew) -> Tuple[int, int, int, int, float, int]:
     return base_cap + diversity + cr_activity, diversity, cr_activity, players, activity, battles
 
 
-def crew_update(bot: 'ScoreSheetBot'):
+async def crew_update(bot: 'ScoreSheetBot'):
+    # Only the reads and writes go to the db threads, the cache is only ever changed on the event loop
+    db_crews = sorted(await adb.all_crews(), key=lambda x: x.name)
+    usage = {cr[2]: cr[0] for cr in await adb.all_crew_usage()}
+    destiny = {cr[0]: [cr[1], cr[2], cr[3], cr[4]] for cr in await adb.all_crew_destiny()}
+    ratings = None
+    if bot.cache_value.cycles_since_rebuild == 0 or not len(bot.cache_value.leaderboard):
+        ratings = await adb.league_ratings()
+
     cached_crews: Dict[int, Crew] = {cr.role_id: cr for cr in bot.cache_value.crews_by_name.values() if
                                      cr.role_id != -1}
-    db_crews = sorted(all_crews(), key=lambda x: x.name)
-
-    usage = {cr[2]: cr[0] for cr in all_crew_usage()}
-    destiny = {cr[0]: [cr[1], cr[2], cr[3], cr[4]] for cr in all_crew_destiny()}
-    rankings = crew_rankings()
-
+    if ratings is not None:
+        bot.cache_value.seed_rankings(ratings)
     missing = []
+    changed = []
     for db_crew in db_crews:
         if db_crew.discord_id in cached_crews:
             cached = cached_crews.pop(db_crew.discord_id)
@@ -783,7 +733,7 @@ def crew_update(bot: 'ScoreSheetBot'):
 
         formatted = (cached.role_id, cached.abbr, cached.name, cached.overflow)
         if formatted != (db_crew.discord_id, db_crew.tag, db_crew.name, db_crew.overflow):
-            update_crew(cached)
+            changed.append(cached)
         if db_crew.softcap_max > 0:
             if db_crew.db_id in usage:
                 db_crew.softcap_used = usage[db_crew.db_id]
@@ -793,34 +743,32 @@ def crew_update(bot: 'ScoreSheetBot'):
         #     db_crew.destiny_opponent = destiny[db_crew.db_id][1]
         #     db_crew.destiny_rank = destiny[db_crew.db_id][2]
         #     db_crew.destiny_opt_out = destiny[db_crew.db_id][3]
-        bot.cache_value.crews_by_name[cached.name].fromDbCrew(db_crew)
-        if db_crew.name in rankings:
-            bot.cache_value.crews_by_name[cached.name].set_rankings(*rankings[db_crew.name])
-    for cr in cached_crews.values():
-        update_crew(cr)
+        cached.fromDbCrew(db_crew)
+    bot.cache_value.stamp_rankings()
+    for cr in changed + list(cached_crews.values()):
+        await adb.update_crew(cr)
 
 
 async def cooldown_handle(bot: 'ScoreSheetBot'):
-    for user_id in cooldown_finished():
+    for user_id in await adb.cooldown_finished():
         member = bot.cache_value.scs.get_member(user_id)
         if member:
             if check_roles(member, ['12h Join Cooldown']):
                 await member.remove_roles(bot.cache_value.roles.join_cd)
-                await bot.cache_value.channels.flair_log.send(f'{str(member)}\'s join cooldown ended.')
+                outbound.log(bot.cache_value.channels.flair_log, f'{str(member)}\'s join cooldown ended.')
             else:
-                remove_expired_cooldown(user_id)
+                await adb.remove_expired_cooldown(user_id)
         else:
-            remove_expired_cooldown(user_id)
+            await adb.remove_expired_cooldown(user_id)
 
-    uids = {item[0] for item in cooldown_current()}
-    for member in bot.cache_value.scs.members:
-        if check_roles(member, ['12h Join Cooldown']) and member.id not in uids:
-            await member.remove_roles(bot.cache_value.roles.join_cd)
-            await bot.cache_value.channels.flair_log.send(f'{str(member)}\'s join cooldown ended.')
+    uids = {item[0] for item in await adb.cooldown_current()}
+    for member in bot.cache_value.members_from_ids(bot.cache_value.role_member_ids(JOIN_CD) - uids):
+        await member.remove_roles(bot.cache_value.roles.join_cd)
+        outbound.log(bot.cache_value.channels.flair_log, f'{str(member)}\'s join cooldown ended.')
 
 
 async def track_handle(bot: 'ScoreSheetBot'):
-    for mem_id, name, months in track_finished():
+    for mem_id, name, months in await adb.track_finished():
         mem = bot.cache.scs.get_member(mem_id)
         if mem:
             if check_roles(mem, [name]):
@@ -828,10 +776,10 @@ async def track_handle(bot: 'ScoreSheetBot'):
                     await track_decrement(mem, bot)
             else:
                 if months == 1:
-                    update_member_roles(mem)
+                    await adb.update_member_roles(mem)
         else:
             for _ in range(months):
-                track_down_out(mem_id)
+                await adb.track_down_out(mem_id)
 
 
 async def track_decrement(member: discord.Member, bot: 'ScoreSheetBot'):
@@ -842,7 +790,7 @@ async def track_decrement(member: discord.Member, bot: 'ScoreSheetBot'):
             await member.remove_roles(role)
             msg = f'{member.display_name} moved from {role.name} to '
             if current_track > 0:
-                if role.name == TRUE_LOCKED and not recent_unflair(member.id):
+                if role.name == TRUE_LOCKED and not await adb.recent_unflair(member.id):
                     new_role = discord.utils.get(bot.cache.scs.roles, name=FULL_TRACK[current_track - 2])
                 else:
                     new_role = discord.utils.get(bot.cache.scs.roles, name=FULL_TRACK[current_track - 1])
@@ -850,7 +798,7 @@ async def track_decrement(member: discord.Member, bot: 'ScoreSheetBot'):
                 msg += f'{new_role.name}.'
             else:
                 msg += 'no track.'
-            await bot.cache_value.channels.flair_log.send(msg)
+            outbound.log(bot.cache_value.channels.flair_log, msg)
 
 
 def strfdelta(tdelta, fmt):
@@ -913,10 +861,14 @@ class TriforceStatsPaged(menus.ListPageSource):
 
 
 class PlayerStatsPaged(menus.ListPageSource):
-    def __init__(self, member: discord.Member, bot: 'ScoreSheetBot'):
+    def __init__(self, pages: List[discord.Embed]):
+        super().__init__(pages, per_page=1)
+
+    @classmethod
+    async def load(cls, member: discord.Member, bot: 'ScoreSheetBot') -> 'PlayerStatsPaged':
         season_stats = discord.Embed(title=f"Season Stats for {str(member)}", color=member.color)
-        weighted, taken, lost, mvps = player_stocks(member, True)
-        total, wins = player_record(member, True)
+        weighted, taken, lost, mvps = await adb.player_stocks(member, True)
+        total, wins = await adb.player_record(member, True)
         title = f'Crew Battle Stats for {str(member)}'
         season_stats.add_field(name='Crews record while participating', value=f'{wins}/{total - wins}', inline=True)
 
@@ -927,13 +879,13 @@ class PlayerStatsPaged(menus.ListPageSource):
         season_stats.add_field(name='Weighted Taken', value=f'{round(weighted, 2)}', inline=True)
         season_stats.add_field(name='Ratio', value=f'{round(taken / max(lost, 1), 2)}', inline=True)
         season_stats.add_field(name='Weighted Ratio', value=f'{round(weighted / max(lost, 1), 2)}', inline=True)
-        pc = player_chars(member, True)
+        pc = await adb.player_chars(member, True)
         season_stats.add_field(name='Characters played', value='how many battles played in ', inline=False)
         for char in pc:
             emoji = string_to_emote(char[1], bot.bot)
             season_stats.add_field(name=emoji, value=f'{char[0]}', inline=True)
-        weighted, taken, lost, mvps = player_stocks(member)
-        total, wins = player_record(member)
+        weighted, taken, lost, mvps = await adb.player_stocks(member)
+        total, wins = await adb.player_record(member)
         title = f'Crew Battle Stats for {str(member)}'
         cb_stats = discord.Embed(title=title, color=member.color)
         cb_stats.add_field(name='Crews record while participating', value=f'{wins}/{total - wins}', inline=True)
@@ -945,18 +897,18 @@ class PlayerStatsPaged(menus.ListPageSource):
         cb_stats.add_field(name='Weighted Taken', value=f'{round(weighted, 2)}', inline=True)
         cb_stats.add_field(name='Ratio', value=f'{round(taken / max(lost, 1), 2)}', inline=True)
         cb_stats.add_field(name='Weighted Ratio', value=f'{round(weighted / max(lost, 1), 2)}', inline=True)
-        pc = player_chars(member)
+        pc = await adb.player_chars(member)
         cb_stats.add_field(name='Characters played', value='how many battles played in ', inline=False)
         for char in pc:
             emoji = string_to_emote(char[1], bot.bot)
             cb_stats.add_field(name=emoji, value=f'{char[0]}', inline=True)
 
         ba_stats = discord.Embed(title=f'Battle Arena Stats for {str(member)}', color=member.color)
-        elo = ba_elo(member)
+        elo = await adb.ba_elo(member)
         if elo:
 
-            wins, losses = ba_record(member)
-            elo = ba_elo(member)
+            wins, losses = await adb.ba_record(member)
+            elo = await adb.ba_elo(member)
             ba_stats.add_field(name='record', value=f'{wins}/{losses}', inline=True)
             ba_stats.add_field(name='winrate', value=f'{round(wins / (losses + wins), 2) * 100}%', inline=True)
 
@@ -964,14 +916,13 @@ class PlayerStatsPaged(menus.ListPageSource):
             # TODO Add ranking here
 
             ba_stats.add_field(name='Characters played', value='how many matches played in ', inline=False)
-            chars = ba_chars(member)
+            chars = await adb.ba_chars(member)
             for char in chars:
                 emoji = string_to_emote(char[1], bot.bot)
                 ba_stats.add_field(name=emoji, value=f'{char[0]}', inline=True)
         else:
             ba_stats.description = 'This member has no battle arena history.'
-        data = [season_stats, cb_stats, ba_stats]
-        super().__init__(data, per_page=1)
+        return cls([season_stats, cb_stats, ba_stats])
 
     async def format_page(self, menu, entries) -> discord.Embed:
         return entries
@@ -1041,66 +992,62 @@ def battle_summary(bot: 'ScoreSheetBot', battle_type: BattleType) -> Optional[di
 
 
 async def overflow_anomalies(bot: 'ScoreSheetBot') -> Tuple[Set, Set]:
-    overflow_role = set()
-    for member in bot.cache.scs.members:
-        if check_roles(member, OVERFLOW_ROLE):
-            overflow_role.add(member.id)
-    other_set = set()
-    other_members = bot.cache.overflow_server.members
-    for member in other_members:
-        if any((role.name in bot.cache.crews for role in member.roles)):
-            other_set.add(member.id)
-            continue
+    overflow_role = bot.cache.role_member_ids(OVERFLOW_ROLE)
+    other_set = bot.cache.crew_role_member_ids(bot.cache.overflow_server)
     first = overflow_role - other_set
     for mem_id in first:
         mem = bot.cache.scs.get_member(mem_id)
+        if not mem:
+            continue
         await mem.remove_roles(bot.cache.roles.overflow, bot.cache.roles.leader, bot.cache.roles.advisor)
         await mem.edit(nick=nick_without_prefix(mem.display_name))
-        crew_name = find_member_crew(mem_id)
+        crew_name = await adb.find_member_crew(mem_id)
         out_str = f'{str(mem)} left the overflow server and lost their roles here.'
         if crew_name:
             cr = crew_lookup(crew_name, bot)
-            if bot.cache.roles.join_cd.id in all_member_roles(mem_id):
-                mod_slot(cr, 1)
-                unflairs, remaining, total = record_unflair(mem_id, cr, True)
+            if bot.cache.roles.join_cd.id in await adb.all_member_roles(mem_id):
+                await adb.mod_slot(cr, 1)
+                unflairs, remaining, total = await adb.record_unflair(mem_id, cr, True)
 
                 out_str += (
                     f'\n{str(mem_id)} was on 12h cooldown so {cr.name} gets back a slot ({remaining}/{total})')
             # Else refund 1/3 slot
             else:
-                unflairs, remaining, total = record_unflair(mem_id, cr, False)
+                unflairs, remaining, total = await adb.record_unflair(mem_id, cr, False)
 
                 if unflairs == 3:
                     out_str += f'{cr.name} got a flair slot back for 3 unflairs. {remaining}/{total} left.'
                 else:
                     out_str += f'{unflairs}/3 unflairs for returning a slot.'
             out_str += f'They were previously on {crew_name}'
-        await bot.cache.channels.flair_log.send(out_str)
+        outbound.log(bot.cache.channels.flair_log, out_str)
     second = other_set - overflow_role
     for mem_id in second:
         mem = bot.cache.overflow_server.get_member(mem_id)
+        if not mem:
+            continue
         for role in mem.roles:
             if role.name in bot.cache.crews:
                 out_str = \
                     (f'{str(mem)} no longer has the overflow role in the main server so they have been unflaired from'
                      f'{role.name}.')
                 cr = crew_lookup(role.name, bot)
-                if bot.cache.roles.join_cd.id in all_member_roles(mem_id):
-                    mod_slot(cr, 1)
-                    unflairs, remaining, total = record_unflair(mem_id, cr, True)
+                if bot.cache.roles.join_cd.id in await adb.all_member_roles(mem_id):
+                    await adb.mod_slot(cr, 1)
+                    unflairs, remaining, total = await adb.record_unflair(mem_id, cr, True)
 
                     out_str += (
                         f'\n{str(mem_id)} was on 12h cooldown so {cr.name} gets back a slot ({remaining}/{total})')
                 # Else refund 1/3 slot
                 else:
-                    unflairs, remaining, total = record_unflair(mem_id, cr, False)
+                    unflairs, remaining, total = await adb.record_unflair(mem_id, cr, False)
 
                     if unflairs == 3:
                         out_str += f'{cr.name} got a flair slot back for 3 unflairs. {remaining}/{total} left.'
                     else:
                         out_str += f'{unflairs}/3 unflairs for returning a slot.'
                 await mem.remove_roles(role)
-                await bot.cache.channels.flair_log.send(out_str)
+                outbound.log(bot.cache.channels.flair_log, out_str)
 
     return first, second
 
@@ -1139,10 +1086,10 @@ def add_months(source_date, months):
 
 
 async def handle_unfreeze(bot: 'ScoreSheetBot'):
-    unfrozen = auto_unfreeze()
+    unfrozen = await adb.auto_unfreeze()
     if unfrozen:
         for cr in unfrozen:
-            await bot.cache.channels.flair_log.send(f'{cr[0]} finished their registration freeze.')
+            outbound.log(bot.cache.channels.flair_log, f'{cr[0]} finished their registration freeze.')
 
 
 def closest_command(command: str, bot: 'ScoreSheetBot'):
@@ -1158,13 +1105,13 @@ async def join_gambit(member: discord.Member, bot: 'ScoreSheetBot') -> bool:
         await member.send(f'Timed out or canceled! You need to respond within 30 seconds!')
         return False
 
-    await member.send(f'Welcome to gambit! Here are {new_member_gcoins(member)} coins for your trouble.')
+    await member.send(f'Welcome to gambit! Here are {await adb.new_member_gcoins(member)} coins for your trouble.')
     # TODO add gambit guide right here
     return True
 
 
-def validate_bet(member: discord.Member, on: Crew, amount: int, bot: 'ScoreSheetBot'):
-    cg = current_gambit()
+async def validate_bet(member: discord.Member, on: Crew, amount: int, bot: 'ScoreSheetBot'):
+    cg = bot.cache.gambit.current()
     if on.name not in [cg.team1, cg.team2]:
         raise ValueError(
             f'{on.name} not one of the two crews in the current gambit ({cg.team1}, {cg.team2}).')
@@ -1177,8 +1124,8 @@ def validate_bet(member: discord.Member, on: Crew, amount: int, bot: 'ScoreSheet
         raise ValueError(
             f'{member.mention} is on {member_crew}, a crew competing in the gambit and cannot participate.')
 
-    current = member_gcoins(member)
-    team, bet_amount = member_bet(member)
+    current = await adb.member_gcoins(member)
+    team, bet_amount = bot.cache.gambit.member_bet(member.id)
     if current == 0 and not team:
         return
     if amount > current:
@@ -1193,8 +1140,8 @@ def validate_bet(member: discord.Member, on: Crew, amount: int, bot: 'ScoreSheet
 
 async def confirm_bet(ctx: Context, on: Crew, amount: int, bot: 'ScoreSheetBot') -> bool:
     member = ctx.author
-    current = member_gcoins(member)
-    team, bet_amount = member_bet(member)
+    current = await adb.member_gcoins(member)
+    team, bet_amount = bot.cache.gambit.member_bet(member.id)
     if team:
         msg = await ctx.send(f'{str(member)} has {bet_amount} already on'
                              f' {team} do you want to increase that to {bet_amount + amount}?')
@@ -1205,8 +1152,10 @@ async def confirm_bet(ctx: Context, on: Crew, amount: int, bot: 'ScoreSheetBot')
     if not await wait_for_reaction_on_message(YES, NO, msg, member, bot.bot):
         await ctx.send(f'{member.mention}: Your bet timed out or was canceled! You need to respond within 30 seconds!')
         return False
-    validate_bet(member, on, amount, bot)
-    final = make_bet(member, on, amount)
+    await validate_bet(member, on, amount, bot)
+    with bot.cache.gambit.placing():
+        final = await adb.make_bet(member, on, amount)
+        bot.cache.gambit.bet(member.id, member.display_name, on.name, amount)
     if amount == 0:
         await ctx.send(
             f'{member.mention}: You have placed a reset bet of 0 with a chance to win back in with 220 G-Coins.')
@@ -1263,11 +1212,12 @@ def crew_stdev(crews: List[Crew]) -> float:
 def crew_bar_chart(crews: List[Crew]):
     member_numbers = [cr.member_count for cr in crews]
     bins = 20
-    plt.hist(member_numbers, bins=bins)
-    plt.title('Crew Sizes')
-    plt.xlabel('Crews')
-    plt.ylabel('Sizes')
-    plt.savefig('cr.png')
+    with phase(RENDER):
+        plt.hist(member_numbers, bins=bins)
+        plt.title('Crew Sizes')
+        plt.xlabel('Crews')
+        plt.ylabel('Sizes')
+        plt.savefig('cr.png')
 
 
 def avg_flairs(flairs: List[Tuple[str, int]]) -> float:
@@ -1283,21 +1233,22 @@ def flair_stdev(flairs: List[Tuple[str, int]]) -> float:
 def flair_bar_chart(flairs: List[Tuple[str, int]]):
     member_numbers = [fl[1] for fl in flairs]
     bins = 20
-    plt.hist(member_numbers, bins=bins)
-    plt.title('Crew Flairs last 30 days')
-    plt.xlabel('Crews')
-    plt.ylabel('Flairs')
-    plt.savefig('fl.png')
+    with phase(RENDER):
+        plt.hist(member_numbers, bins=bins)
+        plt.title('Crew Flairs last 30 days')
+        plt.xlabel('Crews')
+        plt.ylabel('Flairs')
+        plt.savefig('fl.png')
 
 
 def top_percentage(crew: Crew) -> bool:
     return crew.ranking / crew.total_crews <= .4
 
 
-def calc_total_slots(cr: Crew) -> Tuple[int, int, int, int]:
+async def calc_total_slots(cr: Crew) -> Tuple[int, int, int, int]:
     rollover_max = 3
     base = 7  # if top_percentage(cr) else 7
-    sl = slots(cr)
+    sl = await adb.slots(cr)
     if sl and not cr.freeze:
         rollover = sl[0]
     else:
@@ -1329,7 +1280,7 @@ async def unflair_gone_member(ctx: Context, user: str, bot: 'ScoreSheetBot'):
     except ValueError:
         raise ValueError(f'{user} is not a mention or an id. Try again.')
     # Get crew of gone member
-    cr = find_member_crew(user_id)
+    cr = await adb.find_member_crew(user_id)
     # Check if author is leader of that crew or admin
     pl = power_level(ctx.author)
     if pl < 3:
@@ -1340,36 +1291,36 @@ async def unflair_gone_member(ctx: Context, user: str, bot: 'ScoreSheetBot'):
         if pl < 1:
             await response_message(ctx, f'{ctx.author.mention} needs to be an advisor or leader to unflair others.')
             return
-    crew_name = find_member_crew(user_id)
+    crew_name = await adb.find_member_crew(user_id)
     if not crew_name:
         await response_message(ctx, f'{user} is not on a crew and not on the server.')
         return
     # Remove crew role
     cr = crew_lookup(crew_name, bot)
     roles = bot.cache.roles
-    remove_member_role(user_id, cr.role_id)
+    await adb.remove_member_role(user_id, cr.role_id)
     desc = [f'Roles lost by {user_id}:', cr.name]
-    member_roles = all_member_roles(user_id)
+    member_roles = await adb.all_member_roles(user_id)
     # Remove leadership + overflow role
     roles_to_remove = [roles.overflow, roles.leader, roles.advisor]
     for role in roles_to_remove:
         if role.id in member_roles:
             desc.append(role.name)
-            remove_member_role(user_id, role.id)
+            await adb.remove_member_role(user_id, role.id)
 
     # Remove from current crews
-    update_member_crew(user_id, None)
+    await adb.update_member_crew(user_id, None)
 
     # Unflair log in db
     # Refund slot if 12h cd (do not remove)
     if roles.join_cd.id in member_roles:
-        mod_slot(cr, 1)
-        unflairs, remaining, total = record_unflair(user_id, cr, True)
+        await adb.mod_slot(cr, 1)
+        unflairs, remaining, total = await adb.record_unflair(user_id, cr, True)
 
         await ctx.send(f'{str(user_id)} was on 12h cooldown so {cr.name} gets back a slot ({remaining}/{total})')
     # Else refund 1/3 slot
     else:
-        unflairs, remaining, total = record_unflair(user_id, cr, False)
+        unflairs, remaining, total = await adb.record_unflair(user_id, cr, False)
 
         if unflairs == 3:
             await ctx.send(f'{cr.name} got a flair slot back for 3 unflairs. {remaining}/{total} left.')
@@ -1385,8 +1336,8 @@ async def unflair_gone_member(ctx: Context, user: str, bot: 'ScoreSheetBot'):
         if track < 2:
             if track >= 0:
                 desc.append(tracks[track].name)
-                remove_member_role(user_id, tracks[track].id)
-            add_member_role(user_id, tracks[track + 1].id)
+                await adb.remove_member_role(user_id, tracks[track].id)
+            await adb.add_member_role(user_id, tracks[track + 1].id)
             desc.append('Roles Added:')
             desc.append(tracks[track + 1].name)
     desc.append(f'\nChanges Made By: {str(ctx.author)} {ctx.author.id}')
@@ -1438,10 +1389,6 @@ async def set_categories(member: discord.Member, categories: List[discord.Role])
         await member.remove_roles(*has_not)
 
 
-async def clear_current_cbs(bot: 'ScoreSheetBot'):
-    await bot.cache.channels.current_cbs.purge()
-
-
 async def clear_bracket(bot: 'ScoreSheetBot'):
     await bot.cache.channels.master_bracket.purge()
 
@@ -1450,7 +1397,7 @@ async def send_bracket(bot: 'ScoreSheetBot'):
     if bot.cache.crews:
         bracket_crews = playoff_crews(bot)
         br = Bracket(bracket_crews, None)
-        predictions = get_bracket_predictions(420)
+        predictions = await adb.get_bracket_predictions(420)
         for prediction in predictions:
             br.report_winner(prediction[0])
         await bot.cache.channels.master_bracket.send(file=draw_bracket(br.matches))
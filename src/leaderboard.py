@@ -0,0 +1,82 @@
+import threading
+from typing import Dict, List, Mapping, Optional, Tuple
+
+RATING_SPAN = 4096
+
+
+class Leaderboard:
+    """Crew ratings for the current league with `rank() over (order by rating desc)` answered in O(log n).
+
+    Ratings are counted in a Fenwick tree indexed by rating, so a crew's rank is one plus the number of crews rated
+    strictly higher, and moving a crew is two tree updates. The tree covers RATING_SPAN ratings around the seed and
+    is rebuilt around any rating that falls outside it. Calls are safe from the db worker threads."""
+
+    def __init__(self, ratings: Mapping[str, int] = None):
+        self._lock = threading.RLock()
+        self.reset(ratings or {})
+
+    def reset(self, ratings: Mapping[str, int]):
+        with self._lock:
+            self._ratings: Dict[str, int] = {name: int(rating) for name, rating in ratings.items()}
+            values = self._ratings.values()
+            middle = (min(values) + max(values)) // 2 if values else 1500
+            self._low = min(min(values, default=middle), middle - RATING_SPAN // 2)
+            self._size = max(RATING_SPAN, max(values, default=middle) - self._low + 1)
+            self._tree = [0] * (self._size + 1)
+            for rating in values:
+                self._add(rating, 1)
+
+    def __len__(self) -> int:
+        return len(self._ratings)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ratings
+
+    def rating(self, name: str) -> Optional[int]:
+        return self._ratings.get(name)
+
+    def set(self, name: str, rating: int):
+        rating = int(rating)
+        with self._lock:
+            if not self._low <= rating < self._low + self._size:
+                self.reset({**self._ratings, name: rating})
+                return
+            if name in self._ratings:
+                self._add(self._ratings[name], -1)
+            self._ratings[name] = rating
+            self._add(rating, 1)
+
+    def remove(self, name: str):
+        with self._lock:
+            if name in self._ratings:
+                self._add(self._ratings.pop(name), -1)
+
+    def rank(self, name: str) -> Optional[int]:
+        with self._lock:
+            if name not in self._ratings:
+                return None
+            return len(self._ratings) - self._count_at_most(self._ratings[name]) + 1
+
+    def standings(self) -> List[Tuple[int, str, int]]:
+        """(rank, name, rating) rows best first, the same rows wisdom_rankings returns."""
+        with self._lock:
+            ordered = sorted(self._ratings.items(), key=lambda item: -item[1])
+            rows = []
+            for position, (name, rating) in enumerate(ordered, 1):
+                rank = rows[-1][0] if rows and rows[-1][2] == rating else position
+                rows.append((rank, name, rating))
+            return rows
+
+    def _add(self, rating: int, amount: int):
+        index = rating - self._low + 1
+        while index <= self._size:
+            self._tree[index] += amount
+            index += index & -index
+
+    def _count_at_most(self, rating: int) -> int:
+        index = rating - self._low + 1
+        total = 0
+        while index > 0:
+            total += self._tree[index]
+            index -= index & -index
+        return total
@@ -0,0 +1,194 @@
+import math
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from fuzzywuzzy import fuzz, utils
+
+SHORTLIST_SIZE = 32
+
+
+def _discard(index: Dict, key, value):
+    values = index.get(key)
+    if values is not None:
+        values.discard(value)
+        if not values:
+            del index[key]
+
+
+def _windows(text: str) -> List[str]:
+    padded = f'  {text} '
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _ratio(first: str, second: str) -> int:
+    """fuzz.ratio without its argument checking decorators, both strings are already processed."""
+    if first == second:
+        return 100
+    if not first or not second:
+        return 0
+    return utils.intr(100 * fuzz.SequenceMatcher(None, first, second).ratio())
+
+
+def _wratio(first: str, second: str) -> int:
+    return fuzz.WRatio(first, second, full_process=False)
+
+
+def ratio_bound(first_length: int, second_length: int, shared: Optional[int] = None) -> int:
+    """Highest fuzz.ratio two different processed strings of these lengths could score. If `shared` is the number
+    of trigrams they have in common (and one side has no repeated trigrams), each insert or delete between them
+    breaks at most three trigrams, so at least (longest + 1 - shared) / 3 edits are needed."""
+    total = first_length + second_length
+    if not first_length or not second_length:
+        return 0
+    common = min(first_length, second_length)
+    if first_length == second_length:
+        common -= 1
+    if shared is not None:
+        edits = math.ceil((max(first_length, second_length) + 1 - shared) / 3)
+        common = min(common, (total - edits) // 2)
+    return utils.intr(200 * common / total)
+
+
+class FuzzyIndex:
+    """Stand in for `process.extractOne(query, keys, scorer=...)` over a set of keys that changes over time.
+
+    Keys are processed once when added and scored the same way extractOne scores them, ties go to the earliest
+    added key just like extractOne. For fuzz.ratio the keys sharing the most trigrams with the query are scored
+    first, after that a key is only scored if `ratio_bound` says it could still beat the best score so far."""
+
+    def __init__(self, keys: Iterable[str] = ()):
+        self._order: Dict[str, int] = {}
+        self._next = 0
+        self._processed: Dict[str, str] = {}
+        self._ascii: Dict[str, str] = {}
+        self._repeats: Set[str] = set()
+        self._exact: Dict[str, Set[str]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._lengths: Dict[int, Set[str]] = {}
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._order
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._order)
+
+    def add(self, key: str):
+        if key in self._order:
+            return
+        self._order[key] = self._next
+        self._next += 1
+        processed = utils.full_process(key)
+        self._processed[key] = processed
+        self._exact.setdefault(processed, set()).add(key)
+        self._lengths.setdefault(len(processed), set()).add(key)
+        windows = _windows(processed)
+        grams = set(windows)
+        if len(grams) != len(windows):
+            self._repeats.add(key)
+        for gram in grams:
+            self._grams.setdefault(gram, set()).add(key)
+
+    def discard(self, key: str):
+        if key not in self._order:
+            return
+        del self._order[key]
+        self._ascii.pop(key, None)
+        self._repeats.discard(key)
+        processed = self._processed.pop(key)
+        _discard(self._exact, processed, key)
+        _discard(self._lengths, len(processed), key)
+        for gram in set(_windows(processed)):
+            _discard(self._grams, gram, key)
+
+    def extract_one(self, query: str, scorer=fuzz.ratio, score_cutoff: int = 0) -> Optional[Tuple[str, int]]:
+        if scorer is fuzz.ratio:
+            best = self._best_ratio(utils.full_process(query))
+        else:
+            best = self.extract_many((query,), scorer=scorer)[query]
+        if best is None or best[1] < score_cutoff:
+            return None
+        return best
+
+    def _shared_grams(self, windows: List[str]) -> Counter:
+        shared = Counter()
+        for gram in set(windows):
+            shared.update(self._grams.get(gram, ()))
+        return shared
+
+    def _best_ratio(self, query: str) -> Optional[Tuple[str, int]]:
+        if not self._order:
+            return None
+        exact = self._exact.get(query, set())
+        if exact:
+            best_key = min(exact, key=self._order.__getitem__)
+            best_score, best_order = 100, self._order[best_key]
+        else:
+            best_key, best_score, best_order = None, -1, math.inf
+        scored = set(exact)
+
+        windows = _windows(query)
+        query_repeats = len(set(windows)) != len(windows)
+        shared = self._shared_grams(windows)
+        if best_score < 100:
+            for key, _ in shared.most_common(SHORTLIST_SIZE):
+                scored.add(key)
+                score = _ratio(query, self._processed[key])
+                order = self._order[key]
+                if score > best_score or (score == best_score and order < best_order):
+                    best_key, best_score, best_order = key, score, order
+
+        query_length = len(query)
+        for length, keys in self._lengths.items():
+            if ratio_bound(length, query_length) < best_score:
+                continue
+            for key in keys:
+                if key in scored:
+                    continue
+                order = self._order[key]
+                if query_repeats and key in self._repeats:
+                    bound = ratio_bound(length, query_length)
+                else:
+                    bound = ratio_bound(length, query_length, shared.get(key, 0))
+                if bound < best_score or (bound == best_score and order > best_order):
+                    continue
+                score = _ratio(query, self._processed[key])
+                if score > best_score or (score == best_score and order < best_order):
+                    best_key, best_score, best_order = key, score, order
+        return best_key, best_score
+
+    def extract_many(self, queries: Iterable[str], scorer=fuzz.WRatio) -> Dict[str, Optional[Tuple[str, int]]]:
+        """extract_one for several queries with one pass over the keys, for callers that try many ways of reading
+        the same argument. Queries stop being scored once they hit 100 since an earlier key always wins a tie."""
+        if scorer is fuzz.ratio:
+            processed = {query: utils.full_process(query) for query in queries}
+            score, form = _ratio, self._processed.__getitem__
+        elif scorer is fuzz.WRatio:
+            processed = {query: utils.full_process(utils.full_process(query), force_ascii=True) for query in queries}
+            score, form = _wratio, self._ascii_form
+        else:
+            raise ValueError(f'FuzzyIndex does not support the {scorer.__name__} scorer.')
+        best = {}
+        pending = set(processed.values())
+        for key in self._order:
+            if not pending:
+                break
+            key_form = form(key)
+            for query in list(pending):
+                key_score = score(query, key_form)
+                if query not in best or key_score > best[query][1]:
+                    best[query] = (key, key_score)
+                    if key_score == 100:
+                        pending.discard(query)
+                elif not query and scorer is fuzz.WRatio:
+                    pending.discard(query)
+        return {query: best.get(form) for query, form in processed.items()}
+
+    def _ascii_form(self, key: str) -> str:
+        if key not in self._ascii:
+            self._ascii[key] = utils.full_process(key, force_ascii=True)
+        return self._ascii[key]
@@ -0,0 +1,278 @@
+import asyncio
+import contextvars
+import dataclasses
+import itertools
+import logging
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import discord
+
+from .constants import DM_PER_SECOND, DM_PROGRESS_EVERY, OUTBOUND_CHANNEL_BURST, OUTBOUND_CHANNEL_PER_SECOND, \
+    OUTBOUND_CONCURRENCY, OUTBOUND_MAX_DEPTH
+
+# Lanes, lower goes out first
+SHEET, LOG, DM = 0, 1, 2
+LANE_NAMES = {SHEET: 'sheet', LOG: 'log', DM: 'dm'}
+
+SENT, FALLBACK, FORBIDDEN, FAILED, DROPPED = 'sent', 'fallback', 'forbidden', 'failed', 'dropped'
+MESSAGE_LENGTH = 2000
+
+
+class TokenBucket:
+    """`rate` tokens a second up to `burst`. Tokens can be reserved ahead, so callers get the wait for their turn
+    and queue behind each other in the order they asked."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._updated: Optional[float] = None
+
+    def reserve(self, now: float) -> float:
+        if self._updated is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+
+@dataclasses.dataclass
+class _Job:
+    lane: int
+    route: Hashable
+    destination: discord.abc.Messageable
+    texts: List[str]
+    embed: Optional[discord.Embed] = None
+    fallback: Optional[discord.abc.Messageable] = None
+    future: Optional[asyncio.Future] = None
+    droppable: bool = True
+
+
+@dataclasses.dataclass
+class DmResult:
+    sent: int = 0
+    # Members with DMs closed, and members a send failed for some other reason
+    forbidden: List[discord.abc.User] = dataclasses.field(default_factory=list)
+    failed: List[discord.abc.User] = dataclasses.field(default_factory=list)
+
+
+def _log_pieces(text: str) -> List[str]:
+    return [text[i:i + MESSAGE_LENGTH] for i in range(0, len(text), MESSAGE_LENGTH)] or ['']
+
+
+class Outbound:
+    """One queue for every message the bot sends on its own, so bulk notifications can't starve each other or trip
+    Discord's limits.
+
+    Battle sheets go out before log lines and log lines before DMs. At most `concurrency` sends are in flight, and
+    each channel and each DM recipient has its own token bucket, with DMs also sharing one overall bucket. Log lines
+    queued for a channel are joined into one message while they wait. Log lines and DMs past `max_depth` queued in
+    their lane are dropped rather than piling up. discord.py still waits out any 429 it gets back."""
+
+    def __init__(self, concurrency: int = OUTBOUND_CONCURRENCY, channel_rate: float = OUTBOUND_CHANNEL_PER_SECOND,
+                 channel_burst: float = OUTBOUND_CHANNEL_BURST, dm_rate: float = DM_PER_SECOND,
+                 max_depth: int = OUTBOUND_MAX_DEPTH):
+        self.concurrency = concurrency
+        self.channel_rate = channel_rate
+        self.channel_burst = channel_burst
+        self.max_depth = max_depth
+        self._dm_bucket = TokenBucket(dm_rate, 1)
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self._open_logs: Dict[Hashable, _Job] = {}
+        self._order = itertools.count()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self.depth = Counter()
+        self.sent = Counter()
+        self.dropped = Counter()
+        self.failed = Counter()
+        self.fallbacks = 0
+        self.batched = 0
+
+    def _start(self):
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        self._workers = [task for task in self._workers if not task.done()]
+        while len(self._workers) < self.concurrency:
+            # A fresh context keeps the workers' sends out of whichever command happened to start them
+            self._workers.append(contextvars.Context().run(asyncio.create_task, self._work()))
+
+    def _put(self, job: _Job) -> bool:
+        if job.droppable and job.lane != SHEET and self.depth[job.lane] >= self.max_depth:
+            self.dropped[job.lane] += 1
+            logging.warning(f'Outbound {LANE_NAMES[job.lane]} queue full, dropped a message to {job.route}')
+            if job.future:
+                job.future.set_result(DROPPED)
+            return False
+        self._start()
+        self.depth[job.lane] += 1
+        self._queue.put_nowait((job.lane, next(self._order), job))
+        return True
+
+    async def send(self, channel: discord.abc.Messageable, content: Optional[str] = None,
+                   embed: Optional[discord.Embed] = None) -> discord.Message:
+        """Sends ahead of everything else queued and returns the message, raising whatever the send raised."""
+        job = _Job(SHEET, ('channel', getattr(channel, 'channel', channel).id), channel, [content], embed,
+                   future=asyncio.get_running_loop().create_future())
+        self._put(job)
+        return await job.future
+
+    def log(self, channel: discord.abc.Messageable, text: str):
+        """Queues a line for `channel` without waiting for it, joined onto the line before it if that hasn't gone
+        out yet."""
+        route = ('channel', channel.id)
+        for piece in _log_pieces(text):
+            job = self._open_logs.get(route)
+            if job and len(job.texts[0]) + 1 + len(piece) <= MESSAGE_LENGTH:
+                job.texts[0] += '\n' + piece
+                self.batched += 1
+                continue
+            job = _Job(LOG, route, channel, [piece])
+            if self._put(job):
+                self._open_logs[route] = job
+
+    def dm(self, user: discord.abc.User, *texts: str, fallback: Optional[discord.abc.Messageable] = None,
+           droppable: bool = True) -> asyncio.Future:
+        """Queues `texts` to go to `user` in order. If their DMs are closed they are mentioned with the rest in
+        `fallback` instead. The returned future has SENT, FALLBACK, FORBIDDEN, FAILED or DROPPED, and can be
+        ignored. DMs that must go out, like gambit results, pass `droppable=False` to skip the depth cap."""
+        job = _Job(DM, ('dm', user.id), user, list(texts), fallback=fallback,
+                   future=asyncio.get_running_loop().create_future(), droppable=droppable)
+        self._put(job)
+        return job.future
+
+    async def dm_all(self, messages: Sequence[Tuple[discord.abc.User, Sequence[str]]],
+                     progress: Optional[Callable[[int, int], Awaitable]] = None,
+                     progress_every: int = DM_PROGRESS_EVERY) -> DmResult:
+        """dm for every member, none of them dropped however full the lane is. `progress(done, total)` is awaited
+        every `progress_every` members and once at the end."""
+        result = DmResult()
+        futures = {self.dm(member, *texts, droppable=False): (member, len(texts)) for member, texts in messages}
+        total = len(futures)
+        done = 0
+        for finished in asyncio.as_completed(list(futures)):
+            await finished
+            done += 1
+            if progress and done % progress_every == 0 and done < total:
+                await progress(done, total)
+        for future, (member, count) in futures.items():
+            status = future.result()
+            if status == SENT:
+                result.sent += count
+            elif status == FORBIDDEN:
+                result.forbidden.append(member)
+            else:
+                result.failed.append(member)
+        if progress:
+            await progress(done, total)
+        return result
+
+    async def _wait_turn(self, job: _Job):
+        loop = asyncio.get_running_loop()
+        if job.route not in self._buckets:
+            rate, burst = (self._dm_bucket.rate, 1) if job.lane == DM else (self.channel_rate, self.channel_burst)
+            self._buckets[job.route] = TokenBucket(rate, burst)
+        delay = self._buckets[job.route].reserve(loop.time())
+        if job.lane == DM:
+            delay = max(delay, self._dm_bucket.reserve(loop.time()))
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _deliver(self, job: _Job):
+        status = SENT
+        message = None
+        try:
+            for text in job.texts:
+                await self._wait_turn(job)
+                message = await job.destination.send(text, embed=job.embed) if job.embed else \
+                    await job.destination.send(text)
+                self.sent[job.lane] += 1
+        except discord.errors.Forbidden:
+            if job.lane != DM:
+                raise
+            status = FORBIDDEN
+            if job.fallback:
+                self.fallbacks += 1
+                status = FALLBACK
+                self.log(job.fallback, '\n'.join(f'{job.destination.mention}: {text}' for text in job.texts))
+        if job.future and not job.future.done():
+            job.future.set_result(message if job.lane == SHEET else status)
+
+    async def _work(self):
+        while True:
+            _, _, job = await self._queue.get()
+            self.depth[job.lane] -= 1
+            if self._open_logs.get(job.route) is job:
+                del self._open_logs[job.route]
+            try:
+                await self._deliver(job)
+            except asyncio.CancelledError:
+                self._abandon(job)
+                raise
+            except Exception as error:
+                self.failed[job.lane] += 1
+                logging.warning(f'Outbound {LANE_NAMES[job.lane]} to {job.route} failed: {error}')
+                if job.future and not job.future.done():
+                    if job.lane == SHEET:
+                        job.future.set_exception(error)
+                    else:
+                        job.future.set_result(FAILED)
+            finally:
+                self._queue.task_done()
+
+    async def drain(self):
+        """Waits until everything queued so far has gone out."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    @staticmethod
+    def _abandon(job: _Job):
+        if job.future and not job.future.done():
+            if job.lane == SHEET:
+                job.future.set_exception(RuntimeError('The outbound queue was stopped before this was sent'))
+            else:
+                job.future.set_result(DROPPED)
+
+    def stop(self):
+        """Cancels the workers and fails everything still queued, so nothing waits on a send that won't happen."""
+        for task in self._workers:
+            task.cancel()
+        self._workers = []
+        while self._queue is not None and not self._queue.empty():
+            _, _, job = self._queue.get_nowait()
+            self.depth[job.lane] -= 1
+            self.dropped[job.lane] += 1
+            self._abandon(job)
+            self._queue.task_done()
+        self._open_logs.clear()
+
+    def report(self) -> str:
+        lines = [f'{"lane":>6} {"queued":>7} {"sent":>7} {"dropped":>8} {"failed":>7}']
+        for lane, name in LANE_NAMES.items():
+            lines.append(f'{name:>6} {self.depth[lane]:>7} {self.sent[lane]:>7} {self.dropped[lane]:>8} '
+                         f'{self.failed[lane]:>7}')
+        lines.append(f'{self.batched} log lines batched, {self.fallbacks} DMs fell back to a channel, '
+                     f'{len(self._workers)} workers')
+        return '\n'.join(lines)
+
+    def metrics(self) -> List[str]:
+        """Prometheus text lines for the command profiler's /metrics."""
+        lines = []
+        for metric, kind, help_text, values in (
+                ('scs_outbound_queue_depth', 'gauge', 'Messages waiting to go out.', self.depth),
+                ('scs_outbound_sent_total', 'counter', 'Messages sent from the outbound queue.', self.sent),
+                ('scs_outbound_dropped_total', 'counter', 'Messages dropped because their lane was full.',
+                 self.dropped),
+                ('scs_outbound_failed_total', 'counter', 'Messages whose send raised.', self.failed)):
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+            lines += [f'{metric}{{lane="{name}"}} {values[lane]}' for lane, name in LANE_NAMES.items()]
+        lines += ['# HELP scs_outbound_dm_fallbacks_total DMs posted in a channel because the member\'s DMs were '
+                  'closed.', '# TYPE scs_outbound_dm_fallbacks_total counter',
+                  f'scs_outbound_dm_fallbacks_total {self.fallbacks}',
+                  '# HELP scs_outbound_batched_total Log lines joined onto an earlier queued message.',
+                  '# TYPE scs_outbound_batched_total counter', f'scs_outbound_batched_total {self.batched}']
+        return lines
+
+
+outbound = Outbound()
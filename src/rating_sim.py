@@ -0,0 +1,158 @@
+"""What-if replays of a season's crew ratings under other K and decay settings, without touching the database.
+
+Run from the repository root with `python -m src.rating_sim LeagueId` to sweep the default grid of policies
+against the league's real ratings."""
+import dataclasses
+import datetime
+import itertools
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Collection, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .constants import DECAY_CUTOFFS, DECAY_ELO_LOSS, DECAY_EXEMPT, DEFAULT_K, FAKE_CREW_ID, K_CHANGE, STARTING_K, \
+    STARTING_RATING
+from .elo_replay import ReplayBattle, replay_elo
+
+
+@dataclasses.dataclass(frozen=True)
+class Policy:
+    default_k: int = DEFAULT_K
+    starting_k: int = STARTING_K
+    k_change: int = K_CHANGE
+    decay_cutoffs: Tuple[int, ...] = DECAY_CUTOFFS
+    decay_loss: Tuple[float, ...] = DECAY_ELO_LOSS
+    decay_top_fraction: float = .4
+
+    @property
+    def label(self) -> str:
+        decay = '/'.join(f'{cutoff}:{loss:g}' for cutoff, loss in zip(self.decay_cutoffs, self.decay_loss) if loss)
+        return (f'default_k {self.default_k} starting_k {self.starting_k} k_change {self.k_change} '
+                f'decay {decay or "off"}')
+
+
+@dataclasses.dataclass
+class SimResult:
+    policy: Policy
+    ratings: Dict[int, int]
+    correlation: float
+
+    @property
+    def rankings(self) -> List[int]:
+        return sorted(self.ratings, key=lambda crew_id: (-self.ratings[crew_id], crew_id))
+
+
+def policy_grid(default_ks: Iterable[int] = (DEFAULT_K,), starting_ks: Iterable[int] = (STARTING_K,),
+                k_changes: Iterable[int] = (K_CHANGE,),
+                decay_losses: Iterable[Tuple[float, ...]] = (DECAY_ELO_LOSS,)) -> List[Policy]:
+    return [Policy(default_k, starting_k, k_change, decay_loss=decay_loss)
+            for default_k, starting_k, k_change, decay_loss in
+            itertools.product(default_ks, starting_ks, k_changes, decay_losses)]
+
+
+def _decay(ratings: Dict[int, Tuple[int, int]], decay_level: Dict[int, int], last_played: Dict[int, datetime.date],
+           day: datetime.date, season_start: datetime.date, policy: Policy, exempt: Collection[int]):
+    """One day of handle_decay: top crews past their next cutoff lose rating and move a level, crews that
+    played inside the first cutoff go back to level 0."""
+    ranked = sorted(ratings, key=lambda crew_id: -ratings[crew_id][0])
+    for ranking, crew_id in enumerate(ranked, 1):
+        if crew_id in exempt or ranking / len(ranked) > policy.decay_top_fraction:
+            continue
+        days = (day - last_played.get(crew_id, season_start)).days
+        level = decay_level[crew_id]
+        if level < len(policy.decay_cutoffs) and days > policy.decay_cutoffs[level]:
+            rating, k = ratings[crew_id]
+            ratings[crew_id] = rating - int(policy.decay_loss[level]), k
+            decay_level[crew_id] = level + 1
+        elif level > 0 and days < policy.decay_cutoffs[0]:
+            decay_level[crew_id] = 0
+
+
+def simulate(battles: Sequence[ReplayBattle], policy: Policy, initial: Mapping[int, Tuple[int, int]] = None,
+             k_reset_at: Optional[datetime.datetime] = None, exempt: Collection[int] = ()) -> Dict[int, int]:
+    """Final rating of every crew after replaying the season under `policy`, one day at a time so decay can run
+    between days. Battles need their finished time."""
+    ratings = dict(initial or {})
+    if not battles:
+        return {crew_id: rating for crew_id, (rating, _) in ratings.items()}
+    decay_level = defaultdict(int)
+    last_played = {}
+    season_start = day = battles[0].finished.date()
+    for battle_day, day_battles in itertools.groupby(battles, key=lambda battle: battle.finished.date()):
+        day_battles = list(day_battles)
+        while day < battle_day:
+            day += datetime.timedelta(days=1)
+            _decay(ratings, decay_level, last_played, day, season_start, policy, exempt)
+        reset_at = None
+        if k_reset_at and day_battles[-1].finished >= k_reset_at:
+            reset_at, k_reset_at = k_reset_at, None
+        replay = replay_elo(day_battles, initial=ratings, pinned={FAKE_CREW_ID: STARTING_RATING},
+                            k_reset_at=reset_at, default_k=policy.default_k, starting_k=policy.starting_k,
+                            k_change=policy.k_change)
+        ratings = replay.crew_ratings()
+        for battle in day_battles:
+            last_played[battle.winner] = last_played[battle.loser] = battle_day
+    return {crew_id: rating for crew_id, (rating, _) in ratings.items()}
+
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    # Ties share the average of the ranks they cover
+    return (np.cumsum(counts) - (counts - 1) / 2)[inverse]
+
+
+def rank_correlation(simulated: Mapping[int, float], actual: Mapping[int, float]) -> float:
+    """Spearman correlation between two sets of ratings over the crews they both have."""
+    crews = sorted(simulated.keys() & actual.keys())
+    if len(crews) < 2:
+        return 0.0
+    first = _ranks(np.array([simulated[crew_id] for crew_id in crews], dtype=float))
+    second = _ranks(np.array([actual[crew_id] for crew_id in crews], dtype=float))
+    if first.std() == 0 or second.std() == 0:
+        return 0.0
+    return float(np.corrcoef(first, second)[0, 1])
+
+
+_season = {}
+
+
+def _load_season(battles, actual, kwargs):
+    _season.update(battles=battles, actual=actual, kwargs=kwargs)
+
+
+def _run(policy: Policy) -> SimResult:
+    ratings = simulate(_season['battles'], policy, **_season['kwargs'])
+    return SimResult(policy, ratings, rank_correlation(ratings, _season['actual']))
+
+
+def sweep(battles: Sequence[ReplayBattle], policies: Sequence[Policy], actual: Mapping[int, int],
+          workers: Optional[int] = None, **kwargs) -> List[SimResult]:
+    """simulate for every policy on a process pool, the season is sent to each worker once. Results come back in
+    the order of `policies`, `kwargs` go to simulate."""
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_load_season,
+                             initargs=(list(battles), dict(actual), kwargs)) as pool:
+        return list(pool.map(_run, policies, chunksize=max(1, len(policies) // (4 * workers))))
+
+
+def main(league_id: int):
+    from .db_helpers import crew_ids_from_tags, league_history
+    from .db_pool import open_pool
+
+    open_pool()
+    battles, k_reset_at, actual = league_history(league_id)
+    exempt = crew_ids_from_tags(DECAY_EXEMPT)
+    policies = policy_grid(default_ks=(30, 40, 50, 60, 70), starting_ks=(50, 75, 100, 150, 200),
+                           k_changes=(0, 5, 10, 20), decay_losses=(DECAY_ELO_LOSS, (0,) * len(DECAY_CUTOFFS)))
+    results = sweep(battles, policies, actual, k_reset_at=k_reset_at, exempt=exempt)
+    results.sort(key=lambda result: -result.correlation)
+    print(f'{len(battles)} battles, {len(policies)} policies')
+    for result in results[:10]:
+        print(f'{result.correlation:.4f}  {result.policy.label}  top 5: {result.rankings[:5]}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]))
@@ -0,0 +1,104 @@
+import collections
+import contextlib
+import dataclasses
+import logging
+import time
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .constants import CACHE_TIME_SECONDS, RECACHE_HISTORY, RECACHE_PHASE_ALERT_SECONDS
+
+
+@dataclasses.dataclass
+class RecacheRun:
+    started: datetime
+    backup: bool = False
+    full: bool = False
+    # Other runs still going when this one started
+    overlapped: int = 0
+    phases: Dict[str, float] = dataclasses.field(default_factory=dict)
+    seconds: Optional[float] = None
+    error: Optional[str] = None
+    _start: float = dataclasses.field(default_factory=time.perf_counter, repr=False)
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Times the block, a phase entered twice adds up."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def record(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def alerts(self, phase_limit: float = RECACHE_PHASE_ALERT_SECONDS,
+               total_limit: float = CACHE_TIME_SECONDS) -> List[str]:
+        found = [f'{name} took {seconds:.1f}s (limit {phase_limit:g}s)' for name, seconds in self.phases.items()
+                 if seconds > phase_limit]
+        if self.seconds is not None and self.seconds > total_limit:
+            found.append(f'recache took {self.seconds:.1f}s, longer than the {total_limit:g}s between recaches')
+        if self.overlapped:
+            found.append(f'started while {self.overlapped} other recache{"s were" if self.overlapped > 1 else " was"} '
+                         f'still running')
+        return found
+
+    def summary(self) -> str:
+        kind = 'Full recache' if self.full else 'Backup recache' if self.backup else 'Recache'
+        outcome = f'failed ({self.error})' if self.error else 'done'
+        parts = ', '.join(f'{name} {seconds:.1f}' for name, seconds in self.phases.items())
+        return f'{kind} {outcome} in {self.seconds:.1f}s: {parts}'
+
+
+class RecacheMonitor:
+    """Keeps the phase timings of the latest recaches and notices when one starts before another has finished."""
+
+    def __init__(self, history: int = RECACHE_HISTORY):
+        self.running: List[RecacheRun] = []
+        self.runs: Deque[RecacheRun] = collections.deque(maxlen=history)
+        self.overlaps = 0
+
+    def begin(self, backup: bool = False, full: bool = False) -> RecacheRun:
+        run = RecacheRun(datetime.now(), backup, full, overlapped=len(self.running))
+        if run.overlapped:
+            self.overlaps += 1
+            logging.warning(f'Recache started while {run.overlapped} still running since '
+                            f'{self.running[0].started:%H:%M:%S}.')
+        self.running.append(run)
+        return run
+
+    def end(self, run: RecacheRun, error: Optional[BaseException] = None):
+        run.seconds = time.perf_counter() - run._start
+        if error is not None:
+            run.error = f'{type(error).__name__}: {error}'
+        if run in self.running:
+            self.running.remove(run)
+        self.runs.append(run)
+        for alert in run.alerts():
+            logging.warning(f'Recache: {alert}')
+
+    def phase_stats(self) -> List[Tuple[str, float, float]]:
+        """(phase, average seconds, max seconds) over the kept runs, slowest average first."""
+        seen = collections.defaultdict(list)
+        for run in self.runs:
+            for name, seconds in run.phases.items():
+                seen[name].append(seconds)
+        stats = [(name, sum(times) / len(times), max(times)) for name, times in seen.items()]
+        return sorted(stats, key=lambda stat: -stat[1])
+
+    def report(self) -> str:
+        if not self.runs:
+            return 'No recache has finished yet.'
+        failed = sum(1 for run in self.runs if run.error)
+        totals = [run.seconds for run in self.runs]
+        lines = [f'{len(self.runs)} recaches, avg {sum(totals) / len(totals):.1f}s, max {max(totals):.1f}s, '
+                 f'{failed} failed, {self.overlaps} overlaps since start up',
+                 f'{"phase":<22}{"avg s":>8}{"max s":>8}']
+        lines += [f'{name[:21]:<22}{average:>8.1f}{longest:>8.1f}' for name, average, longest in self.phase_stats()]
+        lines.append('')
+        lines.append(f'last: {self.runs[-1].summary()}')
+        lines += [f'  ! {alert}' for alert in self.runs[-1].alerts()]
+        if self.running:
+            lines.append(f'running since {self.running[0].started:%H:%M:%S}')
+        return '\n'.join(lines)
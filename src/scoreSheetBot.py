@@ -12,8 +12,19 @@ from .bracket import Bracket, Questions, NUMBER_QUESTIONS, draw_bracket
 from .character import all_emojis, all_alts
 from .constants import *
 from .db_helpers import *
+from .cb_board import CbBoard
+from .coalesce import CoalescingUpdater
+from .command_cache import CommandCache
+from .command_profiler import profiler
+from .db_async import adb
+from .db_migrate import migrate
+from .db_pool import open_pool, pool_stats
+from .db_stats import current_command, db_stats
 from .decorators import *
+from .gambit import payout_dms, top_payouts
 from .help import help_doc
+from .outbound import outbound
+from .recache_monitor import RecacheMonitor
 
 logging.basicConfig(level=logging.INFO)
 
@@ -29,6 +40,12 @@ class ScoreSheetBot(commands.Cog):
         self._gambit_message = None
         self.current_league = ""
         self.past_2_weeks = False
+        self.command_cache = CommandCache()
+        self.recache_monitor = RecacheMonitor()
+        self.gambit_announcer = CoalescingUpdater(self._refresh_gambit_message, GAMBIT_EDIT_INTERVAL,
+                                                  'gambit announcement')
+        self.cb_board = CbBoard(lambda: self.cache_value.channels.current_cbs, self._cb_board_embeds)
+        self.cb_board_updater = CoalescingUpdater(self.cb_board.refresh, CB_BOARD_EDIT_INTERVAL, 'current cbs board')
 
     @property
     def cache(self) -> src.cache.Cache:
@@ -37,48 +54,87 @@ class ScoreSheetBot(commands.Cog):
             asyncio.create_task(self._cache_process(True), name='recache')
         return self.cache_value
 
-    async def _cache_process(self, backup=False):
-        self.current_league, start_date, reset = current_league_name()
-        if start_date:
-            self.past_2_weeks = True if datetime.now().date() - start_date > timedelta(days=14) else False
-            if self.past_2_weeks and not reset:
-                reset_k()
+    async def _cache_process(self, backup=False, full=False):
+        run = self.recache_monitor.begin(backup, full)
+        try:
+            await self._recache_phases(run, backup, full)
+        except Exception as error:
+            self.recache_monitor.end(run, error)
+            raise
+        self.recache_monitor.end(run)
+        if self.cache_value.channels and os.getenv('VERSION') == 'PROD':
+            await self.cache_value.channels.recache_logs.send(
+                '\n'.join([run.summary()] + [f'**Slow:** {alert}' for alert in run.alerts()]))
+
+    async def _recache_phases(self, run, backup, full):
+        with run.phase('league'):
+            self.current_league, start_date, reset = await adb.current_league_name()
+            if start_date:
+                self.past_2_weeks = True if datetime.now().date() - start_date > timedelta(days=14) else False
+                if self.past_2_weeks and not reset:
+                    await adb.reset_k()
         self.cache_time = time.time()
         if self.cache_value.channels and os.getenv('VERSION') == 'PROD':
             if backup:
                 await self.cache_value.channels.recache_logs.send('(Backup)')
             await self.cache_value.channels.recache_logs.send('Starting recache.')
 
-        await self.cache_value.update(self)
-        crew_update(self)
-        print(time.time() - self.cache_time)
-        await clear_current_cbs(self)
-        for battle_type in BattleType:
-            summary = battle_summary(self, battle_type)
-            if summary:
-                await send_long_embed(self.cache.channels.current_cbs, summary)
+        refresh_start = time.perf_counter()
+        drift = await self.cache_value.refresh(self, full)
+        refresh_seconds = time.perf_counter() - refresh_start
+        if drift is not None:
+            run.record('crew docs', self.cache_value.last_fetch_seconds)
+            refresh_seconds -= self.cache_value.last_fetch_seconds
+        run.record('cache update', refresh_seconds)
+        if drift and any(drift.values()) and os.getenv('VERSION') == 'PROD':
+            await self.cache_value.channels.recache_logs.send(
+                'Cache drift fixed by rebuild: ' + ', '.join(f'{index}: {count}' for index, count in drift.items()))
+        with run.phase('crew_update'):
+            await crew_update(self)
+        with run.phase('gambit'):
+            version = self.cache_value.gambit.version
+            gambit_state = await adb.live_gambit_state()
+            # A bet made while reading would be lost and one still being placed counted twice, the next recache
+            # catches up instead
+            if self.cache_value.gambit.version == version and not self.cache_value.gambit.placing_bets:
+                gambit_drift = self.cache_value.gambit.seed(*gambit_state)
+                if gambit_drift:
+                    logging.warning(f'Live gambit totals were off by {gambit_drift}, reseeded.')
+        with run.phase('snapshot'):
+            await asyncio.get_running_loop().run_in_executor(None, self.cache_value.save_snapshot,
+                                                             self.cache_value.snapshot_data())
+        with run.phase('current cbs'):
+            # Battles update the board as they happen, this only catches renamed crews and the like
+            self.cb_board_updater.mark_dirty()
+            await self.cb_board_updater.flush()
         if os.getenv('VERSION') == 'PROD':
-            await clear_current_cbs(self)
-            for battle_type in BattleType:
-                summary = battle_summary(self, battle_type)
-                if summary:
-                    await send_long_embed(self.cache.channels.current_cbs, summary)
-
             # await handle_decay(self)
-            await handle_unfreeze(self)
+            with run.phase('handle_unfreeze'):
+                await handle_unfreeze(self)
             if self.cache_value.scs:
-                await overflow_anomalies(self)
-            await cooldown_handle(self)
-            await track_handle(self)
-            await self.cache_value.channels.recache_logs.send('Successfully recached.')
+                with run.phase('overflow_anomalies'):
+                    await overflow_anomalies(self)
+            with run.phase('cooldown_handle'):
+                await cooldown_handle(self)
+            with run.phase('track_handle'):
+                await track_handle(self)
             # update_wisdom_sheet()
-            update_rankings_sheet()
+            with run.phase('update_rankings_sheet'):
+                await asyncio.get_running_loop().run_in_executor(None, update_rankings_sheet)
             # update_trinity_sheet()
             # update_destiny_sheet()
             # update_all_sheets()
-        print(time.time() - self.cache_time)
         self.cache_time = time.time()
 
+    def _cb_board_embeds(self, battle_type: BattleType) -> List[discord.Embed]:
+        summary = battle_summary(self, battle_type)
+        return split_embed(summary, length=2000) if summary else []
+
+    async def _refresh_gambit_message(self):
+        cg = self.cache.gambit.current()
+        if cg and not cg.locked:
+            await update_gambit_message(cg, self)
+
     def _current(self, ctx) -> Battle:
         if key_string(ctx) in self.battle_map:
             return self.battle_map[key_string(ctx)]
@@ -125,21 +181,32 @@ class ScoreSheetBot(commands.Cog):
 
     async def _set_current(self, ctx: Context, battle: Battle):
         self.battle_map[key_string(ctx)] = battle
+        self.cb_board_updater.mark_dirty()
         await update_channel_open(NO, ctx.channel)
 
     async def _clear_current(self, ctx):
         self.battle_map.pop(key_string(ctx), None)
+        self.cb_board_updater.mark_dirty()
         await unlock(ctx.channel)
         await update_channel_open('', ctx.channel)
 
     def cog_load(self) -> None:
+        profiler.instrument_http(self.bot.http)
+        if outbound.metrics not in profiler.collectors:
+            profiler.collectors.append(outbound.metrics)
         self.auto_cache.start()
+        self.flush_command_usage.start()
 
     def cog_unload(self):
         self.auto_cache.cancel()
+        self.flush_command_usage.stop()
+        outbound.stop()
+        self.cb_board_updater.cancel()
 
     async def cog_before_invoke(self, ctx):
-        if ctx.channel.id in disabled_channels():
+        profiler.start(ctx.command.qualified_name)
+        current_command.set(ctx.command.qualified_name)
+        if await self.command_cache.channel_disabled(ctx.channel.id):
             await ctx.message.delete()
             msg = await ctx.send(f'Jettbot is disabled for this channel please use <#{BOT_CORNER_ID}> instead.')
             await msg.delete(delay=5)
@@ -149,15 +216,26 @@ class ScoreSheetBot(commands.Cog):
             msg = await ctx.send(f'Jettbot is disabled for non staff in channel please use <#{BOT_CORNER_ID}> instead.')
             await msg.delete(delay=5)
             raise ValueError('Jettbot is Disabled for non staff in this channel.')
-        if command_lookup(ctx.command.name)[1]:
+        if await self.command_cache.command_deactivated(ctx.command.name):
             await ctx.message.delete(delay=2)
             msg = await ctx.send(f'{ctx.command.name} is deactivated, and cannot be used for now.')
             await msg.delete(delay=5)
             raise ValueError(f'{ctx.command.name} is deactivated, and cannot be used for now.')
 
     async def cog_after_invoke(self, ctx):
+        profiler.finish(ctx.command_failed)
+        if key_string(ctx) in self.battle_map:
+            self.cb_board_updater.mark_dirty()
         if os.getenv('VERSION') == 'PROD':
-            increment_command_used(ctx.command.name)
+            self.command_cache.record_use(ctx.command.name)
+
+    @tasks.loop(seconds=COMMAND_USAGE_FLUSH_SECONDS)
+    async def flush_command_usage(self):
+        await self.command_cache.flush_usage()
+
+    @flush_command_usage.after_loop
+    async def final_command_usage_flush(self):
+        await self.command_cache.flush_usage()
 
     @tasks.loop(seconds=CACHE_TIME_SECONDS)
     async def auto_cache(self):
@@ -167,39 +245,63 @@ class ScoreSheetBot(commands.Cog):
     async def wait_for_bot(self):
         await self.bot.wait_until_ready()
 
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if not self.cache_value.built:
+            self.cache_value.warm_start(self)
+
     @commands.Cog.listener()
     async def on_member_remove(self, user):
-        update_member_status((), (user.id,))
+        self.cache_value.member_left(user)
+        await adb.update_member_status((), (user.id,))
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        self.cache_value.user_updated(before, after)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        self.cache_value.role_created(role)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.cache_value.role_deleted(role)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        self.cache_value.role_updated(before, after)
 
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
+        self.cache_value.member_updated(before, after)
         if os.getenv('VERSION') == 'PROD':
             if before.display_name != after.display_name:
-                record_nicknames([(after.id, after.display_name)])
+                await adb.record_nicknames([(after.id, after.display_name)])
             if before.roles != after.roles:
-                update_member_roles(after)
+                await adb.update_member_roles(after)
                 try:
                     after_crew = crew(after, self)
                 except ValueError:
                     after_crew = None
-                if not crew_correct(after, after_crew):
+                if not await adb.crew_correct(after, after_crew):
                     if after_crew:
                         after_crew = crew_lookup(after_crew, self)
-                    update_member_crew(after.id, after_crew)
+                    await adb.update_member_crew(after.id, after_crew)
                     self.cache.minor_update(self)
 
                 await set_categories(after, self.cache.categories)
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
+        self.cache_value.member_joined(member)
         if os.getenv('VERSION') == 'PROD':
-            role_ids = find_member_roles(member)
+            role_ids = await adb.find_member_roles(member)
             if role_ids:
                 roles = [discord.utils.get(member.guild.roles, id=role_id) for role_id in role_ids if
                          role_id not in (803364975539781662, 842888594519097394)]
                 await member.add_roles(*roles)
             else:
-                add_member_and_roles(member)
+                await adb.add_member_and_roles(member)
 
     @commands.command(help='Shows this command')
     async def help(self, ctx, *group):
@@ -288,7 +390,7 @@ class ScoreSheetBot(commands.Cog):
 
             crew_overwrite = discord.PermissionOverwrite(send_messages=True, add_reactions=True)
             if crew_lookup(current.team1.name, self).overflow:
-                _, mems, _ = members_with_str_role(current.team1.name, self)
+                _, mems, _ = await members_with_str_role(current.team1.name, self)
                 for mem in mems:
                     if not check_roles(mem, [MUTED]):
                         overwrites[mem] = crew_overwrite
@@ -298,7 +400,7 @@ class ScoreSheetBot(commands.Cog):
                 for mem in overlap_members(MUTED, current.team1.name, self):
                     overwrites[mem] = muted_overwite
             if crew_lookup(current.team2.name, self).overflow:
-                _, mems, _ = members_with_str_role(current.team2.name, self)
+                _, mems, _ = await members_with_str_role(current.team2.name, self)
                 for mem in mems:
                     if not check_roles(mem, [MUTED]):
                         overwrites[mem] = crew_overwrite
@@ -1106,8 +1208,7 @@ class ScoreSheetBot(commands.Cog):
                     for output_channel in output_channels:
                         link = await send_sheet(output_channel, current)
                         links.append(link)
-                    battle_id = add_finished_battle(current, links[0].jump_url, league_id)
-                    battle_weight_changes(battle_id)
+                    battle_id, _ = await adb.record_battle(current, links[0].jump_url, league_id)
                     winner_crew = crew_lookup(winner, self)
                     loser_crew = crew_lookup(loser, self)
                     new_message = (
@@ -1124,11 +1225,11 @@ class ScoreSheetBot(commands.Cog):
 
                     await links[0].add_reaction(YES)
                     for cr in (winner_crew, loser_crew):
-                        if not extra_slot_used(cr):
-                            if battles_since_sunday(cr) >= 3:
-                                mod_slot(cr, 1)
+                        if not await adb.extra_slot_used(cr):
+                            if await adb.battles_since_sunday(cr) >= 3:
+                                await adb.mod_slot(cr, 1)
                                 await ctx.send(f'{cr.name} got a slot back for playing 3 battles this week!')
-                                set_extra_used(cr)
+                                await adb.set_extra_used(cr)
             elif current.battle_type == BattleType.PLAYOFF:
                 current.confirm(await self._battle_crew(ctx, ctx.author))
                 await send_sheet(ctx, battle=current)
@@ -1148,8 +1249,7 @@ class ScoreSheetBot(commands.Cog):
                     for output_channel in output_channels:
                         link = await send_sheet(output_channel, current)
                         links.append(link)
-                    battle_id = add_finished_battle(current, links[0].jump_url, 40)
-                    battle_weight_changes(battle_id)
+                    battle_id, _ = await adb.record_battle(current, links[0].jump_url, 40)
                     winner_crew = crew_lookup(winner, self)
                     loser_crew = crew_lookup(loser, self)
                     new_message = (
@@ -1164,11 +1264,11 @@ class ScoreSheetBot(commands.Cog):
                         f'has been confirmed by both sides and posted in {output_channels[0].mention}. '
                         f'(Battle number:{battle_id})')
                     for cr in (winner_crew, loser_crew):
-                        if not extra_slot_used(cr):
-                            if battles_since_sunday(cr) >= 3:
-                                mod_slot(cr, 1)
+                        if not await adb.extra_slot_used(cr):
+                            if await adb.battles_since_sunday(cr) >= 3:
+                                await adb.mod_slot(cr, 1)
                                 await ctx.send(f'{cr.name} got a slot back for playing 3 battles this week!')
-                                set_extra_used(cr)
+                                await adb.set_extra_used(cr)
             else:
                 current.confirm(await self._battle_crew(ctx, ctx.author))
                 await send_sheet(ctx, battle=current)
@@ -1188,12 +1288,12 @@ class ScoreSheetBot(commands.Cog):
                     for output_channel in output_channels:
                         link = await send_sheet(output_channel, current)
                         links.append(link)
-                    battle_id = add_finished_battle(current, links[0].jump_url, league_id)
-                    battle_weight_changes(battle_id)
+                    battle_id, elo = await adb.record_battle(current, links[0].jump_url, league_id, elo=True)
                     winner_crew = crew_lookup(winner, self)
                     loser_crew = crew_lookup(loser, self)
-                    winner_elo, winner_change, loser_elo, loser_change, d_winner_change, d_final, winner_k, loser_k = battle_elo_changes(
-                        battle_id)
+                    winner_elo, winner_change, loser_elo, loser_change, d_winner_change, d_final, winner_k, loser_k = elo
+                    self.cache_value.ratings_changed({winner_crew.name: winner_elo + winner_change,
+                                                      loser_crew.name: loser_elo + loser_change})
                     w_placement = (STARTING_K - winner_k) / K_CHANGE + 1
                     l_placement = (STARTING_K - loser_k) / K_CHANGE + 1
                     if winner_k > DEFAULT_K:
@@ -1229,11 +1329,11 @@ class ScoreSheetBot(commands.Cog):
                         f'has been confirmed by both sides and posted in {output_channels[0].mention}. '
                         f'(Battle number:{battle_id})')
                     for cr in (winner_crew, loser_crew):
-                        if not extra_slot_used(cr):
-                            if battles_since_sunday(cr) >= 3:
-                                mod_slot(cr, 1)
+                        if not await adb.extra_slot_used(cr):
+                            if await adb.battles_since_sunday(cr) >= 3:
+                                await adb.mod_slot(cr, 1)
                                 await ctx.send(f'{cr.name} got a slot back for playing 3 battles this week!')
-                                set_extra_used(cr)
+                                await adb.set_extra_used(cr)
         else:
             await ctx.send('The battle is not over yet, wait till then to confirm.')
 
@@ -1376,10 +1476,10 @@ class ScoreSheetBot(commands.Cog):
             await ctx.message.delete()
             await msg.delete(delay=5)
             return
-        win_elo = get_member_elo(winner_member.id)
-        lose_elo = get_member_elo(loser_member.id)
+        win_elo = await adb.get_member_elo(winner_member.id)
+        lose_elo = await adb.get_member_elo(loser_member.id)
         winner_change, loser_change = rating_update(win_elo, lose_elo, 1)
-        add_ba_match(win_elo, lose_elo, winner_chars, loser_chars, winner_change, loser_change, winner_score,
+        await adb.add_ba_match(win_elo, lose_elo, winner_chars, loser_chars, winner_change, loser_change, winner_score,
                      loser_score)
         result_embed = discord.Embed(
             title=f'{winner_member.display_name} {winner_score}-{loser_score} {loser_member.display_name}',
@@ -1402,7 +1502,7 @@ class ScoreSheetBot(commands.Cog):
 
         crew_ranking_str = [f'{cr[2]}: **{cr[1]}**'
                             for cr
-                            in wisdom_rankings()]
+                            in self.cache.leaderboard.standings()]
 
         pages = menus.MenuPages(source=Paged(crew_ranking_str, title=f'{self.current_league} Rankings'),
                                 clear_reactions_after=True)
@@ -1453,14 +1553,14 @@ class ScoreSheetBot(commands.Cog):
     @commands.command(**help_doc['battles'])
     async def battles(self, ctx):
 
-        pages = menus.MenuPages(source=Paged(all_battles(), title='Battles'), clear_reactions_after=True)
+        pages = menus.MenuPages(source=Paged(await adb.all_battles(), title='Battles'), clear_reactions_after=True)
         await pages.start(ctx)
 
     @commands.command(**help_doc['vod'])
     @role_call([CERTIFIED, ADMIN, DOCS, MINION])
     async def vod(self, ctx, battle_id: int, vod: str):
 
-        set_vod(battle_id, vod)
+        await adb.set_vod(battle_id, vod)
         await ctx.send(f'{ctx.author.name} set battle {battle_id}\'s vod to {vod}.')
 
     @commands.command(**help_doc['playerstats'])
@@ -1471,7 +1571,7 @@ class ScoreSheetBot(commands.Cog):
 
         else:
             member = ctx.author
-        pages = menus.MenuPages(source=PlayerStatsPaged(member, self))
+        pages = menus.MenuPages(source=await PlayerStatsPaged.load(member, self))
         await pages.start(ctx)
 
     @commands.command(**help_doc['stats'])
@@ -1481,22 +1581,22 @@ class ScoreSheetBot(commands.Cog):
             ambiguous = ambiguous_lookup(name, self)
             if isinstance(ambiguous, discord.Member):
 
-                pages = menus.MenuPages(source=PlayerStatsPaged(ambiguous, self))
+                pages = menus.MenuPages(source=await PlayerStatsPaged.load(ambiguous, self))
                 await pages.start(ctx)
                 return
             else:
                 actual_crew = ambiguous
         else:
-            pages = menus.MenuPages(source=PlayerStatsPaged(ctx.author, self))
+            pages = menus.MenuPages(source=await PlayerStatsPaged.load(ctx.author, self))
             await pages.start(ctx)
             return
-        record = crew_record(actual_crew, CURRENT_LEAGUE_ID)
+        record = await adb.crew_record(actual_crew, CURRENT_LEAGUE_ID)
         if not record[2]:
             await ctx.send(f'{actual_crew.name} does not have any recorded crew battles with the bot.')
             return
         title = f'{actual_crew.name}: {record[1]}-{int(record[2]) - int(record[1])}'
         pages = menus.MenuPages(
-            source=Paged(crew_matches(actual_crew), title=title, color=actual_crew.color, thumbnail=actual_crew.icon),
+            source=Paged(await adb.crew_matches(actual_crew), title=title, color=actual_crew.color, thumbnail=actual_crew.icon),
             clear_reactions_after=True)
         await pages.start(ctx)
 
@@ -1520,7 +1620,7 @@ class ScoreSheetBot(commands.Cog):
             member_name = member.display_name
             member_color = member.colour
         else:
-            member_id, member_name = name, nickname_lookup(int(name))
+            member_id, member_name = name, await adb.nickname_lookup(int(name))
             if not member_name:
                 raise ValueError(f'Member {name} has never been recorded on this server.')
             member_color = discord.Color.blurple()
@@ -1529,10 +1629,10 @@ class ScoreSheetBot(commands.Cog):
             return
         embed = discord.Embed(title=f'Crew History for {member_name}', color=member_color)
         desc = []
-        current = member_crew_and_date(member_id)
+        current = await adb.member_crew_and_date(member_id)
         if current:
             desc.append(f'**Current crew:** {current[0]} Joined: {current[1].strftime("%m/%d/%Y")}')
-        past = member_crew_history(member_id)
+        past = await adb.member_crew_history(member_id)
         desc.append('**Past Crew              Date            Action**')
         for cr_name, timing, which in past:
             j = timing.strftime('%m/%d/%Y')
@@ -1554,13 +1654,13 @@ class ScoreSheetBot(commands.Cog):
         else:
             actual_crew = crew_lookup(crew(ctx.author, self), self)
             await ctx.send(f'{ctx.author.display_name} is in {crew(ctx.author, self)}.')
-        record = crew_record(actual_crew)
+        record = await adb.crew_record(actual_crew)
         if not record[2]:
             await ctx.send(f'{actual_crew.name} does not have any recorded crew battles with the bot.')
             return
         title = f'{actual_crew.name}: {record[1]}-{int(record[2]) - int(record[1])}'
         pages = menus.MenuPages(
-            source=Paged(crew_matches(actual_crew), title=title, color=actual_crew.color, thumbnail=actual_crew.icon),
+            source=Paged(await adb.crew_matches(actual_crew), title=title, color=actual_crew.color, thumbnail=actual_crew.icon),
             clear_reactions_after=True)
         await pages.start(ctx)
 
@@ -1758,12 +1858,12 @@ class ScoreSheetBot(commands.Cog):
         await unflair(member, ctx.author, self)
         await response_message(ctx, f'Successfully unflaired {member.mention} from {user_crew.name}.')
         if check_roles(member, [JOIN_CD]):
-            mod_slot(user_crew, 1)
-            unflairs, left, total = record_unflair(member.id, user_crew, True)
+            await adb.mod_slot(user_crew, 1)
+            unflairs, left, total = await adb.record_unflair(member.id, user_crew, True)
             await ctx.send(
                 f'{str(member)} was on 12h cooldown so {user_crew.name} gets back a slot ({left}/{total})')
         else:
-            unflairs, remaining, total = record_unflair(member.id, user_crew, False)
+            unflairs, remaining, total = await adb.record_unflair(member.id, user_crew, False)
             if unflairs == 3:
                 await ctx.send(f'{user_crew.name} got a flair slot back for 3 unflairs. {remaining}/{total} left.')
             else:
@@ -1815,7 +1915,7 @@ class ScoreSheetBot(commands.Cog):
                                        f'{flairing_crew.name} is an overflow crew. https://discord.gg/ARqkTYg')
                 return
 
-        left, total = slots(flairing_crew)
+        left, total = await adb.slots(flairing_crew)
         if left <= 0:
             await response_message(ctx, f'{flairing_crew.name} has no flairing slots left ({left}/{total})')
             return
@@ -1843,8 +1943,8 @@ class ScoreSheetBot(commands.Cog):
             await response_message(ctx, str(ve))
             return
         await response_message(ctx, f'Successfully flaired {member.mention} for {flairing_crew.name}.')
-        mod_slot(flairing_crew, -1)
-        record_flair(member, flairing_crew)
+        await adb.mod_slot(flairing_crew, -1)
+        await adb.record_flair(member, flairing_crew)
         await ctx.send(f'{flairing_crew.name} now has ({left - 1}/{total}) slots.')
         after = set(ctx.guild.get_member(member.id).roles)
         if flairing_crew.overflow:
@@ -1890,10 +1990,10 @@ class ScoreSheetBot(commands.Cog):
         bracket_crews.insert(1, bye)
         bracket_crews.insert(9, bye)
         br = Bracket(bracket_crews, ctx.author)
-        predictions = get_bracket_predictions(ctx.author.id)
+        predictions = await adb.get_bracket_predictions(ctx.author.id)
         for prediction in predictions:
             br.report_winner(prediction[0])
-        answers = get_bracket_questions(ctx.author.id)
+        answers = await adb.get_bracket_questions(ctx.author.id)
         out_str = ['Your extra predictions!']
         for i, question in enumerate(NUMBER_QUESTIONS):
             out_str.append(question + ': ' + str(answers[i][0]))
@@ -1920,14 +2020,15 @@ class ScoreSheetBot(commands.Cog):
     @main_only
     async def coins(self, ctx: Context, member: Optional[discord.Member] = None):
         member = member or ctx.author
-        await ctx.send(f'{str(member)} has {member_gcoins(member)} G-Coins.')
+        await ctx.send(f'{str(member)} has {await adb.member_gcoins(member)} G-Coins.')
 
     @commands.group(name='gamb', invoke_without_command=True)
     @main_only
     @role_call([MINION, ADMIN, LU])
     async def gamb(self, ctx: Context):
-        if current_gambit():
-            await ctx.send(f'{current_gambit()}')
+        cg = self.cache.gambit.current()
+        if cg:
+            await ctx.send(f'{cg}')
         else:
             await ctx.send('No Current gambit.')
 
@@ -1935,7 +2036,7 @@ class ScoreSheetBot(commands.Cog):
     @main_only
     @role_call([MINION, ADMIN, LU, GAMB_OL])
     async def start(self, ctx: Context, c1: str, c2: str):
-        cg = current_gambit()
+        cg = self.cache.gambit.current()
         if cg:
             await response_message(ctx, f'Gambit is already started between {cg.team1} and {cg.team2}')
             return
@@ -1948,7 +2049,8 @@ class ScoreSheetBot(commands.Cog):
             f'{self.cache.roles.gambit.mention} a new gambit has started between {crew1.name} and {crew2.name}!'
             f'\nPlace your bets by typing `,bet AMOUNT CREW_NAME` in {self.cache.channels.gambit_bot.mention} '
             f'and find out the odds by typing `,odds`.')
-        new_gambit(crew1, crew2, msg.id)
+        await adb.new_gambit(crew1, crew2, msg.id)
+        self.cache.gambit.start(crew1.name, crew2.name, msg.id)
         await ctx.send(f'Gambit started between {crew1.name} and {crew2.name}.')
         self._gambit_message = msg
 
@@ -1956,7 +2058,7 @@ class ScoreSheetBot(commands.Cog):
     @main_only
     @role_call([MINION, ADMIN, LU, GAMB_OL])
     async def close(self, ctx: Context, stream: Optional[str] = '', channel: Optional[discord.TextChannel] = ''):
-        cg = current_gambit()
+        cg = self.cache.gambit.current()
         if not cg:
             await response_message(ctx, f'Gambit not started, please use `,gamb start`')
             return
@@ -1965,12 +2067,15 @@ class ScoreSheetBot(commands.Cog):
             if not await wait_for_reaction_on_message(YES, NO, msg, ctx.author, self.bot):
                 await ctx.send(f'{ctx.author.mention}: {ctx.command.name} canceled or timed out!')
                 return
-            lock_gambit(False)
+            await adb.lock_gambit(False)
+            self.cache.gambit.lock(False)
             await msg.delete()
             await response_message(ctx, f'Gambit between {cg.team1} and {cg.team2} unlocked by {ctx.author.mention}.')
         else:
-            lock_gambit(True)
-            cg = current_gambit()
+            await adb.lock_gambit(True)
+            self.cache.gambit.lock(True)
+            self.gambit_announcer.cancel()
+            cg = self.cache.gambit.current()
             ch = channel.mention if channel else ''
             await response_message(ctx, f'Gambit between {cg.team1} and {cg.team2} locked by {ctx.author.mention}.')
             await self.cache.channels.gambit_announce.send(
@@ -1983,7 +2088,7 @@ class ScoreSheetBot(commands.Cog):
     # @main_only
     # @role_call([MINION, ADMIN, LU, GAMB_OL])
     # async def cancel(self, ctx: Context):
-    #     cg = current_gambit()
+    #     cg = self.cache.gambit.current()
     #     if not cg:
     #         await response_message(ctx, f'Gambit not started, please use `,gamb start`')
     #         return
@@ -2010,7 +2115,7 @@ class ScoreSheetBot(commands.Cog):
     @main_only
     @role_call([MINION, ADMIN, LU, GAMB_OL])
     async def finish(self, ctx: Context, *, winner: str):
-        cg = current_gambit()
+        cg = self.cache.gambit.current()
         if not cg:
             await response_message(ctx, f'Gambit not started, please use `,gamb start`')
             return
@@ -2035,71 +2140,49 @@ class ScoreSheetBot(commands.Cog):
             return
 
         await ctx.send('This might take awhile, so please do not repeat the command.')
-        if winning_bets == 0:
-            ratio = 0
+        _, payouts, coins, winning_bets, losing_bets = await adb.settle_gambit(win.name, loser)
+        # Totals from the settled bets, in case the in memory ones drifted
+        if winner == 1:
+            cg.bets_1, cg.bets_2 = winning_bets, losing_bets
         else:
-            ratio = losing_bets / winning_bets
-        gambit_id = archive_gambit(win.name, loser, winning_bets, losing_bets)
-        top_win, top_loss = (0, None), (0, None)
-        for member_id, amount, cr in all_bets():
-            member = self.bot.get_user(member_id)
-            if not member:
-                continue
-            try:
-                if cr == win.name:
-                    final = amount + math.ceil(amount * ratio)
-                    if final == 0:
-                        # Reset win
-                        final = 220
-                    if member:
-                        total = refund_member_gcoins(member, final)
-                        if final > top_win[0]:
-                            top_win = [final, str(member)]
-
-                        msg = (f'You won {final} G-Coins on your bet of {amount} on {cr} over {loser}! '
-                               f'Congrats you now have {total} G-Coins!')
-                        try:
-                            await member.send(msg)
-                        except discord.errors.Forbidden:
-                            await ctx.send(f'{str(member)} is not accepting dms.')
-                else:
-                    total = member_gcoins(member)
-                    final = -amount
-
-                    if final > top_loss[0]:
-                        top_loss = [final, str(member)]
-                    await member.send(f'You lost {amount} G-Coins on your bet on {cr} over {win.name}.')
-                    if total > 0:
-                        await member.send(f'You now have {total} coins remaining.')
-                    else:
-                        await member.send('You are all out of G-Coins, but worry not! If you place a 0 G-Coin bet'
-                                          ' when you are bankrupt, if you win, you get 220 G-Coins!')
-            except discord.errors.Forbidden:
-                await ctx.send(f'{str(member)} is not accepting dms.')
-            archive_bet(member, final, gambit_id)
-        cancel_gambit()
+            cg.bets_1, cg.bets_2 = losing_bets, winning_bets
+        self.cache.gambit.clear()
+        self.gambit_announcer.cancel()
+        messages = payout_dms(payouts, coins, win.name, loser, self.bot.get_user)
+        status = await ctx.send(f'Settled {len(payouts)} bets, sending results to {len(messages)} bettors.')
+
+        async def progress(done, total):
+            await status.edit(content=f'Settled {len(payouts)} bets, sent results to {done}/{total} bettors.')
+
+        sent = await outbound.dm_all(messages, progress)
+        if sent.forbidden or sent.failed:
+            await send_long(ctx, 'Could not dm: ' + ', '.join(str(member) for member in sent.forbidden + sent.failed),
+                            ', ')
         await ctx.send(f'Gambit concluded! {win.name} beat {loser}, {winning_bets} G-Coins were placed on {win.name} '
                        f'and {losing_bets} G-Coins were placed on {loser}.')
 
-        update_gambit_sheet()
+        best, worst = top_payouts(payouts)
+        top_win = (best.result, str(self.bot.get_user(best.member_id) or best.member_id)) if best else (0, None)
+        top_loss = (worst.bet, str(self.bot.get_user(worst.member_id) or worst.member_id)) if worst else (0, None)
+        await asyncio.get_running_loop().run_in_executor(None, update_gambit_sheet)
         await update_finished_gambit(cg, winner, self, top_win, top_loss)
 
     @gamb.command()
     @main_only
     @role_call([MINION, ADMIN, LU, GAMB_OL])
     async def update(self, ctx):
-        cg = current_gambit()
+        cg = self.cache.gambit.current()
         if cg:
             await update_gambit_message(cg, self)
 
-        update_gambit_sheet()
+        await asyncio.get_running_loop().run_in_executor(None, update_gambit_sheet)
 
     @commands.command(**help_doc['bet'])
     @gambit_channel
     async def bet(self, ctx: Context, *, everything: str):
-        cg = current_gambit()
+        cg = self.cache.gambit.current()
         split = everything.split()
-        current = member_gcoins(ctx.author)
+        current = await adb.member_gcoins(ctx.author)
         if split[0] == 'all':
             amount = current
             team = ' '.join(split[1:])
@@ -2123,21 +2206,21 @@ class ScoreSheetBot(commands.Cog):
             await ctx.send(f'The gambit between {cg.team1} and {cg.team2} is locked as the battle has already started.'
                            f'\nUse `,odds` to see the current odds.')
             return
-        if not is_gambiter(ctx.author):
+        if not await adb.is_gambiter(ctx.author):
             if not await join_gambit(ctx.author, self):
                 await ctx.send(f'{str(ctx.author)} isn\'t a gambiter and didn\'t join. (check your dms and try again)')
                 return
         cr = crew_lookup(team, self)
-        validate_bet(ctx.author, cr, amount, self)
+        await validate_bet(ctx.author, cr, amount, self)
         if await confirm_bet(ctx, cr, amount, self):
             await ctx.message.delete()
 
-            await update_gambit_message(current_gambit(), self)
+            self.gambit_announcer.mark_dirty()
 
     @commands.command(**help_doc['odds'])
     @gambit_channel
     async def odds(self, ctx: Context):
-        cg = current_gambit()
+        cg = self.cache.gambit.current()
         if not cg:
             await ctx.send('No gambit is currently running, please wait for one to start before betting.')
             return
@@ -2164,10 +2247,10 @@ class ScoreSheetBot(commands.Cog):
         else:
             actual_crew = crew_lookup(crew(ctx.author, self), self)
             await ctx.send(f'{ctx.author.display_name} is in {crew(ctx.author, self)}.')
-        left, total, uf = extra_slots(actual_crew)
+        left, total, uf = await adb.extra_slots(actual_crew)
 
         await ctx.send(f'{actual_crew.name} current slots: {left}/{total}  ({uf}/3) for unflair.')
-        new = cur_slot_set(actual_crew, num)
+        new = await adb.cur_slot_set(actual_crew, num)
         await ctx.send(f'Set {actual_crew.name} slots to {new}.')
 
     @commands.command(**help_doc['setslots'])
@@ -2217,7 +2300,7 @@ class ScoreSheetBot(commands.Cog):
         if not await wait_for_reaction_on_message(YES, NO, msg, ctx.author, self.bot, 120):
             await response_message(ctx, 'Canceled or timed out.')
             return
-        update_crew_tf(actual_crew, answer + 1, division + 1)
+        await adb.update_crew_tf(actual_crew, answer + 1, division + 1)
         await ctx.send(f'{actual_crew.name} triforce status updated!')
 
     @commands.command(**help_doc['setreturnslots'])
@@ -2238,10 +2321,10 @@ class ScoreSheetBot(commands.Cog):
         else:
             actual_crew = crew_lookup(crew(ctx.author, self), self)
             await ctx.send(f'{ctx.author.display_name} is in {crew(ctx.author, self)}.')
-        left, total, uf = extra_slots(actual_crew)
+        left, total, uf = await adb.extra_slots(actual_crew)
 
         await ctx.send(f'{actual_crew.name} current slots: {left}/{total}  ({uf}/3) for unflair.')
-        uf, left, total = set_return_slots(actual_crew, num)
+        uf, left, total = await adb.set_return_slots(actual_crew, num)
         await ctx.send(f'Set {actual_crew.name} new slots: {left}/{total}  ({uf}/3) for unflair.')
 
     @commands.command(hidden=True)
@@ -2259,7 +2342,7 @@ class ScoreSheetBot(commands.Cog):
         else:
             actual_crew = crew_lookup(crew(ctx.author, self), self)
             await ctx.send(f'{ctx.author.display_name} is in {crew(ctx.author, self)}.')
-        left, total, uf = extra_slots(actual_crew)
+        left, total, uf = await adb.extra_slots(actual_crew)
         if uf > 0:
             uf += 2
             uf %= 3
@@ -2274,7 +2357,7 @@ class ScoreSheetBot(commands.Cog):
     @commands.command(**help_doc['cooldown'], hidden=True)
     @role_call(STAFF_LIST)
     async def cooldown(self, ctx):
-        users_and_times = sorted(cooldown_current(), key=lambda x: x[1])
+        users_and_times = sorted(await adb.cooldown_current(), key=lambda x: x[1])
         out = []
         for user_id, tdelta in users_and_times:
             user = self.cache.scs.get_member(user_id)
@@ -2287,7 +2370,7 @@ class ScoreSheetBot(commands.Cog):
     @commands.command(**help_doc['charge'])
     @role_call([MINION, ADMIN])
     async def charge(self, ctx, member: discord.Member, amount: int, *, reason: str = 'None Specified'):
-        current = member_gcoins(member)
+        current = await adb.member_gcoins(member)
         if amount > current:
             await response_message(ctx,
                                    f'{member.mention} only has {current} G-Coins, they cannot be charged {amount}.')
@@ -2298,7 +2381,7 @@ class ScoreSheetBot(commands.Cog):
         if not await wait_for_reaction_on_message(YES, NO, msg, ctx.author, self.bot, 120):
             await response_message(ctx, 'Canceled or timed out.')
             return
-        final = charge(member.id, amount, reason)
+        final = await adb.charge(member.id, amount, reason)
         await ctx.send(f'{member.mention} sucessfully was charged {amount} G-Coins for {reason}! They now have {final}'
                        f' G-Coins.')
 
@@ -2329,7 +2412,7 @@ class ScoreSheetBot(commands.Cog):
             if not await wait_for_reaction_on_message(YES, NO, msg, ctx.author, self.bot, 120):
                 await response_message(ctx, 'Canceled or timed out.')
                 return
-            destiny_opt(cr.db_id, False)
+            await adb.destiny_opt(cr.db_id, False)
             await ctx.send(f'{cr.name} opted back in to destiny! (Rc to see)')
         else:
             msg = await ctx.send(f'Would you like to opt {cr.name} out for destiny?\n'
@@ -2337,7 +2420,7 @@ class ScoreSheetBot(commands.Cog):
             if not await wait_for_reaction_on_message(YES, NO, msg, ctx.author, self.bot, 120):
                 await response_message(ctx, 'Canceled or timed out.')
                 return
-            destiny_opt(cr.db_id, True)
+            await adb.destiny_opt(cr.db_id, True)
             await ctx.send(f'{cr.name} opted out of destiny! (Rc to see)')
 
     @commands.command(**help_doc['pair'])
@@ -2362,7 +2445,7 @@ class ScoreSheetBot(commands.Cog):
                     return
                 opp = crew_lookup(cr.destiny_opponent, self)
 
-                destiny_unpair(cr.db_id, opp.db_id)
+                await adb.destiny_unpair(cr.db_id, opp.db_id)
                 await response_message(ctx, f'{cr.name} and {opp.name} destiny opp reset.')
                 return
             if cr.destiny_opt_out:
@@ -2372,7 +2455,7 @@ class ScoreSheetBot(commands.Cog):
         if not await wait_for_reaction_on_message(YES, NO, msg, ctx.author, self.bot, 120):
             await response_message(ctx, 'Canceled or timed out.')
             return
-        destiny_pair(crew_1.db_id, crew_2.db_id)
+        await adb.destiny_pair(crew_1.db_id, crew_2.db_id)
         crew_1.destiny_opponent = crew_2.name
         crew_2.destiny_opponent = crew_1.name
         await ctx.send(f'{crew_1.name} has been paired with {crew_2.name} for destiny!')
@@ -2411,9 +2494,11 @@ class ScoreSheetBot(commands.Cog):
             links.append(link)
 
         league_id = CURRENT_LEAGUE_ID
-        battle_id = add_non_ss_battle(winner_crew, loser_crew, 0, 1, links[0].jump_url, league_id)
-        winner_elo, winner_change, loser_elo, loser_change, d_winner_change, d_final, winner_k, loser_k = battle_elo_changes(
+        battle_id = await adb.add_non_ss_battle(winner_crew, loser_crew, 0, 1, links[0].jump_url, league_id)
+        winner_elo, winner_change, loser_elo, loser_change, d_winner_change, d_final, winner_k, loser_k = await adb.battle_elo_changes(
             battle_id, forfeit=True)
+        self.cache_value.ratings_changed({winner_crew.name: winner_elo + winner_change,
+                                          loser_crew.name: loser_elo + loser_change})
 
         new_message = (
             f'**{today.strftime("%B %d, %Y")} ({self.current_league}) - {winner_crew.name} ({winner_crew.abbr})⚔'
@@ -2474,12 +2559,14 @@ class ScoreSheetBot(commands.Cog):
             links.append(link)
 
         league_id = CURRENT_LEAGUE_ID
-        battle_id = add_non_ss_battle(winner_crew, loser_crew, players, score, links[0].jump_url, league_id)
+        battle_id = await adb.add_non_ss_battle(winner_crew, loser_crew, players, score, links[0].jump_url, league_id)
 
         today = date.today()
 
-        winner_elo, winner_change, loser_elo, loser_change, d_winner_change, d_final, winner_k, loser_k = battle_elo_changes(
+        winner_elo, winner_change, loser_elo, loser_change, d_winner_change, d_final, winner_k, loser_k = await adb.battle_elo_changes(
             battle_id)
+        self.cache_value.ratings_changed({winner_crew.name: winner_elo + winner_change,
+                                          loser_crew.name: loser_elo + loser_change})
         w_placement = (STARTING_K - winner_k) / K_CHANGE + 1
         l_placement = (STARTING_K - loser_k) / K_CHANGE + 1
         if w_placement < 6:
@@ -2512,11 +2599,11 @@ class ScoreSheetBot(commands.Cog):
             f'has been confirmed by both sides and posted in {output_channels[0].mention}. '
             f'(Battle number:{battle_id})')
         for cr in (winner_crew, loser_crew):
-            if not extra_slot_used(cr):
-                if battles_since_sunday(cr) >= 3:
-                    mod_slot(cr, 1)
+            if not await adb.extra_slot_used(cr):
+                if await adb.battles_since_sunday(cr) >= 3:
+                    await adb.mod_slot(cr, 1)
                     await ctx.send(f'{cr.name} got a slot back for playing 3 battles this week!')
-                    set_extra_used(cr)
+                    await adb.set_extra_used(cr)
 
     #
     #     elif current.battle_type in (BattleType.POWER, BattleType.COURAGE):
@@ -2616,10 +2703,11 @@ class ScoreSheetBot(commands.Cog):
             links.append(link)
 
         league_id = CURRENT_LEAGUE_ID
-        battle_id = add_failed_reg_battle(winner_crew, players, score, links[0].jump_url, league_id)
-        reset_fake_crew_rating(league_id)
-        winner_elo, winner_change, loser_elo, loser_change, d_winner_change, d_final, winner_k, loser_k = battle_elo_changes(
+        battle_id = await adb.add_failed_reg_battle(winner_crew, players, score, links[0].jump_url, league_id)
+        await adb.reset_fake_crew_rating(league_id)
+        winner_elo, winner_change, loser_elo, loser_change, d_winner_change, d_final, winner_k, loser_k = await adb.battle_elo_changes(
             battle_id)
+        self.cache_value.ratings_changed({winner_crew.name: winner_elo + winner_change})
         w_placement = (200 - winner_k) / 30 + 1
         l_placement = (200 - winner_k) / 30 + 1
         if w_placement < 6:
@@ -2645,11 +2733,11 @@ class ScoreSheetBot(commands.Cog):
             f'The battle between {winner_crew.name}({w_placement_message}) and {loser_crew}(Failed Reg Crew) '
             f'has been confirmed by both sides and posted in {output_channels[0].mention}. '
             f'(Battle number:{battle_id})')
-        if not extra_slot_used(winner_crew):
-            if battles_since_sunday(winner_crew) >= 3:
-                mod_slot(winner_crew, 1)
+        if not await adb.extra_slot_used(winner_crew):
+            if await adb.battles_since_sunday(winner_crew) >= 3:
+                await adb.mod_slot(winner_crew, 1)
                 await ctx.send(f'{winner_crew.name} got a slot back for playing 3 battles this week!')
-                set_extra_used(winner_crew)
+                await adb.set_extra_used(winner_crew)
 
     @commands.command(**help_doc['weirdreg'])
     @main_only
@@ -2694,11 +2782,12 @@ class ScoreSheetBot(commands.Cog):
             link = await output_channel.send(files=files)
             links.append(link)
         league_id = CURRENT_LEAGUE_ID
-        battle_id = add_weird_reg_battle(loser_crew, players, score, links[0].jump_url, league_id)
-        reset_fake_crew_rating(league_id)
+        battle_id = await adb.add_weird_reg_battle(loser_crew, players, score, links[0].jump_url, league_id)
+        await adb.reset_fake_crew_rating(league_id)
 
-        winner_elo, winner_change, loser_elo, loser_change, d_winner_change, d_final, winner_k, loser_k = battle_elo_changes(
+        winner_elo, winner_change, loser_elo, loser_change, d_winner_change, d_final, winner_k, loser_k = await adb.battle_elo_changes(
             battle_id)
+        self.cache_value.ratings_changed({loser_crew.name: loser_elo + loser_change})
         w_placement = (STARTING_K - winner_k) / K_CHANGE + 1
         l_placement = (STARTING_K - loser_k) / K_CHANGE + 1
         if w_placement < 6:
@@ -2730,11 +2819,11 @@ class ScoreSheetBot(commands.Cog):
             f'has been confirmed by both sides and posted in {output_channels[0].mention}. '
             f'(Battle number:{battle_id})')
         for cr in (loser_crew,):
-            if not extra_slot_used(cr):
-                if battles_since_sunday(cr) >= 3:
-                    mod_slot(cr, 1)
+            if not await adb.extra_slot_used(cr):
+                if await adb.battles_since_sunday(cr) >= 3:
+                    await adb.mod_slot(cr, 1)
                     await ctx.send(f'{cr.name} got a slot back for playing 3 battles this week!')
-                    set_extra_used(cr)
+                    await adb.set_extra_used(cr)
 
     @commands.command(**help_doc['overflow'], hidden=True)
     @role_call([ADMIN, MINION])
@@ -2765,45 +2854,45 @@ class ScoreSheetBot(commands.Cog):
     @commands.command(**help_doc['disable'])
     @role_call(STAFF_LIST)
     async def disable(self, ctx: Context, channel: discord.TextChannel):
-        if channel.id in disabled_channels():
+        if await self.command_cache.channel_disabled(channel.id):
             msg = await ctx.send(f'{channel.name} is already disabled, re-enable?')
             if not await wait_for_reaction_on_message(YES, NO, msg, ctx.author, self.bot):
                 await ctx.send(f'{ctx.author.mention}: {ctx.command.name} canceled or timed out!')
                 return
-            remove_disabled_channel(channel.id)
+            await self.command_cache.set_channel_disabled(channel.id, False)
             await ctx.send(f'{channel.name} undisabled.')
         else:
             msg = await ctx.send(f'Really disable the bot in {channel.name}?')
             if not await wait_for_reaction_on_message(YES, NO, msg, ctx.author, self.bot):
                 await ctx.send(f'{ctx.author.mention}: {ctx.command.name} canceled or timed out!')
                 return
-            add_disabled_channel(channel.id)
+            await self.command_cache.set_channel_disabled(channel.id, True)
             await ctx.send(f'JettBot disabled in {channel.name}.')
 
     @commands.command(**help_doc['deactivate'])
     @role_call(STAFF_LIST)
     async def deactivate(self, ctx: Context, command: str):
         command_name = closest_command(command, self)
-        db_command = command_lookup(command_name)
-        if db_command[1]:
+        if await self.command_cache.command_deactivated(command_name):
             msg = await ctx.send(f'`{command_name}` is already deactivated, re-activate?')
             if not await wait_for_reaction_on_message(YES, NO, msg, ctx.author, self.bot):
                 await ctx.send(f'{ctx.author.mention}: {ctx.command.name} canceled or timed out!')
                 return
-            set_command_activation(command_name, False)
+            await self.command_cache.set_command_deactivated(command_name, False)
             await ctx.send(f'{command_name} reactivated.')
         else:
             msg = await ctx.send(f'really deactivate `{command_name}`?')
             if not await wait_for_reaction_on_message(YES, NO, msg, ctx.author, self.bot):
                 await ctx.send(f'{ctx.author.mention}: {ctx.command.name} canceled or timed out!')
                 return
-            set_command_activation(command_name, True)
+            await self.command_cache.set_command_deactivated(command_name, True)
             await ctx.send(f'`{command_name}` deactivated.')
 
     @commands.command(**help_doc['usage'])
     @role_call([DOCS, MINION, ADMIN, CERTIFIED])
     async def usage(self, ctx: Context):
-        pages = menus.MenuPages(source=Paged(command_leaderboard(), title='Command usage counts'),
+        await self.command_cache.flush_usage()
+        pages = menus.MenuPages(source=Paged(await adb.command_leaderboard(), title='Command usage counts'),
                                 clear_reactions_after=True)
         await pages.start(ctx)
 
@@ -2837,7 +2926,7 @@ class ScoreSheetBot(commands.Cog):
             return
         flairing_crew = crew_lookup(new_crew, self)
         if not flairing_crew.db_id:
-            flairing_crew.db_id = id_from_crew(flairing_crew)
+            flairing_crew.db_id = await adb.id_from_crew(flairing_crew)
             if not flairing_crew.db_id:
                 await ctx.send(f'{flairing_crew.name} does not have a database id set for some reason. Please make sure'
                                f'everything has been properly set up, including role and docs then recache.')
@@ -2872,7 +2961,7 @@ class ScoreSheetBot(commands.Cog):
             before = set(member.roles)
             try:
                 await flair(member, flairing_crew, self, True, True)
-                record_flair(member, flairing_crew)
+                await adb.record_flair(member, flairing_crew)
             except ValueError as ve:
                 await response_message(ctx, str(ve))
                 return
@@ -2897,13 +2986,14 @@ class ScoreSheetBot(commands.Cog):
                 desc.append('Already on a crew, needs to unflair')
                 for s in fail_on_crew:
                     desc.append(f'{s.display_name}: {s.mention}')
-        _, total = slots(flairing_crew)
+        _, total = await adb.slots(flairing_crew)
         if total == 0:
             calced = calc_reg_slots(len(members))
-            total_slot_set(flairing_crew, calced)
+            await adb.total_slot_set(flairing_crew, calced)
             desc.append(f'Initiated with {calced} slots.')
         starting_k = 50 if self.past_2_weeks else STARTING_K
-        init_rating(flairing_crew, 1500, starting_k)
+        await adb.init_rating(flairing_crew, 1500, starting_k)
+        self.cache_value.seed_rankings(await adb.league_ratings())
 
         embed = discord.Embed(title=f'Crew Reg for {flairing_crew.name}', description='\n'.join(desc),
                               color=flairing_crew.color)
@@ -2925,7 +3015,7 @@ class ScoreSheetBot(commands.Cog):
         if not await wait_for_reaction_on_message(YES, NO, msg, ctx.author, self.bot):
             await ctx.send(f'{ctx.author.mention}: {ctx.command.name} canceled or timed out!')
             return
-        mod_slot(cr, 1)
+        await adb.mod_slot(cr, 1)
         await ctx.send(f'{cr.name} got a slot back for playing 3 battles this week!')
 
     @commands.command(**help_doc['freeze'])
@@ -2947,7 +3037,7 @@ class ScoreSheetBot(commands.Cog):
                 if not await wait_for_reaction_on_message(YES, NO, msg, ctx.author, self.bot):
                     await ctx.send(f'{ctx.author.mention}: {ctx.command.name} canceled or timed out!')
                     return
-                freeze_crew(actual, None)
+                await adb.freeze_crew(actual, None)
                 await ctx.send(f'{actual.name} unfrozen.')
             else:
                 finish = parseTime(length)
@@ -2956,7 +3046,7 @@ class ScoreSheetBot(commands.Cog):
                 if not await wait_for_reaction_on_message(YES, NO, msg, ctx.author, self.bot):
                     await ctx.send(f'{ctx.author.mention}: {ctx.command.name} canceled or timed out!')
                     return
-                freeze_crew(actual, finish)
+                await adb.freeze_crew(actual, finish)
                 await ctx.send(f'{actual.name} frozen till {finish}.')
         else:
             if length:
@@ -2965,14 +3055,14 @@ class ScoreSheetBot(commands.Cog):
                 if not await wait_for_reaction_on_message(YES, NO, msg, ctx.author, self.bot):
                     await ctx.send(f'{ctx.author.mention}: {ctx.command.name} canceled or timed out!')
                     return
-                freeze_crew(actual, finish)
+                await adb.freeze_crew(actual, finish)
                 await ctx.send(f'{actual.name} frozen till {finish}.')
             else:
                 msg = await ctx.send(f'Do you want to freeze {actual.name} indefinitely?')
                 if not await wait_for_reaction_on_message(YES, NO, msg, ctx.author, self.bot):
                     await ctx.send(f'{ctx.author.mention}: {ctx.command.name} canceled or timed out!')
                     return
-                freeze_crew(actual, datetime(2069, 4, 20))
+                await adb.freeze_crew(actual, datetime(2069, 4, 20))
                 await ctx.send(f'{actual.name} frozen indefinitely.')
 
     @commands.command(**help_doc['disband'], hidden=True)
@@ -3028,7 +3118,8 @@ class ScoreSheetBot(commands.Cog):
                                            [f'{mem.mention}, {mem.id}, {str(mem)}' for mem in members]),
                                        color=dis_crew.color)
 
-        disband_crew(dis_crew)
+        await adb.disband_crew(dis_crew)
+        self.cache_value.crew_disbanded(dis_crew.name)
         await send_long_embed(ctx, response_embed)
         await send_long_embed(self.cache.channels.flair_log, response_embed)
 
@@ -3081,7 +3172,7 @@ class ScoreSheetBot(commands.Cog):
                 await member.edit(nick=nick_without_prefix(member.display_name))
                 await user.remove_roles(of_role, reason=f'Unflaired by {ctx.author.name}')
                 await member.add_roles(new_role)
-        update_crew_tomain(dis_crew, new_role.id)
+        await adb.update_crew_tomain(dis_crew, new_role.id)
         await self.cache.update(self)
         await of_role.delete()
         response_embed = discord.Embed(title=f'{dis_crew.name} has been moved to the main server.',
@@ -3093,11 +3184,42 @@ class ScoreSheetBot(commands.Cog):
     @commands.command(**help_doc['recache'], hidden=True, aliases=['rc'])
     @role_call(STAFF_LIST)
     async def recache(self, ctx: Context):
-        await self._cache_process()
+        await self._cache_process(full=True)
         self.auto_cache.cancel()
         self.auto_cache.restart()
         await ctx.send('The cache has been reset, everything should be updated now.')
 
+    @commands.command(**help_doc['syncroles'], hidden=True)
+    @role_call(STAFF_LIST)
+    async def syncroles(self, ctx: Context):
+        for guild in (self.cache.scs, self.cache.overflow_server):
+            gained, lost = await adb.sync_member_roles(guild.members)
+            await ctx.send(f'{guild.name}: {len(guild.members)} members synced, {gained} roles gained, {lost} lost.')
+
+    @commands.command(**help_doc['dbstats'], hidden=True)
+    @role_call(STAFF_LIST)
+    async def dbstats(self, ctx: Context, limit: int = 10):
+        report = db_stats.report(limit, pool_stats())
+        for chunk in split_on_length_and_separator(report, length=1990, separator='\n'):
+            await ctx.send(f'```{chunk}```')
+
+    @commands.command(**help_doc['recachereport'], hidden=True)
+    @role_call(STAFF_LIST)
+    async def recachereport(self, ctx: Context):
+        await ctx.send(f'```{self.recache_monitor.report()}```')
+
+    @commands.command(**help_doc['latency'], hidden=True)
+    @role_call(STAFF_LIST)
+    async def latency(self, ctx: Context, limit: int = 10):
+        report = profiler.report(limit)
+        for chunk in split_on_length_and_separator(report, length=1990, separator='\n'):
+            await ctx.send(f'```{chunk}```')
+
+    @commands.command(**help_doc['outboundreport'], hidden=True)
+    @role_call(STAFF_LIST)
+    async def outboundreport(self, ctx: Context):
+        await ctx.send(f'```{outbound.report()}```')
+
     @commands.command(**help_doc['retag'], hidden=True)
     @role_call(STAFF_LIST)
     async def retag(self, ctx, *, name: str = None):
@@ -3164,7 +3286,7 @@ class ScoreSheetBot(commands.Cog):
     async def thank(self, ctx: Context):
 
         await ctx.send(f'Thanks for all the hard work you do on the bot alexjett!\n'
-                       f'{add_thanks(ctx.author)} \n(If you want to thank him with money you can do so here. '
+                       f'{await adb.add_thanks(ctx.author)} \n(If you want to thank him with money you can do so here. '
                        f'https://www.buymeacoffee.com/alexjett)')
 
     @commands.command(**help_doc['thankboard'])
@@ -3172,7 +3294,7 @@ class ScoreSheetBot(commands.Cog):
     @commands.cooldown(1, 30, commands.BucketType.user)
     async def thankboard(self, ctx: Context):
 
-        await ctx.send(embed=thank_board(ctx.author))
+        await ctx.send(embed=await adb.thank_board(ctx.author))
 
     @commands.command(**help_doc['coin'])
     async def coin(self, ctx: Context, member: discord.Member = None):
@@ -3193,7 +3315,7 @@ class ScoreSheetBot(commands.Cog):
 
     @commands.command(**help_doc['disablelist'])
     async def disablelist(self, ctx: Context):
-        ids = disabled_channels()
+        ids = await adb.disabled_channels()
         out = [f'<#{id_num}>' for id_num in ids]
         out.insert(0, 'List of channels the bot is disabled in:')
         await ctx.send('\n'.join(out))
@@ -3204,7 +3326,7 @@ class ScoreSheetBot(commands.Cog):
 
     @commands.command(**help_doc['listroles'], aliases=['roster'])
     async def listroles(self, ctx, *, role: str):
-        actual, mems, extra = members_with_str_role(role, self)
+        actual, mems, extra = await members_with_str_role(role, self)
         mems.sort(key=lambda x: str(x))
         if 'everyone' in actual:
             await ctx.send('I will literally ban you if you try this again.')
@@ -3215,7 +3337,7 @@ class ScoreSheetBot(commands.Cog):
         desc = ['\n'.join([f'{str(member)} {member.mention}' for member in mems])]
         if extra:
             desc.append('These members are flaired for the crew, but not in the server')
-            desc.extend(['\n'.join([f'{name_from_id(mem_id)}: {str(mem_id)}' for mem_id in extra])])
+            desc.extend(['\n'.join([f'{await adb.name_from_id(mem_id)}: {str(mem_id)}' for mem_id in extra])])
         if actual in self.cache.crews_by_name:
             cr = crew_lookup(actual, self)
             title = f'All {len(mems)} members on crew {actual}'
@@ -3254,7 +3376,7 @@ class ScoreSheetBot(commands.Cog):
     @commands.command(**help_doc['pingrole'])
     @role_call(STAFF_LIST)
     async def pingrole(self, ctx, *, role: str):
-        actual, mems, _ = members_with_str_role(role, self)
+        actual, mems, _ = await members_with_str_role(role, self)
         out = [f'Pinging all members of role {actual}: ']
         for mem in mems:
             out.append(mem.mention)
@@ -3268,7 +3390,7 @@ class ScoreSheetBot(commands.Cog):
                    'Keep slot system, but change it so 2 unflairs is a returned slot rather than 3',
                    'Remove slots, reimplement old merge rules (this option is no longer valid)')
         cr = crew_lookup(crew(ctx.author, self), self)
-        current_vote = get_crew_vote(cr)
+        current_vote = await adb.get_crew_vote(cr)
         if current_vote:
             msg = await ctx.send(f'Your crew {cr.name} has already voted for \n```{options[current_vote[1]]} ```\n '
                                  f'made by {current_vote[2]}. Would you like to overwrite this?')
@@ -3297,7 +3419,7 @@ class ScoreSheetBot(commands.Cog):
 
         await msg.delete()
         await ctx.message.delete()
-        set_crew_vote(cr, option, ctx.author.id)
+        await adb.set_crew_vote(cr, option, ctx.author.id)
 
     @commands.command(**help_doc['overlap'])
     async def overlap(self, ctx, *, two_roles: str = None):
@@ -3403,7 +3525,7 @@ class ScoreSheetBot(commands.Cog):
         else:
             actual = crew_lookup(crew(ctx.author, self), self)
 
-        total, diversity, cr_activity, players, activity, battles = calc_hardcap_current(actual)
+        total, diversity, cr_activity, players, activity, battles = await calc_hardcap_current(actual)
         diversity = round(diversity, 2)
         await ctx.send(
             f'Crew {actual.name} will have a hardcap of {total}: 50 + {diversity} (diversity) + {cr_activity} (activity) if the month ended right now\n'
@@ -3419,9 +3541,9 @@ class ScoreSheetBot(commands.Cog):
         if cr:
             actual = crew_lookup(cr, self)
             if datetime.now().month == 1:
-                usage = crew_usage_jan(actual, 1)
+                usage = await adb.crew_usage_jan(actual, 1)
             else:
-                usage = crew_usage(actual, 1)
+                usage = await adb.crew_usage(actual, 1)
             desc = []
             for mem_id, links in usage.items():
                 link_str = ''
@@ -3436,7 +3558,7 @@ class ScoreSheetBot(commands.Cog):
             embed = discord.Embed(title=f'Usage of each member of {actual.name} from last month ({len(usage)} total)',
                                   description='\n'.join(desc), color=discord.Color.random())
             await send_long_embed(ctx.author, embed)
-            usage = crew_usage(actual, 0)
+            usage = await adb.crew_usage(actual, 0)
             desc = []
             for mem_id, links in usage.items():
                 link_str = ''
@@ -3454,16 +3576,16 @@ class ScoreSheetBot(commands.Cog):
             # await ctx.message.add_reaction(emoji='✉')
         else:
             if datetime.now().month == 1:
-                usage = all_crew_usage_jan(1)
+                usage = await adb.all_crew_usage_jan(1)
             else:
-                usage = all_crew_usage(1)
+                usage = await adb.all_crew_usage(1)
             desc = []
             for number, name, _ in usage:
                 desc.append(f'{name}: {number}')
             embed = discord.Embed(title='Number of unique players in cbs last month by each crew',
                                   description='\n'.join(desc), color=discord.Color.random())
             await send_long_embed(ctx.author, embed)
-            usage = all_crew_usage()
+            usage = await adb.all_crew_usage()
             desc = []
             for number, name, _ in usage:
                 desc.append(f'{name}: {number}')
@@ -3492,7 +3614,7 @@ class ScoreSheetBot(commands.Cog):
 
         bracket_crews = playoff_crews(self)
         br = Bracket(bracket_crews, ctx.author)
-        predictions = get_bracket_predictions(420)
+        predictions = await adb.get_bracket_predictions(420)
         for prediction in predictions:
             br.report_winner(prediction[0])
         await ctx.send(file=draw_bracket(br.matches))
@@ -3557,11 +3679,9 @@ class ScoreSheetBot(commands.Cog):
     @commands.command(hidden=True, **help_doc['crnumbers'])
     @role_call(STAFF_LIST)
     async def dele(self, ctx):
-        await clear_current_cbs(self)
-        for battle_type in BattleType:
-            summary = battle_summary(self, battle_type)
-            if summary:
-                await send_long_embed(self.cache.channels.current_cbs, summary)
+        self.cb_board.forget()
+        self.cb_board_updater.mark_dirty()
+        await self.cb_board_updater.flush()
 
     @commands.command(hidden=True, **help_doc['crnumbers'])
     @role_call(STAFF_LIST)
@@ -3574,7 +3694,7 @@ class ScoreSheetBot(commands.Cog):
     @commands.command(hidden=True, **help_doc['cancelcb'])
     @role_call(STAFF_LIST)
     async def cancelcb(self, ctx, battle_id: int, *, reason: str = ''):
-        crew1, crew2, finished, link = battle_info(battle_id)
+        crew1, crew2, finished, link = await adb.battle_info(battle_id)
         embed = discord.Embed(title='Are you sure you want to cancel this crew battle?',
                               description=f'{crew1} vs {crew2}\n'
                                           f'On: {finished} [link]({link})', color=discord.Color.random())
@@ -3585,7 +3705,8 @@ class ScoreSheetBot(commands.Cog):
             await msg.delete(delay=2)
             await resp.delete(delay=5)
             return
-        link = battle_cancel(battle_id)
+        link = await adb.battle_cancel(battle_id)
+        self.cache_value.seed_rankings(await adb.league_ratings())
         split = link.split('/')
         channel_id = int(split[-2])
         message_id = int(split[-1])
@@ -3611,9 +3732,8 @@ class ScoreSheetBot(commands.Cog):
     @role_call(STAFF_LIST)
     async def stupid(self, ctx):
         # await handle_decay(self)
-        for battle in all_battle_ids():
-            print(battle)
-            battle_weight_changes(battle[0], season=True)
+        players = await adb.recompute_member_stats((20, 21, 22))
+        await ctx.send(f'Recomputed season stats for {players} players.')
         # message = []
         # for cr in self.cache.crews_by_name.values():
         #     filled = 25 if cr.current_umbra >= cr.max_umbra else 0
@@ -3648,17 +3768,18 @@ class ScoreSheetBot(commands.Cog):
     async def initalize_ratings(self, ctx):
         start = 1500
         current = 0
-        for cid in crews_by_rating():
+        for cid in await adb.crews_by_rating():
             current += 1
-            init_crew_rating(cid, start, CURRENT_LEAGUE_ID)
+            await adb.init_crew_rating(cid, start, CURRENT_LEAGUE_ID)
             print(cid, start)
+        self.cache_value.seed_rankings(await adb.league_ratings())
         # TODO set new elo for wisdom
 
     @commands.command(hidden=True, **help_doc['ofrank'])
     @role_call(STAFF_LIST)
     async def manual_battle(self, ctx,battle_id: int ):
 
-        crew1, crew2, finished, link = battle_info(battle_id)
+        crew1, crew2, finished, link = await adb.battle_info(battle_id)
         embed = discord.Embed(title='Are you sure you want to re-run this crew battle?',
                               description=f'{crew1} vs {crew2}\n'
                                           f'On: {finished} [link]({link})', color=discord.Color.random())
@@ -3669,8 +3790,9 @@ class ScoreSheetBot(commands.Cog):
             await msg.delete(delay=2)
             await resp.delete(delay=5)
             return
-        winner_elo, winner_change, loser_elo, loser_change, d_winner_change, d_final, winner_k, loser_k = battle_elo_changes(
+        winner_elo, winner_change, loser_elo, loser_change, d_winner_change, d_final, winner_k, loser_k = await adb.battle_elo_changes(
             battle_id)
+        self.cache_value.seed_rankings(await adb.league_ratings())
         w_placement = (STARTING_K - winner_k) / K_CHANGE + 1
         l_placement = (STARTING_K - loser_k) / K_CHANGE + 1
         if winner_k > DEFAULT_K:
@@ -3704,25 +3826,21 @@ class ScoreSheetBot(commands.Cog):
         else:
             actual_crew = crew_lookup(crew(ctx.author, self), self)
             await ctx.send(f'{ctx.author.display_name} is in {crew(ctx.author, self)}.')
-        left, total, unflairs = extra_slots(actual_crew)
+        left, total, unflairs = await adb.extra_slots(actual_crew)
         await ctx.send(f'{actual_crew.name} has ({left}/{total} slots) and {unflairs}/3 unflairs till a new slot.')
 
-    @commands.command(**help_doc['slots'])
+    @commands.command(hidden=True, **help_doc['update_elos'])
     @role_call(STAFF_LIST)
     @main_only
-    async def update_elos(self, ctx, *, name: str = None):
-        if name:
-            ambiguous = ambiguous_lookup(name, self)
-            if isinstance(ambiguous, discord.Member):
-                actual_crew = crew_lookup(crew(ambiguous, self), self)
-                await ctx.send(f'{ambiguous.display_name} is in {actual_crew.name}.')
-            else:
-                actual_crew = ambiguous
-        else:
-            actual_crew = crew_lookup(crew(ctx.author, self), self)
-            await ctx.send(f'{ctx.author.display_name} is in {crew(ctx.author, self)}.')
-        left, total, unflairs = extra_slots(actual_crew)
-        await ctx.send(f'{actual_crew.name} has ({left}/{total} slots) and {unflairs}/3 unflairs till a new slot.')
+    async def update_elos(self, ctx, league_id: int):
+        msg = await ctx.send(f'Are you sure you want to delete and recompute every crew rating in league {league_id}?')
+        if not await wait_for_reaction_on_message(YES, NO, msg, ctx.author, self.bot):
+            await ctx.send(f'{ctx.author.mention}: {ctx.command.name} canceled or timed out!')
+            return
+        replay = await adb.replay_league_ratings(league_id)
+        self.cache.seed_rankings(await adb.league_ratings())
+        await ctx.send(f'Replayed {len(replay.battle_ids)} battles for league {league_id}, '
+                       f'{len(replay.crew_ids)} crew ratings rewritten.')
 
     @commands.command(hidden=True, **help_doc['slottotals'])
     @role_call(STAFF_LIST)
@@ -3734,9 +3852,9 @@ class ScoreSheetBot(commands.Cog):
             print(f'{i}/{len(crews)} pt 1')
             if cr.member_count == 0:
                 continue
-            hardcap, diversity, activity = calc_hardcap(cr)
-            total, base, modifer, rollover = calc_total_slots(cr)
-            left, cur_total = slots(cr)
+            hardcap, diversity, activity = await calc_hardcap(cr)
+            total, base, modifer, rollover = await calc_total_slots(cr)
+            left, cur_total = await adb.slots(cr)
             desc.append(f'{cr.name}: This month({left}/{cur_total}) ({cr.member_count} members) \n'
                         f'Next month {total} slots: {base} base + {modifer} size mod + {rollover} rollover.')
             desc.append(f'Your new hardcap is: {hardcap} (50 + {diversity} for diversity + {activity} for activity '
@@ -3786,9 +3904,9 @@ class ScoreSheetBot(commands.Cog):
             print(f'{i}/{len(crews)} pt 1')
             if cr.member_count == 0:
                 continue
-            hardcap, diversity, activity = calc_hardcap(cr)
+            hardcap, diversity, activity = await calc_hardcap(cr)
             cr.set_hardcap(hardcap)
-            set_hardcap(cr)
+            await adb.set_hardcap(cr)
             print(cr.hardcap)
 
     @commands.command(hidden=True, **help_doc['slottotals'])
@@ -3801,16 +3919,16 @@ class ScoreSheetBot(commands.Cog):
             print(f'{i}/{len(crews)} pt 1')
             if cr.member_count == 0:
                 continue
-            hardcap, diversity, activity = calc_hardcap(cr)
-            total, base, modifer, rollover = calc_total_slots(cr)
-            left, cur_total = slots(cr)
+            hardcap, diversity, activity = await calc_hardcap(cr)
+            total, base, modifer, rollover = await calc_total_slots(cr)
+            left, cur_total = await adb.slots(cr)
             desc.append(f'{cr.name}: This month({left}/{cur_total}) \n'
                         f'Next month {total} slots: {base} base + {modifer} size mod  + {rollover} rollover.')
             desc.append(f'Your new hardcap is: {hardcap} (50 + {diversity} for diversity + {activity} for activity '
                         f'+ {len(cr.crew_staff)} crew staff don\'t count) ')
             cr.set_hardcap(hardcap)
-            set_hardcap(cr)
-            total_slot_set(cr, total)
+            await adb.set_hardcap(cr)
+            await adb.total_slot_set(cr, total)
             message = f'{cr.name} has {total} flairing slots this month:\n' \
                       f'{base} base slots\n' \
                       f'{modifer} from size modifier\n' \
@@ -3855,13 +3973,13 @@ class ScoreSheetBot(commands.Cog):
         for i, mem in enumerate(members):
             tuples.append((mem.id, mem.display_name))
             print(f'{i + 1}/{len(members)}')
-        record_nicknames(tuples)
+        await adb.record_nicknames(tuples)
 
     @commands.command(hidden=True, **help_doc['flaircounts'])
     @role_call(STAFF_LIST)
     async def flaircounts(self, ctx, long: Optional[str]):
         crews = list(self.cache.crews_by_name.values())
-        flairs = crew_flairs()
+        flairs = await adb.crew_flairs()
         flair_list = []
         for cr in crews:
             if cr.name in flairs:
@@ -3968,9 +4086,16 @@ async def main():
     bot = commands.Bot(command_prefix=os.getenv('PREFIX'), intents=discord.Intents.all(), case_insensitive=True,
                        allowed_mentions=discord.AllowedMentions(everyone=False))
     bot.remove_command('help')
+    open_pool()
+    migrate()
     cache = src.cache.Cache()
+    if cache.load_snapshot():
+        logging.info(f'Loaded {len(cache.crews_by_name)} crews from the cache snapshot.')
+    cache.gambit.seed(*live_gambit_state())
 
     await bot.add_cog(ScoreSheetBot(bot, cache))
+    if METRICS_PORT:
+        await profiler.serve_metrics(METRICS_PORT)
     await bot.start(token)
 
 
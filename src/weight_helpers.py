@@ -0,0 +1,50 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Sequence, Tuple
+
+# p1, p2, p1_taken, p2_taken as stored in the match table
+Match = Tuple[int, int, int, int]
+
+
+@dataclass
+class MemberStats:
+    weighted_taken: float = 0
+    taken: int = 0
+    lost: int = 0
+    played: int = 0
+
+
+def weight(weighted_taken: float, lost: int) -> float:
+    return max(weighted_taken, 1) / max(lost, 1)
+
+
+def weight_changes(matches: Iterable[Match], weights: Dict[int, float], reverse: bool = False) -> Dict[
+        int, MemberStats]:
+    """What one battle adds to each player's stats, every stock taken counts for the opponent's weight from before
+    the battle. `played` is left at 0, callers add it since reversing a battle does not undo it."""
+    sign = -1 if reverse else 1
+    changes = defaultdict(MemberStats)
+    for p1, p2, p1_taken, p2_taken in matches:
+        first, second = changes[p1], changes[p2]
+        first.taken += sign * p1_taken
+        second.taken += sign * p2_taken
+        first.weighted_taken += sign * p1_taken * weights[p2]
+        first.lost += sign * p2_taken
+        second.weighted_taken += sign * p2_taken * weights[p1]
+        second.lost += sign * p1_taken
+    return dict(changes)
+
+
+def replay_weights(battles: Iterable[Sequence[Match]]) -> Dict[int, MemberStats]:
+    """Every player's stats after applying the battles in order, starting from empty stats."""
+    stats = defaultdict(MemberStats)
+    for matches in battles:
+        players = {player for match in matches for player in match[:2]}
+        weights = {player: weight(stats[player].weighted_taken, stats[player].lost) for player in players}
+        for player, change in weight_changes(matches, weights).items():
+            total = stats[player]
+            total.weighted_taken += change.weighted_taken
+            total.taken += change.taken
+            total.lost += change.lost
+            total.played += 1
+    return dict(stats)
@@ -0,0 +1,213 @@
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime
+
+import discord
+
+from src.cache import Cache
+from src.constants import LEADER, ADVISOR, OVERFLOW_ROLE
+from src.crew import Crew
+
+
+class FakeRole:
+    def __init__(self, role_id: int, name: str, guild: 'FakeGuild'):
+        self.id = role_id
+        self.name = name
+        self.guild = guild
+        self.color = discord.Color.default()
+        self.position = role_id
+
+
+class FakeMember:
+    def __init__(self, member_id: int, name: str, guild: 'FakeGuild', roles, display_name: str = None):
+        self.id = member_id
+        self.name = name
+        self.display_name = display_name or name
+        self.guild = guild
+        self.roles = list(roles)
+
+    def __str__(self):
+        return self.name
+
+    def copy(self) -> 'FakeMember':
+        return FakeMember(self.id, self.name, self.guild, self.roles, self.display_name)
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+        self.roles = []
+        self._members = {}
+
+    @property
+    def members(self):
+        return list(self._members.values())
+
+    def get_member(self, member_id: int):
+        return self._members.get(member_id)
+
+    def add_role(self, role_id: int, name: str) -> FakeRole:
+        role = FakeRole(role_id, name, self)
+        self.roles.append(role)
+        return role
+
+    def add_member(self, member_id: int, name: str, *roles, display_name: str = None) -> FakeMember:
+        member = FakeMember(member_id, name, self, roles, display_name)
+        self._members[member_id] = member
+        return member
+
+
+def make_cache(main: FakeGuild, overflow: FakeGuild) -> Cache:
+    cache = Cache()
+    cache.scs = main
+    cache.overflow_server = overflow
+    cache.crews_by_name = {name: Crew(name=name, abbr=name[:3]) for name in ('Alpha', 'Beta', 'Gamma')}
+    cache.crews = cache.crews_by_name.keys()
+    cache.crew_populate()
+    cache.built = True
+    return cache
+
+
+def state(cache: Cache):
+    return (cache._index_snapshot(), cache.crew_member_ids,
+            {name: (sorted(cr.leaders), sorted(cr.advisors), cr.member_count)
+             for name, cr in cache.crews_by_name.items()})
+
+
+class IncrementalCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.main = FakeGuild(1)
+        self.overflow = FakeGuild(2)
+        self.alpha = self.main.add_role(10, 'Alpha')
+        self.beta = self.main.add_role(11, 'Beta')
+        self.leader = self.main.add_role(12, LEADER)
+        self.advisor = self.main.add_role(13, ADVISOR)
+        self.overflow_role = self.main.add_role(14, OVERFLOW_ROLE)
+        self.gamma = self.overflow.add_role(20, 'Gamma')
+        self.main.add_member(100, 'ann', self.alpha, self.leader)
+        self.main.add_member(101, 'bob', self.alpha, display_name='bobby')
+        self.main.add_member(102, 'cat', self.beta, self.advisor)
+        self.main.add_member(103, 'dan', self.overflow_role)
+        self.overflow.add_member(103, 'dan', self.gamma)
+        self.cache = make_cache(self.main, self.overflow)
+
+    def assertMatchesRebuild(self):
+        self.assertEqual(state(make_cache(self.main, self.overflow)), state(self.cache))
+        self.assertEqual(list(self.cache.main_members), list(self.cache.member_index))
+
+    def test_initial_indexes(self):
+        self.assertEqual({100: 'Alpha', 101: 'Alpha', 102: 'Beta', 103: 'Gamma'}, self.cache.member_crews)
+        self.assertEqual({100, 101}, self.cache.role_members[self.alpha.id])
+        self.assertEqual(['ann'], self.cache.crews_by_name['Alpha'].leaders)
+        self.assertIs(self.main.get_member(101), self.cache.main_members['bobby'])
+
+    def test_member_changes_crew(self):
+        before = self.main.get_member(100)
+        after = before.copy()
+        after.roles = [self.beta, self.leader]
+        self.main._members[100] = after
+        self.cache.member_updated(before, after)
+        self.assertEqual('Beta', self.cache.member_crews[100])
+        self.assertEqual([], self.cache.crews_by_name['Alpha'].leaders)
+        self.assertMatchesRebuild()
+
+    def test_nickname_change(self):
+        before = self.main.get_member(101)
+        after = before.copy()
+        after.display_name = 'robert'
+        self.main._members[101] = after
+        self.cache.member_updated(before, after)
+        self.assertNotIn('bobby', self.cache.main_members)
+        self.assertMatchesRebuild()
+
+    def test_join_and_leave(self):
+        self.cache.member_joined(self.main.add_member(104, 'eve', self.beta))
+        self.assertEqual('Beta', self.cache.member_crews[104])
+        left = self.main._members.pop(102)
+        self.cache.member_left(left)
+        self.assertNotIn(102, self.cache.member_crews)
+        self.assertMatchesRebuild()
+
+    def test_overflow_roles_move_main_member(self):
+        before = self.overflow.get_member(103)
+        after = before.copy()
+        after.roles = []
+        self.overflow._members[103] = after
+        self.cache.member_updated(before, after)
+        self.assertNotIn(103, self.cache.member_crews)
+        self.assertMatchesRebuild()
+
+    def test_crew_role_deleted(self):
+        self.main.roles.remove(self.beta)
+        for member in self.main.members:
+            member.roles = [role for role in member.roles if role is not self.beta]
+        self.cache.role_deleted(self.beta)
+        self.assertNotIn(102, self.cache.member_crews)
+        self.assertMatchesRebuild()
+
+    def test_role_queries(self):
+        self.assertEqual({100, 101}, self.cache.role_member_ids('Alpha'))
+        self.assertEqual({103}, self.cache.crew_role_member_ids(self.overflow))
+        self.assertEqual({103}, self.cache.crew_member_ids['Gamma'])
+        leaders_on_alpha = self.cache.crew_member_ids['Alpha'] & self.cache.role_member_ids(LEADER)
+        self.assertEqual([self.main.get_member(100)], self.cache.members_from_ids(leaders_on_alpha))
+
+    def test_members_from_ids_skips_departed(self):
+        self.main._members.pop(101)
+        self.assertEqual([100], [member.id for member in self.cache.members_from_ids({100, 101})])
+
+    def test_drift_reported(self):
+        self.main.add_member(105, 'fay', self.alpha)
+        before = self.cache._index_snapshot()
+        self.cache.crew_populate()
+        drift = Cache._drift(before, self.cache._index_snapshot())
+        self.assertEqual(1, drift['member_crews'])
+        self.assertEqual(1, drift['names'])
+
+
+class CacheSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'cache.json')
+        self.cache = Cache()
+        self.cache.current_league_id = 7
+        alpha = Crew(name='Alpha', abbr='ALP', leaders=['ann'], color=discord.Color(0x123456),
+                     last_match=datetime(2021, 5, 1, 12, 30), decay_level=2, remaining_slots=3)
+        alpha.ranking_string = '3/40'
+        alpha.destiny_rank = 4
+        self.cache._set_crews({'Alpha': alpha, 'Beta': Crew(name='Beta', abbr='BET')})
+
+    def test_round_trip(self):
+        self.cache.save_snapshot(self.cache.snapshot_data(), self.path)
+        loaded = Cache()
+        self.assertTrue(loaded.load_snapshot(self.path))
+        self.assertEqual(7, loaded.current_league_id)
+        self.assertEqual(self.cache.crews_by_name, loaded.crews_by_name)
+        alpha = loaded.crews_by_tag['alp']
+        self.assertEqual(('3/40', 4), (alpha.ranking_string, alpha.destiny_rank))
+        self.assertEqual(('Beta', 100), loaded.crew_index.extract_one('beta'))
+
+    def test_stale_or_missing_snapshot_ignored(self):
+        loaded = Cache()
+        self.assertFalse(loaded.load_snapshot(self.path))
+        data = self.cache.snapshot_data()
+        data['saved_at'] = time.time() - 3600
+        self.cache.save_snapshot(data, self.path)
+        self.assertFalse(loaded.load_snapshot(self.path, max_age=60))
+        self.assertEqual({}, loaded.crews_by_name)
+
+    def test_corrupt_snapshot_ignored(self):
+        with open(self.path, 'w') as snapshot:
+            snapshot.write('{"saved_at": ')
+        self.assertFalse(Cache().load_snapshot(self.path))
+        data = self.cache.snapshot_data()
+        data['crews'][0]['removed_field'] = 1
+        self.cache.save_snapshot(data, self.path)
+        self.assertFalse(Cache().load_snapshot(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import asyncio
+import types
+import unittest
+
+import discord
+
+from src.battle import BattleType
+from src.cb_board import CbBoard, embed_hash
+
+ME = types.SimpleNamespace(id=1)
+
+
+class FakeMessage:
+    def __init__(self, channel, embed, author=ME):
+        self.channel = channel
+        self.embed = embed
+        self.author = author
+        self.edits = 0
+
+    async def edit(self, content=None, embed=None):
+        self.embed = embed
+        self.edits += 1
+
+    async def delete(self):
+        self.channel.messages.remove(self)
+
+
+class FakeChannel:
+    def __init__(self):
+        self.guild = types.SimpleNamespace(me=ME)
+        self.messages = []
+
+    async def send(self, embed=None):
+        message = FakeMessage(self, embed)
+        self.messages.append(message)
+        return message
+
+    async def history(self, limit=None, oldest_first=False):
+        for message in list(self.messages)[:limit]:
+            yield message
+
+
+def summary(title, *fields):
+    embed = discord.Embed(title=title, color=discord.Color.random())
+    for name in fields:
+        embed.add_field(name=name, value='3-3', inline=False)
+    return [embed]
+
+
+class CbBoardTest(unittest.TestCase):
+    def setUp(self):
+        self.channel = FakeChannel()
+        self.shown = {}
+        self.board = CbBoard(lambda: self.channel, lambda battle_type: self.shown.get(battle_type, []))
+
+    def titles(self):
+        return [message.embed.title for message in self.channel.messages]
+
+    def test_edits_only_changed_types(self):
+        async def main():
+            self.shown = {BattleType.MOCK: summary('Mock', 'A vs B'), BattleType.RANKED: summary('Ranked', 'C vs D')}
+            await self.board.refresh()
+            mock, ranked = self.board.messages[BattleType.MOCK][0], self.board.messages[BattleType.RANKED][0]
+            self.shown[BattleType.MOCK] = summary('Mock', 'A vs B', 'E vs F')
+            # Only the color changed
+            self.shown[BattleType.RANKED] = summary('Ranked', 'C vs D')
+            await self.board.refresh()
+            return mock, ranked
+
+        mock, ranked = asyncio.run(main())
+        self.assertEqual(['Mock', 'Ranked'], sorted(self.titles()))
+        self.assertEqual((1, 0), (mock.edits, ranked.edits))
+        self.assertEqual((2, 1, 0), (self.board.sends, self.board.edits, self.board.deletes))
+
+    def test_empty_type_deleted_and_own_messages_reused(self):
+        async def main():
+            stranger = FakeMessage(self.channel, discord.Embed(title='Pinned'), types.SimpleNamespace(id=2))
+            self.channel.messages = [stranger, FakeMessage(self.channel, discord.Embed(title='Old')),
+                                     FakeMessage(self.channel, discord.Embed(title='Older'))]
+            self.shown = {BattleType.MOCK: summary('Mock', 'A vs B')}
+            await self.board.refresh()
+            self.assertEqual(['Pinned', 'Mock'], self.titles())
+            self.shown = {}
+            await self.board.refresh()
+
+        asyncio.run(main())
+        self.assertEqual(['Pinned'], self.titles())
+        self.assertEqual((0, 1, 2), (self.board.sends, self.board.edits, self.board.deletes))
+
+    def test_hash_ignores_color(self):
+        self.assertEqual(embed_hash(summary('Mock', 'A vs B')[0]), embed_hash(summary('Mock', 'A vs B')[0]))
+        self.assertNotEqual(embed_hash(summary('Mock', 'A vs B')[0]), embed_hash(summary('Mock', 'A vs C')[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+
+from src.coalesce import CoalescingUpdater
+
+
+class CoalescingUpdaterTest(unittest.TestCase):
+    def setUp(self):
+        self.seen = []
+        self.state = 0
+
+    async def refresh(self):
+        self.seen.append(self.state)
+
+    def test_burst_coalesces_to_latest(self):
+        async def main():
+            updater = CoalescingUpdater(self.refresh, .05)
+            for state in range(1, 21):
+                self.state = state
+                updater.mark_dirty()
+                await asyncio.sleep(.001)
+            await asyncio.sleep(.12)
+            return updater
+
+        updater = asyncio.run(main())
+        self.assertEqual(20, self.seen[-1])
+        self.assertLessEqual(len(self.seen), 3)
+        self.assertEqual(len(self.seen), updater.refreshes)
+        self.assertFalse(updater.dirty)
+
+    def test_flush_and_cancel(self):
+        async def main():
+            updater = CoalescingUpdater(self.refresh, 10)
+            self.state = 1
+            updater.mark_dirty()
+            await asyncio.sleep(0)
+            self.state = 2
+            updater.mark_dirty()
+            await updater.flush()
+            self.state = 3
+            updater.mark_dirty()
+            updater.cancel()
+            await asyncio.sleep(.01)
+            await updater.flush()
+
+        asyncio.run(main())
+        self.assertEqual([1, 2], self.seen)
+
+    def test_failed_refresh_does_not_stop_later_ones(self):
+        calls = []
+
+        async def flaky():
+            calls.append(len(calls))
+            if len(calls) == 1:
+                raise RuntimeError('edit failed')
+
+        async def main():
+            updater = CoalescingUpdater(flaky, .01)
+            updater.mark_dirty()
+            await asyncio.sleep(.005)
+            updater.mark_dirty()
+            await asyncio.sleep(.05)
+
+        with self.assertLogs(level='ERROR'):
+            asyncio.run(main())
+        self.assertEqual([0, 1], calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from src import command_cache
+from src.command_cache import CommandCache
+
+
+class FakeDb:
+    def __init__(self):
+        self.channels = [1, 2]
+        self.commands = {'battle': False, 'gamble': True}
+        self.reads = 0
+        self.flushed = []
+        self.fail_flush = False
+
+    async def disabled_channels(self):
+        self.reads += 1
+        return list(self.channels)
+
+    async def command_activations(self):
+        self.reads += 1
+        return dict(self.commands)
+
+    async def add_disabled_channel(self, channel_id):
+        self.channels.append(channel_id)
+
+    async def remove_disabled_channel(self, channel_id):
+        self.channels.remove(channel_id)
+
+    async def set_command_activation(self, command_name, deactivated):
+        self.commands[command_name] = deactivated
+
+    async def add_command_uses(self, counts):
+        if self.fail_flush:
+            raise ConnectionError('db down')
+        self.flushed.append(dict(counts))
+
+
+class CommandCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.db = FakeDb()
+        patcher = mock.patch.object(command_cache, 'adb', self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lookups_share_one_load(self):
+        async def main():
+            cache = CommandCache(ttl=60)
+            self.assertTrue(await cache.channel_disabled(1))
+            self.assertFalse(await cache.channel_disabled(3))
+            self.assertTrue(await cache.command_deactivated('gamble'))
+            self.assertFalse(await cache.command_deactivated('never_used'))
+
+        asyncio.run(main())
+        self.assertEqual(2, self.db.reads)
+
+    def test_reloads_after_ttl(self):
+        async def main():
+            cache = CommandCache(ttl=0)
+            await cache.channel_disabled(1)
+            await cache.channel_disabled(1)
+
+        asyncio.run(main())
+        self.assertEqual(4, self.db.reads)
+
+    def test_changes_update_cache(self):
+        async def main():
+            cache = CommandCache(ttl=60)
+            await cache.set_channel_disabled(3, True)
+            await cache.set_channel_disabled(1, False)
+            await cache.set_command_deactivated('battle', True)
+            return await cache.channel_disabled(3), await cache.channel_disabled(1), \
+                await cache.command_deactivated('battle')
+
+        self.assertEqual((True, False, True), asyncio.run(main()))
+        self.assertEqual([2, 3], self.db.channels)
+
+    def test_usage_batched(self):
+        async def main():
+            cache = CommandCache()
+            for name in ('battle', 'battle', 'rankings'):
+                cache.record_use(name)
+            await cache.flush_usage()
+            await cache.flush_usage()
+
+        asyncio.run(main())
+        self.assertEqual([{'battle': 2, 'rankings': 1}], self.db.flushed)
+
+    def test_failed_flush_keeps_counts(self):
+        self.db.fail_flush = True
+
+        async def main():
+            cache = CommandCache()
+            cache.record_use('battle')
+            with self.assertRaises(ConnectionError):
+                await cache.flush_usage()
+            cache.record_use('battle')
+            return cache.usage['battle']
+
+        self.assertEqual(2, asyncio.run(main()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import asyncio
+import time
+import unittest
+
+from src.command_profiler import DB, HTTP, OTHER, RENDER, CommandProfiler, check_passed, phase
+from src.db_async import AsyncDb
+from src.db_stats import DbStats
+
+
+class FakeHttp:
+    async def request(self, route):
+        await asyncio.sleep(.01)
+        return route
+
+
+class CommandProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.profiler = CommandProfiler()
+
+    def test_invocation_split_into_parts(self):
+        stats = DbStats()
+        http = FakeHttp()
+        self.profiler.instrument_http(http)
+
+        @stats.instrument
+        def query():
+            time.sleep(.01)
+
+        async def command():
+            self.profiler.start('rankings')
+            check_passed('role_call', time.perf_counter())
+            adb = AsyncDb(1)
+            try:
+                await adb.run(query)
+            finally:
+                adb.shutdown()
+            self.assertEqual('channel', await http.request('channel'))
+            await http.request('message')
+            with phase(RENDER):
+                time.sleep(.005)
+            return self.profiler.finish()
+
+        invocation = asyncio.run(command())
+        self.assertEqual(2, invocation.api_calls)
+        self.assertIn('role_call', invocation.checks)
+        self.assertGreaterEqual(invocation.phases[DB], .01)
+        self.assertGreaterEqual(invocation.phases[HTTP], .02)
+        self.assertGreaterEqual(invocation.phases[RENDER], .005)
+        self.assertGreaterEqual(invocation.phases[OTHER], 0)
+        profile = self.profiler.commands['rankings']
+        self.assertEqual((1, 2), (profile.calls, profile.api_calls))
+
+    def test_parts_outside_a_command_ignored(self):
+        http = FakeHttp()
+        self.profiler.instrument_http(http)
+        asyncio.run(http.request('gateway'))
+        check_passed('role_call', time.perf_counter())
+        self.assertIsNone(self.profiler.finish())
+        self.assertEqual({}, self.profiler.commands)
+
+    def test_percentiles_and_metrics(self):
+        async def command(name, failed=False):
+            self.profiler.start(name)
+            return self.profiler.finish(failed)
+
+        for _ in range(19):
+            asyncio.run(command('rankings'))
+        asyncio.run(command('rankings', failed=True))
+        profile = self.profiler.commands['rankings']
+        profile.recent[-1] = (profile.recent[-1][0], 3.0)
+        self.assertEqual(3.0, profile.percentile(.99))
+        self.assertLess(profile.percentile(.5), 1)
+        self.assertIsNone(profile.percentile(.5, since=time.time() + 60))
+        metrics = self.profiler.metrics()
+        self.assertIn('scs_command_seconds_count{command="rankings"} 20', metrics)
+        self.assertIn('scs_command_seconds_bucket{command="rankings",le="+Inf"} 20', metrics)
+        self.assertIn('scs_command_errors_total{command="rankings"} 1', metrics)
+        self.assertIn('rankings', self.profiler.report())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from src.crew_docs import CrewDocsLoader, crews_from_rows
+
+ROWS = [['Holy Knights', 'HK', 'https://discord.gg/abc https://twitter.com/hk', 'icon.png'],
+        ['Ronin', 'RON']]
+
+
+class FakeLoader(CrewDocsLoader):
+    def __init__(self, snapshot_path: str, timeout: float = 1):
+        super().__init__(snapshot_path, timeout)
+        self.rows = ROWS
+        self.error = None
+        self.delay = 0
+        self.fetches = 0
+
+    def fetch(self):
+        self.fetches += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [list(row) for row in self.rows]
+
+
+class CrewDocsTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'crew_docs.json')
+
+    def test_rows_parsed(self):
+        crews = crews_from_rows(ROWS)
+        self.assertEqual(['Holy Knights', 'Ronin'], list(crews))
+        self.assertEqual('[Discord](https://discord.gg/abc) [Twitter](https://twitter.com/hk)',
+                         crews['Holy Knights'].social)
+        self.assertEqual(('RON', '', ''), (crews['Ronin'].abbr, crews['Ronin'].social, crews['Ronin'].icon))
+
+    def test_unchanged_rows_reported(self):
+        async def main():
+            loader = FakeLoader(self.path)
+            _, first = await loader.load()
+            _, second = await loader.load()
+            loader.rows = ROWS[:1]
+            _, third = await loader.load()
+            return first, second, third
+
+        self.assertEqual((True, False, True), asyncio.run(main()))
+
+    def test_snapshot_used_when_api_fails(self):
+        async def main():
+            await FakeLoader(self.path).load()
+            loader = FakeLoader(self.path)
+            loader.error = ConnectionError('sheets down')
+            values, changed = await loader.load()
+            return values, changed, loader.from_snapshot
+
+        self.assertEqual((ROWS, True, True), asyncio.run(main()))
+
+    def test_snapshot_used_when_api_slow(self):
+        async def main():
+            await FakeLoader(self.path).load()
+            loader = FakeLoader(self.path, timeout=0.05)
+            loader.delay = 0.3
+            values, _ = await loader.load()
+            again, _ = await loader.load()
+            return values, again, loader.fetches
+
+        values, again, fetches = asyncio.run(main())
+        self.assertEqual(ROWS, values)
+        self.assertEqual(ROWS, again)
+        self.assertEqual(1, fetches)
+
+    def test_no_snapshot_raises(self):
+        loader = FakeLoader(self.path)
+        loader.error = ConnectionError('sheets down')
+        with self.assertRaises(ConnectionError):
+            asyncio.run(loader.load())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import asyncio
+import contextvars
+import threading
+import unittest
+
+from src.db_async import AsyncDb
+
+current_command = contextvars.ContextVar('current_command', default=None)
+
+
+class AsyncDbTest(unittest.TestCase):
+    def setUp(self):
+        self.adb = AsyncDb(2)
+
+    def tearDown(self):
+        self.adb.shutdown()
+
+    def test_runs_off_the_event_loop_thread(self):
+        async def main():
+            return await self.adb.run(threading.get_ident)
+
+        self.assertNotEqual(threading.get_ident(), asyncio.run(main()))
+
+    def test_context_is_carried_into_worker(self):
+        async def main():
+            current_command.set('rankings')
+            return await self.adb.run(current_command.get)
+
+        self.assertEqual('rankings', asyncio.run(main()))
+
+    def test_timings_recorded(self):
+        def add(a, b):
+            return a + b
+
+        async def main():
+            return await self.adb.run(add, 1, b=2)
+
+        self.assertEqual(3, asyncio.run(main()))
+        self.assertEqual(1, self.adb.timings['add'].calls)
+
+    def test_errors_propagate(self):
+        def fail():
+            raise ValueError('bad')
+
+        with self.assertRaises(ValueError):
+            asyncio.run(self.adb.run(fail))
+        self.assertEqual(1, self.adb.timings['fail'].calls)
+
+    def test_unknown_helper(self):
+        with self.assertRaises(AttributeError):
+            self.adb.not_a_db_helper
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+
+from src.constants import MIGRATIONS_DIR
+from src.db_migrate import Migration, discover, pending
+
+
+class DbMigrateTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, file_name: str, sql: str = 'select 1;'):
+        with open(os.path.join(self.directory.name, file_name), 'w') as f:
+            f.write(sql)
+
+    def test_discover_orders_by_version(self):
+        self.write('010_later.sql')
+        self.write('002_second.sql', 'create table second ();')
+        self.write('001_first.sql')
+        self.write('notes.md')
+        self.write('003_draft.sql.bak')
+        migrations = discover(self.directory.name)
+        self.assertEqual([(1, 'first'), (2, 'second'), (10, 'later')],
+                         [(migration.version, migration.name) for migration in migrations])
+        self.assertEqual('create table second ();', migrations[1].sql())
+
+    def test_duplicate_versions_rejected(self):
+        self.write('001_first.sql')
+        self.write('1_also_first.sql')
+        with self.assertRaises(ValueError):
+            discover(self.directory.name)
+
+    def test_pending_skips_applied(self):
+        migrations = [Migration(1, 'a', 'a.sql'), Migration(2, 'b', 'b.sql'), Migration(3, 'c', 'c.sql')]
+        self.assertEqual([migrations[1]], pending(migrations, {1, 3}))
+
+    def test_repository_migrations_discoverable(self):
+        versions = [migration.version for migration in discover(MIGRATIONS_DIR)]
+        self.assertEqual(list(range(1, len(versions) + 1)), versions)
+
+
+if __name__ == '__main__':
+    unittest.main()
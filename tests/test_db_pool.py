@@ -0,0 +1,87 @@
+import threading
+import time
+import unittest
+
+import psycopg2.extensions
+
+from src.db_pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.made = []
+
+        def connect():
+            conn = FakeConnection()
+            self.made.append(conn)
+            return conn
+
+        self.pool = ConnectionPool(connect, min_size=1, max_size=2, timeout=0.05)
+
+    def test_open_fills_min_size(self):
+        self.pool.open()
+        self.assertEqual(1, len(self.made))
+        self.assertEqual(1, self.pool.snapshot()['idle'])
+
+    def test_connections_are_reused(self):
+        for _ in range(5):
+            with self.pool.connection():
+                pass
+        self.assertEqual(1, len(self.made))
+        self.assertEqual(5, self.pool.stats.checkouts)
+
+    def test_open_transaction_rolled_back(self):
+        conn = self.pool.getconn()
+        conn.status = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+        self.pool.putconn(conn)
+        self.assertEqual(1, conn.rollbacks)
+        self.assertIs(conn, self.pool.getconn())
+
+    def test_closed_connection_discarded(self):
+        conn = self.pool.getconn()
+        conn.close()
+        self.pool.putconn(conn)
+        self.assertEqual(1, self.pool.stats.discarded)
+        self.assertIsNot(conn, self.pool.getconn())
+
+    def test_timeout_when_exhausted(self):
+        self.pool.getconn()
+        self.pool.getconn()
+        with self.assertRaises(PoolTimeout):
+            self.pool.getconn()
+        self.assertEqual(1, self.pool.stats.timeouts)
+
+    def test_waiter_gets_released_connection(self):
+        self.pool.timeout = 5
+        first = self.pool.getconn()
+        self.pool.getconn()
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(self.pool.getconn()))
+        waiter.start()
+        time.sleep(0.1)
+        self.pool.putconn(first)
+        waiter.join(5)
+        self.assertEqual([first], got)
+        self.assertEqual(1, self.pool.stats.waits)
+        self.assertEqual(2, len(self.made))
+
+
+if __name__ == '__main__':
+    unittest.main()
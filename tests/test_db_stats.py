@@ -0,0 +1,92 @@
+import asyncio
+import time
+import unittest
+
+from src.db_async import AsyncDb
+from src.db_stats import DbStats, current_command, note_acquire
+
+
+class DbStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.stats = DbStats(slow_ms=20, slow_log_size=2)
+
+    def test_nested_calls_count_toward_outer(self):
+        @self.stats.instrument
+        def inner():
+            note_acquire(.5)
+            return 1
+
+        @self.stats.instrument
+        def outer():
+            return inner() + inner()
+
+        self.assertEqual(2, outer())
+        self.assertEqual(['outer'], list(self.stats.functions))
+        self.assertEqual(1.0, self.stats.functions['outer'].acquire_seconds)
+        self.assertEqual(1, inner())
+        self.assertEqual(1, self.stats.functions['inner'].calls)
+
+    def test_errors_counted_and_raised(self):
+        @self.stats.instrument
+        def broken():
+            raise ValueError('bad')
+
+        with self.assertRaises(ValueError):
+            broken()
+        self.assertEqual((1, 1), (self.stats.functions['broken'].calls, self.stats.functions['broken'].errors))
+
+    def test_slow_log_keeps_latest_with_command(self):
+        @self.stats.instrument
+        def slow(seconds):
+            time.sleep(seconds)
+
+        async def command():
+            current_command.set('rankings')
+            adb = AsyncDb(1)
+            try:
+                for _ in range(3):
+                    await adb.run(slow, .025)
+                await adb.run(slow, 0)
+            finally:
+                adb.shutdown()
+
+        asyncio.run(command())
+        self.assertEqual(4, self.stats.functions['slow'].calls)
+        self.assertEqual(2, len(self.stats.slow))
+        self.assertEqual({'rankings'}, {call.command for call in self.stats.slow})
+        self.assertIn('rankings', self.stats.commands)
+
+    def test_percentile_from_histogram(self):
+        @self.stats.instrument
+        def query():
+            pass
+
+        for _ in range(99):
+            query()
+        self.stats.functions['query'].buckets[-1] += 1
+        self.stats.functions['query'].calls += 1
+        self.stats.functions['query'].max_seconds = 9
+        self.assertEqual(1.0, self.stats.functions['query'].percentile_ms(.95))
+        self.assertEqual(9000, self.stats.functions['query'].percentile_ms(1))
+
+    def test_instrument_module_wraps_public_functions(self):
+        def crew_record():
+            pass
+
+        namespace = {'crew_record': crew_record, '_cursor_helper': crew_record, 'logfile': crew_record,
+                     'time': time}
+        self.stats.instrument_module(namespace, __name__, exclude={'logfile'})
+        self.assertIs(crew_record, namespace['crew_record'].__wrapped__)
+        self.assertIs(crew_record, namespace['_cursor_helper'])
+        self.assertIs(crew_record, namespace['logfile'])
+        namespace['crew_record']()
+        report = self.stats.report(pool={'in_use': 1, 'max_size': 10, 'waits': 0, 'timeouts': 0,
+                                         'avg_acquire_ms': .2})
+        report = self.stats.report(pool={'in_use': 1, 'max_size': 10, 'waits': 0, 'timeouts': 0,
+                                         'avg_acquire_ms': .2})
+        self.assertIn('crew_record', report)
+        self.assertIn('pool 1/10 in use', report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import datetime
+import random
+import unittest
+
+from src.constants import DEFAULT_K, K_CHANGE, STARTING_K, STARTING_RATING, FAKE_CREW_ID
+from src.elo_helpers import EloPlayer, rating_update
+from src.elo_replay import ReplayBattle, replay_elo
+
+
+def battle_by_battle(battles, k_reset_at=None):
+    """battle_elo_changes run once per battle against dicts standing in for crew_ratings and battle_ratings, with
+    reset_fake_crew_rating before failed registration battles and reset_k once the season is two weeks old."""
+    crew_ratings, battle_ratings, ks = {}, [], []
+    for battle in battles:
+        if k_reset_at and battle.finished >= k_reset_at:
+            for crew_id, (rating, _) in crew_ratings.items():
+                crew_ratings[crew_id] = rating, DEFAULT_K
+            k_reset_at = None
+        if FAKE_CREW_ID in (battle.winner, battle.loser) and FAKE_CREW_ID in crew_ratings:
+            crew_ratings[FAKE_CREW_ID] = STARTING_RATING, crew_ratings[FAKE_CREW_ID][1]
+        winner_elo, winner_k = crew_ratings.setdefault(battle.winner, (STARTING_RATING, STARTING_K))
+        loser_elo, loser_k = crew_ratings.setdefault(battle.loser, (STARTING_RATING, STARTING_K))
+        winner_change, loser_change = rating_update(EloPlayer(battle.winner, winner_elo, winner_k),
+                                                    EloPlayer(battle.loser, loser_elo, DEFAULT_K), 1)
+        battle_ratings.append((battle.battle_id, battle.winner, winner_elo, winner_elo + winner_change))
+        battle_ratings.append((battle.battle_id, battle.loser, loser_elo, loser_elo + loser_change))
+        ks.append([winner_k, loser_k])
+        if battle.forfeit:
+            crew_ratings[battle.winner] = winner_elo + winner_change, winner_k
+            crew_ratings[battle.loser] = loser_elo + loser_change, loser_k
+        else:
+            crew_ratings[battle.winner] = winner_elo + winner_change, max(winner_k - K_CHANGE, DEFAULT_K)
+            crew_ratings[battle.loser] = loser_elo + loser_change, max(loser_k - K_CHANGE, DEFAULT_K)
+    return crew_ratings, battle_ratings, ks
+
+
+def random_battles(rng: random.Random, count: int):
+    start = datetime.datetime(2024, 1, 1)
+    battles = []
+    for battle_id in range(count):
+        crews = rng.sample(list(range(30)) + [FAKE_CREW_ID], 2)
+        battles.append(ReplayBattle(battle_id, crews[0], crews[1], rng.random() < 0.1,
+                                    start + datetime.timedelta(hours=battle_id)))
+    return battles
+
+
+class EloReplayTest(unittest.TestCase):
+    def test_matches_battle_by_battle(self):
+        battles = random_battles(random.Random(13), 500)
+        k_reset_at = datetime.datetime(2024, 1, 8)
+        crew_ratings, battle_ratings, ks = battle_by_battle(battles, k_reset_at)
+        replay = replay_elo(battles, pinned={FAKE_CREW_ID: STARTING_RATING}, k_reset_at=k_reset_at)
+        self.assertEqual(crew_ratings, replay.crew_ratings())
+        self.assertEqual(battle_ratings, list(replay.battle_ratings()))
+        self.assertEqual(ks, replay.ks.tolist())
+
+    def test_initial_ratings_used(self):
+        replay = replay_elo([ReplayBattle(1, 1, 2)], initial={1: (1600, DEFAULT_K), 3: (1400, STARTING_K)})
+        ratings = replay.crew_ratings()
+        self.assertEqual(1400, ratings[3][0])
+        self.assertEqual((1600, DEFAULT_K), (replay.before[0][0], ratings[1][1]))
+        self.assertEqual([[replay.after[0][0] - 1600, replay.after[0][1] - STARTING_RATING]],
+                         replay.changes().tolist())
+
+    def test_forfeit_keeps_k(self):
+        replay = replay_elo([ReplayBattle(1, 1, 2, forfeit=True), ReplayBattle(2, 1, 2)])
+        self.assertEqual([[STARTING_K, STARTING_K], [STARTING_K, STARTING_K]], replay.ks.tolist())
+        self.assertEqual(STARTING_K - K_CHANGE, replay.crew_ratings()[1][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
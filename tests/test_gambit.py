@@ -0,0 +1,114 @@
+import asyncio
+import types
+import unittest
+
+import discord
+
+from src.constants import GAMBIT_RESET_WIN
+from src.gambit import Gambit, LiveGambit, Payout, payout_dms, payout_messages, settle_bets, top_payouts
+from src.outbound import Outbound
+
+
+class FakeMember:
+    def __init__(self, name, closed=False, user_id=0):
+        self.name = name
+        self.id = user_id
+        self.closed = closed
+        self.received = []
+
+    async def send(self, text):
+        if self.closed:
+            raise discord.errors.Forbidden(types.SimpleNamespace(status=403, reason='Forbidden'), 'closed')
+        self.received.append(text)
+
+
+class SettleBetsTest(unittest.TestCase):
+    def test_payouts(self):
+        bets = [(1, 100, 'Winners'), (2, 0, 'Winners'), (3, 50, 'Losers'), (4, 250, 'Losers')]
+        payouts = settle_bets(bets, 'Winners', 100, 300)
+        self.assertEqual([Payout(1, 'Winners', 100, 400), Payout(2, 'Winners', 0, GAMBIT_RESET_WIN),
+                          Payout(3, 'Losers', 50, -50), Payout(4, 'Losers', 250, -250)], payouts)
+        self.assertEqual((payouts[0], payouts[3]), top_payouts(payouts))
+
+    def test_share_rounds_up(self):
+        self.assertEqual(34, settle_bets([(1, 10, 'A')], 'A', 30, 70)[0].result)
+
+    def test_no_winning_bets(self):
+        self.assertEqual([-10], [payout.result for payout in settle_bets([(1, 10, 'B')], 'A', 0, 10)])
+        self.assertEqual((None, None), top_payouts([]))
+
+    def test_messages(self):
+        won, = payout_messages(Payout(1, 'A', 10, 34), 500, 'A', 'B')
+        self.assertIn('You won 34 G-Coins on your bet of 10 on A over B', won)
+        lost, broke = payout_messages(Payout(1, 'B', 10, -10), 0, 'A', 'B')
+        self.assertEqual('You lost 10 G-Coins on your bet on B over A.', lost)
+        self.assertIn(f'you get {GAMBIT_RESET_WIN} G-Coins', broke)
+
+    def test_payout_dms(self):
+        members = {1: FakeMember('one', user_id=1), 3: FakeMember('three', closed=True, user_id=3)}
+        payouts = settle_bets([(1, 100, 'A'), (2, 50, 'B'), (3, 50, 'B')], 'A', 100, 100)
+
+        async def main():
+            outbound = Outbound(dm_rate=1000)
+            result = await outbound.dm_all(payout_dms(payouts, {1: 700}, 'A', 'B', members.get))
+            outbound.stop()
+            return result
+
+        result = asyncio.run(main())
+        self.assertEqual(['You won 200 G-Coins on your bet of 100 on A over B! Congrats you now have 700 G-Coins!'],
+                         members[1].received)
+        self.assertEqual((1, [members[3]]), (result.sent, result.forbidden))
+
+
+class LiveGambitTest(unittest.TestCase):
+    def setUp(self):
+        self.live = LiveGambit()
+        self.live.start('A', 'B', 99)
+
+    def test_totals_and_top_bettors(self):
+        self.live.bet(1, 'one', 'A', 100)
+        self.live.bet(2, 'two', 'A', 150)
+        self.live.bet(3, 'three', 'B', 20)
+        self.assertEqual(130, self.live.bet(1, 'one', 'A', 30))
+        self.assertEqual(Gambit('A', 'B', False, 99, 280, 20, ('two', 150), ('three', 20)), self.live.current())
+        self.live.bet(1, 'one', 'A', 30)
+        self.assertEqual(('one', 160), self.live.current().top_1)
+        self.assertEqual(('A', 160), self.live.member_bet(1))
+        self.assertEqual(('', 0), self.live.member_bet(4))
+
+    def test_current_is_a_copy(self):
+        self.live.lock(True)
+        current = self.live.current()
+        current.locked = False
+        self.assertTrue(self.live.current().locked)
+        self.assertEqual(('N/A (No bets)', ()), (current.odds_1, current.top_1))
+
+    def test_seed_reports_drift(self):
+        self.live.bet(1, 'one', 'A', 100)
+        version = self.live.version
+        drift = self.live.seed(Gambit('A', 'B', True, 99, bets_1=5),
+                               [(1, 'one', 'A', 100), (2, 'two', 'B', 40)])
+        self.assertEqual({'B': 40}, drift)
+        self.assertGreater(self.live.version, version)
+        self.assertEqual((100, 40, True), (self.live.current().bets_1, self.live.current().bets_2,
+                                           self.live.current().locked))
+
+    def test_clear(self):
+        self.live.bet(1, 'one', 'A', 100)
+        self.live.clear()
+        self.assertIsNone(self.live.current())
+        self.assertEqual(('', 0), self.live.member_bet(1))
+
+    def test_placing_blocks_seeding(self):
+        version = self.live.version
+        with self.live.placing():
+            self.assertEqual(1, self.live.placing_bets)
+            during = self.live.version
+            self.live.bet(1, 'one', 'A', 100)
+        self.assertEqual(0, self.live.placing_bets)
+        self.assertLess(version, during)
+        self.assertLess(during, self.live.version)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import random
+import unittest
+
+from src.cache import Cache
+from src.crew import Crew
+from src.leaderboard import Leaderboard, RATING_SPAN
+
+
+def brute_rank(ratings, name):
+    return 1 + sum(1 for rating in ratings.values() if rating > ratings[name])
+
+
+class LeaderboardTest(unittest.TestCase):
+    def test_matches_window_rank(self):
+        rng = random.Random(15)
+        ratings = {f'crew{i}': rng.randint(1300, 1700) for i in range(200)}
+        board = Leaderboard(ratings)
+        for _ in range(2000):
+            name = f'crew{rng.randrange(220)}'
+            if rng.random() < 0.05:
+                board.remove(name)
+                ratings.pop(name, None)
+            else:
+                ratings[name] = ratings.get(name, 1500) + rng.randint(-40, 40)
+                board.set(name, ratings[name])
+        self.assertEqual(len(ratings), len(board))
+        for name in ratings:
+            self.assertEqual(brute_rank(ratings, name), board.rank(name))
+        self.assertIsNone(board.rank('missing'))
+
+    def test_ratings_outside_the_span(self):
+        board = Leaderboard({'a': 1500, 'b': 1400})
+        board.set('c', 1500 + RATING_SPAN * 2)
+        board.set('d', -RATING_SPAN)
+        self.assertEqual([1, 2, 3, 4], [board.rank(name) for name in 'cabd'])
+
+    def test_standings_share_tied_ranks(self):
+        board = Leaderboard({'a': 1500, 'b': 1600, 'c': 1500, 'd': 1400})
+        self.assertEqual([(1, 'b', 1600), (2, 'a', 1500), (2, 'c', 1500), (4, 'd', 1400)], board.standings())
+
+    def test_cache_rankings_follow_battles(self):
+        cache = Cache()
+        cache.crews_by_name = {name: Crew(name=name, abbr=name) for name in ('Alpha', 'Beta', 'Gamma')}
+        cache.seed_rankings({'Alpha': 1600, 'Beta': 1500, 'Gamma': 1400})
+        self.assertEqual((2, '**SCS League:** 2/3'), (cache.crews_by_name['Beta'].ranking,
+                                                    cache.crews_by_name['Beta'].ladder))
+        cache.ratings_changed({'Gamma': 1650, 'Alpha': 1580, 'Fake Crew': 1500})
+        self.assertEqual([2, 3, 1], [cache.crews_by_name[name].ranking for name in ('Alpha', 'Beta', 'Gamma')])
+        self.assertEqual(1650, cache.crews_by_name['Gamma'].trinity_rating)
+        cache.crew_disbanded('Gamma')
+        self.assertEqual((1, 2), (cache.crews_by_name['Alpha'].ranking, cache.crews_by_name['Alpha'].total_crews))
+
+
+if __name__ == '__main__':
+    unittest.main()
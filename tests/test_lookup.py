@@ -0,0 +1,126 @@
+import random
+import string
+import unittest
+from types import SimpleNamespace
+
+from fuzzywuzzy import fuzz, process
+
+from src.crew import Crew
+from src.helpers import best_of_possibilities, single_crew_plus_string, split_possibilities
+from src.lookup import FuzzyIndex, ratio_bound
+
+
+def random_names(rng: random.Random, count: int):
+    names = {}
+    while len(names) < count:
+        length = rng.randint(1, 14)
+        names[''.join(rng.choice(string.ascii_letters + ' ._-0123456789é') for _ in range(length))] = None
+    return list(names)
+
+
+def typo(rng: random.Random, name: str) -> str:
+    chars = list(name)
+    for _ in range(rng.randint(0, 2)):
+        position = rng.randrange(len(chars) + 1)
+        if chars and rng.random() < 0.5:
+            del chars[min(position, len(chars) - 1)]
+        else:
+            chars.insert(position, rng.choice(string.ascii_lowercase))
+    return ''.join(chars)
+
+
+class FuzzyIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(7)
+        self.names = random_names(self.rng, 800)
+        self.index = FuzzyIndex(self.names)
+
+    def assertSameAsExtractOne(self, keys, queries):
+        for query in queries:
+            for scorer, cutoff in ((fuzz.ratio, 0), (fuzz.ratio, 30), (fuzz.WRatio, 40)):
+                with self.subTest(query=query, scorer=scorer.__name__, cutoff=cutoff):
+                    self.assertEqual(process.extractOne(query, keys, scorer=scorer, score_cutoff=cutoff),
+                                     self.index.extract_one(query, scorer=scorer, score_cutoff=cutoff))
+
+    def test_matches_extract_one(self):
+        queries = [typo(self.rng, self.rng.choice(self.names)) for _ in range(60)]
+        queries += random_names(self.rng, 20)
+        self.assertSameAsExtractOne(self.names, queries)
+
+    def test_exact_match_and_processing(self):
+        self.assertEqual((self.names[5], 100), self.index.extract_one(self.names[5]))
+        index = FuzzyIndex(['Jett!', 'jett', 'JETT '])
+        self.assertEqual(('Jett!', 100), index.extract_one('jett'))
+
+    def test_ties_go_to_earliest_key(self):
+        index = FuzzyIndex(['abcx', 'abcy', 'abcz'])
+        self.assertEqual(('abcx', 75), index.extract_one('abcw'))
+        index.discard('abcx')
+        index.add('abcx')
+        self.assertEqual(('abcy', 75), index.extract_one('abcw'))
+
+    def test_matches_after_changes(self):
+        for name in self.names[:300]:
+            self.index.discard(name)
+        keys = self.names[300:] + self.names[:50]
+        for name in self.names[:50]:
+            self.index.add(name)
+        self.assertEqual(keys, list(self.index))
+        queries = [typo(self.rng, self.rng.choice(keys)) for _ in range(30)]
+        self.assertSameAsExtractOne(keys, queries)
+
+    def test_empty(self):
+        self.assertIsNone(FuzzyIndex().extract_one('anything'))
+        self.assertEqual(process.extractOne('!!', self.names, scorer=fuzz.ratio), self.index.extract_one('!!'))
+
+    def test_ratio_bound(self):
+        rng = random.Random(3)
+        for _ in range(500):
+            first, second = typo(rng, 'crewbattle'), typo(rng, 'crewbattle')
+            if first == second:
+                continue
+            self.assertLessEqual(fuzz.ratio(first, second), ratio_bound(len(first), len(second)))
+
+
+    def test_extract_many(self):
+        queries = [typo(self.rng, self.rng.choice(self.names)) for _ in range(20)] + ['', '!!']
+        matches = self.index.extract_many(queries, scorer=fuzz.WRatio)
+        for query in queries:
+            self.assertEqual(process.extractOne(query, self.names), matches[query])
+
+
+def scan_best_split(combined: str, names, crews_by_tag):
+    best = ['', '', 0]
+    for sep in split_possibilities(combined):
+        sep = tuple(crews_by_tag[part.lower()].name if part.lower() in crews_by_tag else part for part in sep)
+        first, second = process.extractOne(sep[0], names), process.extractOne(sep[1], names)
+        if first[1] + second[1] > best[2]:
+            best = [first[0], second[0], first[1] + second[1]]
+    return best
+
+
+class SplitParsingTest(unittest.TestCase):
+    def setUp(self):
+        crews = {name: Crew(name=name, abbr=abbr) for name, abbr in
+                 (('Holy Knights', 'HK'), ('Midnight Society', 'MS'), ('Jett Squad', 'JS'), ('Ronin', 'RON'))}
+        self.roles = list(crews) + ['Leader', 'Advisor', 'Free Agent', 'Watchlist', '12h Join Cooldown']
+        cache = SimpleNamespace(crews_by_tag={cr.abbr.lower(): cr for cr in crews.values()},
+                                crew_index=FuzzyIndex(crews), role_index=FuzzyIndex(self.roles))
+        self.bot = SimpleNamespace(cache=cache)
+
+    def test_best_split_matches_full_scan(self):
+        for combined in ('holy knights leader', 'ms free agent', 'jett squad watch list', 'leader ronin',
+                         'midnight society holy knights'):
+            with self.subTest(combined=combined):
+                expected = scan_best_split(combined, self.roles, self.bot.cache.crews_by_tag)
+                self.assertEqual(expected, best_of_possibilities(combined, self.bot))
+
+    def test_crews_only(self):
+        self.assertEqual(['Holy Knights', 'Jett Squad', 200], best_of_possibilities('hk jett squad', self.bot, True))
+
+    def test_single_crew_plus_string(self):
+        self.assertEqual(['Ronin', 'some player', 100], single_crew_plus_string('ronin some player', self.bot))
+
+
+if __name__ == '__main__':
+    unittest.main()
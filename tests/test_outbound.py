@@ -0,0 +1,145 @@
+import asyncio
+import types
+import unittest
+
+import discord
+
+from src.outbound import FALLBACK, Outbound, TokenBucket
+
+
+class FakeMember:
+    def __init__(self, name, closed=False, user_id=0):
+        self.name = name
+        self.id = user_id
+        self.closed = closed
+        self.received = []
+
+    @property
+    def mention(self):
+        return f'@{self.name}'
+
+    async def send(self, text, embed=None):
+        if self.closed:
+            raise discord.errors.Forbidden(types.SimpleNamespace(status=403, reason='Forbidden'), 'closed')
+        await asyncio.sleep(0)
+        self.received.append(embed or text)
+
+    def __str__(self):
+        return self.name
+
+
+class FakeChannel(FakeMember):
+    pass
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_then_paced(self):
+        bucket = TokenBucket(2, 3)
+        self.assertEqual([0, 0, 0, .5, 1], [bucket.reserve(10) for _ in range(5)])
+        self.assertEqual(.5, bucket.reserve(11))
+
+
+class OutboundTest(unittest.TestCase):
+    def test_dm_all_sends_in_order_and_reports(self):
+        members = [FakeMember(f'member{i}', closed=i == 3, user_id=i) for i in range(7)]
+        updates = []
+
+        async def progress(done, total):
+            updates.append((done, total))
+
+        async def main():
+            outbound = Outbound(concurrency=3, dm_rate=1000)
+            result = await outbound.dm_all([(member, ['first', 'second']) for member in members], progress, 2)
+            outbound.stop()
+            return result
+
+        result = asyncio.run(main())
+        self.assertEqual(12, result.sent)
+        self.assertEqual([members[3]], result.forbidden)
+        self.assertEqual(['first', 'second'], members[0].received)
+        self.assertEqual([(2, 7), (4, 7), (6, 7), (7, 7)], updates)
+
+    def test_dms_paced(self):
+        members = [FakeMember(str(i), user_id=i) for i in range(5)]
+
+        async def main():
+            outbound = Outbound(dm_rate=100)
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            await outbound.dm_all([(member, ['hi']) for member in members])
+            outbound.stop()
+            return loop.time() - start
+
+        self.assertGreaterEqual(asyncio.run(main()), .035)
+
+    def test_logs_batch_and_fallback(self):
+        log = FakeChannel('log', user_id=100)
+        closed = FakeMember('closed', closed=True, user_id=1)
+
+        async def main():
+            outbound = Outbound(concurrency=1, dm_rate=1000)
+            status = outbound.dm(closed, 'your crew decayed', fallback=log)
+            for i in range(3):
+                outbound.log(log, f'line {i}')
+            outbound.log(log, 'x' * 1999)
+            result = await status
+            await outbound.drain()
+            outbound.stop()
+            return outbound, result
+
+        outbound, status = asyncio.run(main())
+        self.assertEqual(FALLBACK, status)
+        self.assertEqual(['line 0\nline 1\nline 2', 'x' * 1999, '@closed: your crew decayed'], log.received)
+        self.assertEqual(2, outbound.batched)
+        self.assertEqual(1, outbound.fallbacks)
+        self.assertIn('scs_outbound_dm_fallbacks_total 1', outbound.metrics())
+
+    def test_sheets_first_and_full_lanes_drop(self):
+        channel = FakeChannel('sheets', user_id=5)
+        member = FakeMember('member', user_id=6)
+
+        async def main():
+            outbound = Outbound(concurrency=1, dm_rate=1000, max_depth=1)
+            outbound.dm(member, 'first')
+            outbound.dm(member, 'dropped')
+            outbound.log(channel, 'log')
+            await outbound.send(channel, 'sheet')
+            await outbound.drain()
+            outbound.stop()
+            return outbound
+
+        outbound = asyncio.run(main())
+        self.assertEqual(['sheet', 'log'], channel.received)
+        self.assertEqual(['first'], member.received)
+        self.assertEqual(1, sum(outbound.dropped.values()))
+
+
+    def test_dm_all_not_capped(self):
+        members = [FakeMember(str(i), user_id=i) for i in range(4)]
+
+        async def main():
+            outbound = Outbound(dm_rate=1000, max_depth=1)
+            result = await outbound.dm_all([(member, ['won']) for member in members])
+            outbound.stop()
+            return outbound, result
+
+        outbound, result = asyncio.run(main())
+        self.assertEqual((4, []), (result.sent, result.failed))
+        self.assertEqual(0, sum(outbound.dropped.values()))
+
+    def test_stop_fails_waiting_sends(self):
+        channel = FakeChannel('sheets', user_id=5)
+
+        async def main():
+            outbound = Outbound(concurrency=1)
+            sheets = [asyncio.ensure_future(outbound.send(channel, str(i))) for i in range(3)]
+            await asyncio.sleep(0)
+            outbound.stop()
+            return await asyncio.wait_for(asyncio.gather(*sheets, return_exceptions=True), 1)
+
+        results = asyncio.run(main())
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import datetime
+import random
+import unittest
+
+from src.constants import DECAY_CUTOFFS, STARTING_RATING
+from src.elo_replay import ReplayBattle, replay_elo
+from src.rating_sim import Policy, policy_grid, rank_correlation, simulate, sweep
+
+NO_DECAY = (0,) * len(DECAY_CUTOFFS)
+
+
+def season(rng: random.Random, count: int):
+    start = datetime.datetime(2024, 7, 1)
+    battles = []
+    for battle_id in range(count):
+        winner, loser = rng.sample(range(12), 2)
+        battles.append(ReplayBattle(battle_id, winner, loser, rng.random() < 0.1,
+                                    start + datetime.timedelta(hours=7 * battle_id)))
+    return battles
+
+
+class RatingSimTest(unittest.TestCase):
+    def test_without_decay_matches_replay(self):
+        battles = season(random.Random(14), 200)
+        k_reset_at = datetime.datetime(2024, 7, 15)
+        expected = {crew_id: rating for crew_id, (rating, _) in
+                    replay_elo(battles, k_reset_at=k_reset_at).crew_ratings().items()}
+        self.assertEqual(expected, simulate(battles, Policy(decay_loss=NO_DECAY), k_reset_at=k_reset_at))
+
+    def test_idle_top_crew_decays(self):
+        start = datetime.datetime(2024, 7, 1)
+        battles = [ReplayBattle(1, 1, 2, finished=start)]
+        battles += [ReplayBattle(i, 3 + i % 2, 4 - i % 2, finished=start + datetime.timedelta(days=i))
+                    for i in range(2, 20)]
+        policy = Policy(decay_loss=(0, 30, 0, 0, 0), decay_top_fraction=.5)
+        undecayed = simulate(battles, Policy(decay_loss=NO_DECAY))
+        decayed = simulate(battles, policy, exempt={4})
+        self.assertEqual(undecayed[1] - 30, decayed[1])
+        self.assertEqual(undecayed[4], decayed[4])
+
+    def test_rank_correlation(self):
+        self.assertAlmostEqual(1.0, rank_correlation({1: 1500, 2: 1600, 3: 1700}, {1: 10, 2: 20, 3: 30, 4: 0}))
+        self.assertAlmostEqual(-1.0, rank_correlation({1: 1500, 2: 1600, 3: 1700}, {1: 30, 2: 20, 3: 10}))
+        self.assertEqual(0.0, rank_correlation({1: 1500}, {1: 1500}))
+
+    def test_sweep_keeps_policy_order(self):
+        battles = season(random.Random(15), 60)
+        actual = simulate(battles, Policy())
+        policies = policy_grid(default_ks=(40, 50), k_changes=(0, 10))
+        results = sweep(battles, policies, actual, workers=2)
+        self.assertEqual(policies, [result.policy for result in results])
+        self.assertAlmostEqual(1.0, results[policies.index(Policy())].correlation)
+        self.assertTrue(all(STARTING_RATING - 1000 < rating for rating in results[0].ratings.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import asyncio
+import unittest
+
+from src.recache_monitor import RecacheMonitor
+
+
+class RecacheMonitorTest(unittest.TestCase):
+    def setUp(self):
+        self.monitor = RecacheMonitor(history=3)
+
+    def test_phases_add_up_and_alert(self):
+        run = self.monitor.begin()
+        with run.phase('current cbs'):
+            pass
+        with run.phase('current cbs'):
+            pass
+        run.record('crew_update', 75)
+        self.monitor.end(run)
+        self.assertEqual(['current cbs', 'crew_update'], list(run.phases))
+        self.assertEqual(['crew_update took 75.0s (limit 60s)'], run.alerts())
+        self.assertIn('crew_update 75.0', run.summary())
+
+    def test_overlap_detected(self):
+        async def recache(backup):
+            run = self.monitor.begin(backup=backup)
+            await asyncio.sleep(.01)
+            self.monitor.end(run)
+            return run
+
+        async def both():
+            return await asyncio.gather(recache(False), recache(True))
+
+        first, second = asyncio.run(both())
+        self.assertEqual((0, 1), (first.overlapped, second.overlapped))
+        self.assertEqual(1, self.monitor.overlaps)
+        self.assertIn('started while 1 other recache was still running', second.alerts())
+        self.assertEqual([], self.monitor.running)
+
+    def test_failures_kept_in_history(self):
+        for seconds in (10, 20, 30, 40):
+            run = self.monitor.begin()
+            run.record('crew docs', seconds)
+            self.monitor.end(run, ValueError('sheet down') if seconds == 40 else None)
+        self.assertEqual(3, len(self.monitor.runs))
+        self.assertEqual([('crew docs', 30.0, 40)], self.monitor.phase_stats())
+        report = self.monitor.report()
+        self.assertIn('1 failed', report)
+        self.assertIn('failed (ValueError: sheet down)', report)
+
+    def test_report_before_first_run(self):
+        self.assertEqual('No recache has finished yet.', self.monitor.report())
+
+
+if __name__ == '__main__':
+    unittest.main()
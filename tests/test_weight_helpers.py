@@ -0,0 +1,69 @@
+import random
+import unittest
+from collections import defaultdict
+
+from src.weight_helpers import MemberStats, replay_weights, weight, weight_changes
+
+
+def battle_by_battle(battles, table):
+    """The per player loop battle_weight_changes used to run, against a dict standing in for the stats table."""
+    for matches in battles:
+        player_weights = {}
+        player_taken = defaultdict(int)
+        player_weighted_taken = defaultdict(int)
+        player_lost = defaultdict(int)
+        for p1, p2, p1_taken, p2_taken in matches:
+            for player in (p1, p2):
+                if player not in player_weights:
+                    row = table.setdefault(player, MemberStats())
+                    player_weights[player] = max(row.weighted_taken, 1) / max(row.lost, 1)
+            player_taken[p1] += p1_taken
+            player_taken[p2] += p2_taken
+            player_weighted_taken[p1] += p1_taken * player_weights[p2]
+            player_lost[p1] += p2_taken
+            player_weighted_taken[p2] += p2_taken * player_weights[p1]
+            player_lost[p2] += p1_taken
+        for player in player_taken:
+            row = table[player]
+            row.weighted_taken += player_weighted_taken[player]
+            row.taken += player_taken[player]
+            row.lost += player_lost[player]
+            row.played += 1
+    return table
+
+
+def random_battles(rng: random.Random, count: int):
+    battles = []
+    for _ in range(count):
+        team1 = rng.sample(range(40), 3)
+        team2 = rng.sample(range(40, 80), 3)
+        matches = []
+        for _ in range(rng.randint(1, 6)):
+            p1_taken = rng.randint(0, 3)
+            matches.append((rng.choice(team1), rng.choice(team2), p1_taken, 3 - p1_taken))
+        battles.append(matches)
+    return battles
+
+
+class WeightHelpersTest(unittest.TestCase):
+    def test_weight_floors_at_one(self):
+        self.assertEqual(1, weight(0, 0))
+        self.assertEqual(2.5, weight(5, 2))
+
+    def test_reverse_undoes_changes(self):
+        matches = [(1, 2, 3, 1), (1, 3, 0, 2)]
+        weights = {1: 1.5, 2: 0.5, 3: 2}
+        forward = weight_changes(matches, weights)
+        backward = weight_changes(matches, weights, reverse=True)
+        self.assertEqual(MemberStats(3 * 0.5 + 0 * 2, 3, 3), forward[1])
+        for player, change in forward.items():
+            self.assertEqual((-change.weighted_taken, -change.taken, -change.lost),
+                             (backward[player].weighted_taken, backward[player].taken, backward[player].lost))
+
+    def test_replay_matches_battle_by_battle(self):
+        battles = random_battles(random.Random(12), 300)
+        self.assertEqual(battle_by_battle(battles, {}), replay_weights(battles))
+
+
+if __name__ == '__main__':
+    unittest.main()